@@ -0,0 +1,198 @@
+# analytics.py
+# 事件总线的两个订阅者:
+#   AnalyticsWriter  把事件批量写入按大小轮换的 gzip 压缩 JSONL 文件(后台线程，游戏循环中没有文件I/O)
+#   LevelAnalytics   汇总每个关卡的数据(各类Meme造成的伤害、射击次数、击退用时)，关卡结束时发布 LevelSummary
+import glob
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from event_bus import (
+    BUS, EVENT_TYPES, LevelStarted, ShotFired, TrumpHit, MemeDefeated, TrumpRetreating,
+    WhiteHouseReached, LevelCleared, LevelSummary
+)
+from config import (
+    ANALYTICS_DIR, ANALYTICS_MAX_FILE_BYTES, ANALYTICS_MAX_FILES, ANALYTICS_FLUSH_INTERVAL, ANALYTICS_BATCH_SIZE
+)
+
+_STOP = object()
+
+
+class AnalyticsWriter:
+    """把总线上的事件写入 analytics_*.jsonl.gz
+
+    每行一个JSON对象: {"type": 事件类型名, "wall_time": 真实时间, ...事件字段}。
+    订阅处理函数只把事件放入队列；后台线程收到第一条事件后再等待最多 flush_interval 秒
+    凑成一批，一次写入并刷新压缩流。压缩后的文件超过 max_bytes 时换一个新文件，
+    只保留最近 max_files 个。
+    """
+
+    def __init__(self, bus=BUS, directory=ANALYTICS_DIR, max_bytes=ANALYTICS_MAX_FILE_BYTES,
+                 max_files=ANALYTICS_MAX_FILES, flush_interval=ANALYTICS_FLUSH_INTERVAL,
+                 batch_size=ANALYTICS_BATCH_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.events_written = 0
+        self._session = time.strftime("%Y%m%d_%H%M%S")
+        self._file_index = 0
+        self._raw = None
+        self._gzip = None
+        self._pending = queue.Queue()
+        self._unsubscribe = bus.subscribe_all(self._on_event, EVENT_TYPES)
+        self._writer = threading.Thread(target=self._writer_loop, name="AnalyticsWriter", daemon=True)
+        self._writer.start()
+
+    def _on_event(self, event):
+        self._pending.put((time.time(), event))
+
+    def flush(self):
+        """阻塞直到所有已排队的事件写入文件"""
+        self._pending.join()
+
+    def close(self):
+        """退订并写完剩余事件"""
+        self._unsubscribe()
+        if self._writer.is_alive():
+            self._pending.put(_STOP)
+            self._writer.join()
+
+    def _open_next(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._file_index += 1
+        path = os.path.join(self.directory, f"analytics_{self._session}_{self._file_index:03d}.jsonl.gz")
+        self._raw = open(path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        # 删除超出数量的旧文件(文件名按时间排序)
+        files = sorted(glob.glob(os.path.join(self.directory, "analytics_*.jsonl.gz")))
+        for old in files[:-self.max_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _close_file(self):
+        if self._gzip is not None:
+            self._gzip.close()
+            self._raw.close()
+            self._gzip = None
+            self._raw = None
+
+    def _write_batch(self, batch):
+        if self._gzip is None:
+            self._open_next()
+        lines = []
+        for wall_time, event in batch:
+            record = {"type": type(event).__name__, "wall_time": round(wall_time, 3)}
+            record.update(event._asdict())
+            lines.append(json.dumps(record, separators=(",", ":")))
+        self._gzip.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self._gzip.flush()  # 同步刷新，崩溃时已写入的批次仍可解压
+        self.events_written += len(batch)
+        if self._raw.tell() >= self.max_bytes:
+            self._close_file()
+
+    def _writer_loop(self):
+        try:
+            running = True
+            while running:
+                item = self._pending.get()
+
+                batch = []
+                taken = 0
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None:
+                    taken += 1
+                    if item is _STOP:
+                        running = False
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        item = None
+
+                if batch:
+                    try:
+                        self._write_batch(batch)
+                    except OSError as e:
+                        print(f"Warning: Failed to write analytics: {e}")
+                        self._close_file()
+
+                for _ in range(taken):
+                    self._pending.task_done()
+        finally:
+            self._close_file()
+
+
+class LevelAnalytics:
+    """按关卡汇总战斗事件
+
+    关卡结束(击退Trump或Trump到达白宫)时发布 LevelSummary，并保存在 summaries 中。
+    """
+
+    def __init__(self, bus=BUS, keep=50):
+        self.bus = bus
+        self.keep = keep
+        self.summaries = []
+        self._level = None
+        self._unsubscribers = [
+            bus.subscribe(LevelStarted, self._on_level_started),
+            bus.subscribe(ShotFired, self._on_shot),
+            bus.subscribe(TrumpHit, self._on_hit),
+            bus.subscribe(MemeDefeated, self._on_meme_defeated),
+            bus.subscribe(TrumpRetreating, self._on_retreating),
+            bus.subscribe(LevelCleared, self._on_level_end),
+            bus.subscribe(WhiteHouseReached, self._on_level_end),
+        ]
+
+    def close(self):
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+
+    def _on_level_started(self, event):
+        self._level = {"level": event.level, "start": event.time, "retreat": None,
+                       "damage": {}, "shots": {}, "memes_lost": 0}
+
+    def _on_shot(self, event):
+        if self._level:
+            shots = self._level["shots"]
+            shots[event.name] = shots.get(event.name, 0) + 1
+
+    def _on_hit(self, event):
+        if self._level:
+            damage = self._level["damage"]
+            damage[event.source] = damage.get(event.source, 0) + event.damage
+
+    def _on_meme_defeated(self, event):
+        if self._level:
+            self._level["memes_lost"] += 1
+
+    def _on_retreating(self, event):
+        if self._level and self._level["retreat"] is None:
+            self._level["retreat"] = event.time
+
+    def _on_level_end(self, event):
+        level = self._level
+        if not level:
+            return
+        self._level = None
+        time_to_kill = level["retreat"] - level["start"] if level["retreat"] is not None else None
+        summary = LevelSummary(
+            level=level["level"],
+            won=isinstance(event, LevelCleared),
+            duration=event.time - level["start"],
+            time_to_kill=time_to_kill,
+            damage_by_type=level["damage"],
+            shots_by_type=level["shots"],
+            memes_lost=level["memes_lost"],
+        )
+        self.summaries.append(summary)
+        del self.summaries[:-self.keep]
+        self.bus.emit(LevelSummary, *summary)
@@ -0,0 +1,177 @@
+# asset_bundle.py
+# 把 assets 下的图片按游戏实际使用的尺寸预先缩放、解码成原始像素，打包成一个带索引的文件。
+# 运行时用 mmap 映射该文件，直接以映射的内存创建 Surface，启动时不再解码任何PNG。
+#
+# 手动构建: python asset_bundle.py
+# 源图片的大小或修改时间变化后，下次启动会自动重新构建。
+import json
+import mmap
+import os
+import struct
+import pygame
+from config import ASSETS_DIR, ASSET_BUNDLE_PATH, ASSET_BUNDLE_VARIANTS, IMAGE_PATHS
+
+MAGIC = b"MVTBNDL1"
+_HEADER = struct.Struct("<8sI")  # magic, 索引长度
+PIXEL_FORMAT = "BGRA"  # 与 convert_alpha() 在常见显示格式下的像素布局一致，blit 时无需转换
+_ALIGN = 16
+
+_bundle = None  # 当前映射的 AssetBundle；False 表示不可用，不再重试
+
+
+def _source_key(path):
+    return os.path.relpath(os.path.abspath(path), ASSETS_DIR).replace(os.sep, "/")
+
+
+def _entry_key(path, size):
+    return f"{_source_key(path)}@{size[0]}x{size[1]}"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _variant_paths(variants):
+    from meme_catalog import CATALOG
+    from config import MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT, BOARD_SPRITE_SIZE
+    # 目录中每种图片都需要收藏UI和棋盘两种尺寸
+    catalog_variants = [(key, size) for key in CATALOG.image_keys
+                        for size in ((MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT), BOARD_SPRITE_SIZE)]
+    return [(IMAGE_PATHS[key], tuple(size)) for key, size in list(variants) + catalog_variants]
+
+
+def build_bundle(bundle_path=ASSET_BUNDLE_PATH, variants=ASSET_BUNDLE_VARIANTS):
+    """解码并缩放所有图片变体，写入打包文件
+
+    缺失或无法解码的源图片会被跳过，运行时由 load_image 的占位图处理。
+
+    Returns:
+        int: 写入的变体数量
+    """
+    entries = {}
+    sources = {}
+    blobs = []
+    offset = 0
+    decoded = {}
+    for path, size in _variant_paths(variants):
+        key = _entry_key(path, size)
+        if key in entries:
+            continue
+        source = _source_key(path)
+        if source not in decoded:
+            try:
+                decoded[source] = pygame.image.load(path)
+                sources[source] = _source_stamp(path)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Warning: Skipping {path} in asset bundle: {e}")
+                decoded[source] = None
+        image = decoded[source]
+        if image is None:
+            continue
+        scaled = pygame.transform.scale(image, size)
+        pixels = pygame.image.tobytes(scaled, PIXEL_FORMAT)
+        padding = -len(pixels) % _ALIGN
+        entries[key] = [offset, size[0], size[1]]
+        blobs.append(pixels + b"\0" * padding)
+        offset += len(pixels) + padding
+
+    index = json.dumps({"format": PIXEL_FORMAT, "sources": sources, "entries": entries}).encode("utf-8")
+    index += b" " * (-(_HEADER.size + len(index)) % _ALIGN)
+
+    os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+    tmp_path = bundle_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, bundle_path)
+    print(f"Built asset bundle with {len(entries)} images ({offset // 1024} KiB) at {bundle_path}")
+    return len(entries)
+
+
+class AssetBundle:
+    """一个已映射的打包文件"""
+
+    def __init__(self, bundle_path):
+        with open(bundle_path, "rb") as f:
+            # ACCESS_COPY: Surface 需要可写缓冲区，写入只影响本进程的私有副本
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{bundle_path} is not an asset bundle")
+        index = json.loads(bytes(self._map[_HEADER.size:_HEADER.size + index_length]))
+        self.format = index["format"]
+        self.sources = index["sources"]
+        self.entries = index["entries"]
+        self._data_start = _HEADER.size + index_length
+        self._view = memoryview(self._map)
+        self._surfaces = {}
+
+    def is_current(self, variants=ASSET_BUNDLE_VARIANTS):
+        """检查打包文件是否覆盖所有变体且源图片没有变化(只调用 stat，不打开文件)"""
+        for path, size in _variant_paths(variants):
+            if not os.path.exists(path):
+                continue
+            source = _source_key(path)
+            if source not in self.sources or self.sources[source] != _source_stamp(path):
+                return False
+            if _entry_key(path, size) not in self.entries:
+                return False
+        return True
+
+    def get_surface(self, path, size):
+        """返回映射内存上的 Surface；同一 (path, size) 共享同一个对象，调用方不能在上面绘制"""
+        key = _entry_key(path, size)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            offset, width, height = entry
+            start = self._data_start + offset
+            surface = pygame.image.frombuffer(self._view[start:start + width * height * 4],
+                                              (width, height), self.format)
+            self._surfaces[key] = surface
+        return surface
+
+
+def open_bundle(bundle_path=ASSET_BUNDLE_PATH, rebuild=True):
+    """映射打包文件；不存在或过期时(rebuild=True)先重新构建
+
+    Returns:
+        AssetBundle | None: 无法使用打包文件时为 None
+    """
+    bundle = None
+    if os.path.exists(bundle_path):
+        try:
+            bundle = AssetBundle(bundle_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Could not open asset bundle: {e}")
+    if bundle is not None and bundle.is_current():
+        return bundle
+    if not rebuild:
+        return bundle
+    bundle = None  # 旧的映射在重建前释放(Windows 上不能替换已映射的文件)
+    try:
+        build_bundle(bundle_path)
+        return AssetBundle(bundle_path)
+    except (OSError, ValueError, pygame.error) as e:
+        print(f"Warning: Could not build asset bundle: {e}")
+        return None
+
+
+def get_surface(path, size):
+    """从全局打包文件中取出预缩放的图片，不可用时返回 None(调用方回退到解码PNG)"""
+    global _bundle
+    if _bundle is None:
+        _bundle = open_bundle() or False
+    if not _bundle:
+        return None
+    return _bundle.get_surface(path, tuple(size))
+
+
+if __name__ == "__main__":
+    build_bundle()
@@ -0,0 +1,287 @@
+# balance_tuner.py
+# 用无界面战斗模拟(battle_sim)自动搜索 battle_config 中的平衡参数，
+# 使随机布阵在每一关的胜率接近目标曲线 TUNER_TARGET_WIN_RATES。
+#   逐次减半(successive halving): 先用少量战斗评估所有候选参数，只保留最好的 1/eta，
+#   再用 eta 倍的战斗数评估留下的候选，直到只剩一个或达到最大战斗数
+#   第 i 场战斗的布阵只由 (种子, i) 决定，所有候选和所有关卡都在相同的布阵上比较，
+#   加大战斗数时前面的战斗直接复用
+#   战斗在进程池中并行模拟，每完成一批就追加到 TUNER_CACHE_PATH，中断后用相同参数重新运行即可继续
+#
+# 通宵重新平衡: python balance_tuner.py --configs 200 --max-battles 729
+# 只调整部分参数: python balance_tuner.py --only TRUMP_BASE_HEALTH,TRUMP_HEALTH_PER_LEVEL_INCREASE
+# 结果写入 TUNER_RESULT_PATH，确认后手动改 battle_config.py。
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import battle_config
+import battle_sim
+from config import (
+    PLACEABLE_CELLS, TUNER_CACHE_PATH, TUNER_RESULT_PATH, TUNER_TARGET_WIN_RATES, TUNER_WORKERS, TUNER_CHUNK_SIZE
+)
+from meme_catalog import CATALOG, compute_stats
+
+# 参数名 -> (类型, 最小值, 最大值)
+SEARCH_SPACE = {
+    "TRUMP_BASE_HEALTH": (int, 60, 200),
+    "TRUMP_HEALTH_PER_LEVEL_INCREASE": (int, 20, 100),
+    "TRUMP_SLOW_DOWN_RATE": (float, 0.0, 0.15),
+    "MAX_SLOW_DOWN_EFFECT": (float, 0.3, 0.9),
+    "TRUMP_ATTACK_DAMAGE": (int, 2, 15),
+    "MEME_BASE_HEALTH": (int, 10, 40),
+    "MEME_HEALTH_PER_STAR": (int, 0, 20),
+}
+
+# 一组参数的评估结果；win_rates 按关卡排列，battles 为每关的战斗数
+TunerResult = namedtuple("TunerResult", ["params", "loss", "win_rates", "battles"])
+
+_UNKNOWN = 2  # 缓存中尚未模拟的战斗
+
+
+def current_parameters():
+    """battle_config 中当前的取值"""
+    return {name: getattr(battle_config, name) for name in SEARCH_SPACE}
+
+
+def sample_parameters(rng, names):
+    """在搜索范围内随机取 names 中的参数，其余参数保持当前取值"""
+    params = current_parameters()
+    for name in names:
+        kind, low, high = SEARCH_SPACE[name]
+        params[name] = rng.randint(low, high) if kind is int else round(rng.uniform(low, high), 3)
+    return params
+
+
+def parameters_key(params, seed):
+    """缓存中一组参数的键(种子不同时布阵不同，结果不能共用)"""
+    return json.dumps([seed, params], sort_keys=True)
+
+
+def make_board(seed, index, params):
+    """第 index 场战斗的随机布阵: 1到 PLACEABLE_CELLS 个按掉落概率抽取的Meme放在随机的格子上
+
+    Returns:
+        list: 每个可放置格子的 (伤害, 生命值) 或 None
+    """
+    rng = random.Random(f"{seed}:{index}")
+    board = [None] * PLACEABLE_CELLS
+    for cell in rng.sample(range(PLACEABLE_CELLS), rng.randint(1, PLACEABLE_CELLS)):
+        type_id = CATALOG.draw_type(rng)
+        star = CATALOG.star[type_id]
+        health = CATALOG.health[type_id]
+        if health == compute_stats(CATALOG.base_damage[type_id], star)[1]:
+            # 目录中没有单独指定生命值的类型按候选参数计算
+            health = params["MEME_BASE_HEALTH"] + (star - 1) * params["MEME_HEALTH_PER_STAR"]
+        board[cell] = (CATALOG.damage[type_id], health)
+    return board
+
+
+def _run_chunk(params, seed, level, start, stop):
+    """在工作进程中执行: 模拟 [start, stop) 场战斗，返回每场是否胜利的 "0"/"1" 字符串"""
+    battle_sim.set_parameters({name: value for name, value in params.items()
+                               if name in battle_sim.TUNABLE_PARAMETERS})
+    return "".join("1" if battle_sim.simulate_battle(level, make_board(seed, i, params)).won else "0"
+                   for i in range(start, stop))
+
+
+class EvaluationCache:
+    """已模拟的战斗结果，追加写入 JSONL 文件
+
+    每行为 {"key", "level", "start", "wins"}，wins 是从第 start 场开始的连续结果。
+
+    Args:
+        path (str | None): 缓存文件，None 表示只在内存中
+    """
+
+    def __init__(self, path=TUNER_CACHE_PATH):
+        self.path = path
+        self._results = {}  # (参数键, 关卡) -> bytearray，下标为战斗序号
+        self._file = None
+        self.loaded = 0
+        if path and os.path.exists(path):
+            skipped = 0
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._store(record["key"], record["level"], record["start"], record["wins"])
+                        self.loaded += len(record["wins"])
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+            if skipped:
+                print(f"Warning: Skipped {skipped} unreadable lines in {path}")
+
+    def _store(self, key, level, start, wins):
+        results = self._results.setdefault((key, level), bytearray())
+        end = start + len(wins)
+        if len(results) < end:
+            results.extend([_UNKNOWN] * (end - len(results)))
+        results[start:end] = bytes(1 if w == "1" else 0 for w in wins)
+
+    def add(self, key, level, start, wins):
+        self._store(key, level, start, wins)
+        if self.path:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"key": key, "level": level, "start": start, "wins": wins}) + "\n")
+            self._file.flush()
+
+    def missing(self, key, level, count, chunk_size):
+        """前 count 场中还没有结果的战斗，按 chunk_size 分成 (start, stop) 段"""
+        results = self._results.get((key, level), b"")
+        ranges = []
+        start = None
+        for i in range(count + 1):
+            unknown = i < count and (i >= len(results) or results[i] == _UNKNOWN)
+            if unknown and start is None:
+                start = i
+            if start is not None and (not unknown or i - start == chunk_size):
+                ranges.append((start, i))
+                start = i if unknown else None
+        return ranges
+
+    def win_rate(self, key, level, count):
+        results = self._results[(key, level)]
+        return sum(results[:count]) / count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def score(win_rates, targets):
+    """与目标胜率曲线的均方误差"""
+    return sum((rate - target) ** 2 for rate, target in zip(win_rates, targets)) / len(targets)
+
+
+def _evaluate(executor, cache, keyed, levels, count, seed, chunk_size):
+    """补齐每组参数在每一关的前 count 场战斗，返回新模拟的场数"""
+    tasks = []
+    for key, params in keyed:
+        for level in levels:
+            for start, stop in cache.missing(key, level, count, chunk_size):
+                tasks.append((key, params, level, start, stop))
+    if executor is None:
+        for key, params, level, start, stop in tasks:
+            cache.add(key, level, start, _run_chunk(params, seed, level, start, stop))
+    else:
+        futures = {executor.submit(_run_chunk, params, seed, level, start, stop): (key, level, start)
+                   for key, params, level, start, stop in tasks}
+        for future in as_completed(futures):
+            key, level, start = futures[future]
+            cache.add(key, level, start, future.result())
+    return sum(stop - start for _, _, _, start, stop in tasks)
+
+
+def tune(configs=64, min_battles=9, max_battles=243, eta=3, seed=0, names=None, targets=TUNER_TARGET_WIN_RATES,
+         workers=TUNER_WORKERS, cache_path=TUNER_CACHE_PATH, chunk_size=TUNER_CHUNK_SIZE):
+    """逐次减半搜索参数
+
+    Args:
+        configs (int): 候选参数组数(包括 battle_config 当前的取值)
+        min_battles (int): 第一轮每组参数每关的战斗数
+        max_battles (int): 每关战斗数的上限
+        eta (int): 每轮保留 1/eta 的候选，战斗数乘以 eta
+        seed (int): 候选参数和布阵的随机种子，相同的种子才能复用缓存
+        names (list, optional): 参与搜索的参数，默认为 SEARCH_SPACE 中的全部
+        targets (sequence): 第1关起每关的目标胜率
+        workers (int): 模拟进程数，1 表示在当前进程中模拟
+        cache_path (str | None): 战斗结果缓存文件
+
+    Returns:
+        tuple: (最好的 TunerResult, 当前取值的 TunerResult)
+    """
+    names = list(names or SEARCH_SPACE)
+    rng = random.Random(seed)
+    baseline = current_parameters()
+    candidates = {}
+    for params in [baseline] + [sample_parameters(rng, names) for _ in range(configs - 1)]:
+        candidates.setdefault(parameters_key(params, seed), params)
+    baseline_key = parameters_key(baseline, seed)
+    levels = range(1, len(targets) + 1)
+    results = {}
+
+    cache = EvaluationCache(cache_path)
+    if cache.loaded:
+        print(f"Resuming with {cache.loaded} cached battles from {cache_path}")
+    executor = None
+    if workers > 1:
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    alive = list(candidates.items())
+    count = min(min_battles, max_battles)
+    rung = 0
+    try:
+        while True:
+            start_time = time.perf_counter()
+            simulated = _evaluate(executor, cache, alive, levels, count, seed, chunk_size)
+            for key, params in alive:
+                rates = [cache.win_rate(key, level, count) for level in levels]
+                results[key] = TunerResult(params, score(rates, targets), rates, count)
+            alive.sort(key=lambda item: results[item[0]].loss)
+            total = len(alive) * len(levels) * count
+            print(f"Rung {rung}: {len(alive)} configs x {len(levels)} levels x {count} battles, "
+                  f"{simulated} simulated ({total - simulated} cached) in {time.perf_counter() - start_time:.1f}s, "
+                  f"best loss {results[alive[0][0]].loss:.4f}")
+            if len(alive) == 1 or count >= max_battles:
+                break
+            alive = alive[:max(1, len(alive) // eta)]
+            count = min(max_battles, count * eta)
+            rung += 1
+        if baseline_key not in dict(alive):
+            # 当前取值在最后一轮的战斗数下重新评估，和结果公平比较
+            _evaluate(executor, cache, [(baseline_key, baseline)], levels, count, seed, chunk_size)
+            rates = [cache.win_rate(baseline_key, level, count) for level in levels]
+            results[baseline_key] = TunerResult(baseline, score(rates, targets), rates, count)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        cache.close()
+    return results[alive[0][0]], results[baseline_key]
+
+
+def print_report(best, baseline, targets=TUNER_TARGET_WIN_RATES):
+    print(f"{'level':>5} {'target':>7} {'current':>8} {'tuned':>7}")
+    for level, target in enumerate(targets, start=1):
+        print(f"{level:>5} {target:>7.2f} {baseline.win_rates[level - 1]:>8.2f} {best.win_rates[level - 1]:>7.2f}")
+    print(f"loss: current {baseline.loss:.4f} ({baseline.battles} battles/level), "
+          f"tuned {best.loss:.4f} ({best.battles} battles/level)")
+    print("battle_config.py:")
+    for name, value in best.params.items():
+        mark = "" if value == baseline.params[name] else f"  # was {baseline.params[name]}"
+        print(f"    {name} = {value}{mark}")
+
+
+def save_result(best, baseline, path=TUNER_RESULT_PATH, targets=TUNER_TARGET_WIN_RATES):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {"targets": list(targets), "tuned": best._asdict(), "current": baseline._asdict()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search battle_config parameters for target win rates")
+    parser.add_argument("--configs", type=int, default=64, help="candidate parameter sets")
+    parser.add_argument("--min-battles", type=int, default=9, help="battles per level in the first rung")
+    parser.add_argument("--max-battles", type=int, default=243, help="battles per level in the last rung")
+    parser.add_argument("--eta", type=int, default=3, help="keep 1/eta of the candidates per rung")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="comma separated parameters to search, others stay as configured")
+    parser.add_argument("--workers", type=int, default=TUNER_WORKERS)
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the evaluation cache")
+    args = parser.parse_args()
+    names = [name.strip() for name in args.only.split(",")] if args.only else None
+    for name in names or ():
+        if name not in SEARCH_SPACE:
+            parser.error(f"unknown parameter {name}; choose from {', '.join(SEARCH_SPACE)}")
+    best, baseline = tune(args.configs, args.min_battles, args.max_battles, max(2, args.eta), args.seed, names,
+                          workers=args.workers, cache_path=None if args.no_cache else TUNER_CACHE_PATH)
+    print_report(best, baseline)
+    save_result(best, baseline)
@@ -1,4 +1,5 @@
 # battle_config.py
+import os
 
 # Trump相关参数
 TRUMP_BASE_HEALTH = 100
@@ -9,6 +10,16 @@ TRUMP_MIN_MOVE_SPEED = 10
 TRUMP_ATTACK_DAMAGE = 5
 TRUMP_ATTACK_INTERVAL = 1.0
 
+# 无尽模式的敌人类型: 生命值和移动速度相对基础Trump的倍数
+ENEMY_TYPES = {
+    "trump": {"health": 1.0, "speed": 1.0},
+    "sprinter": {"health": 0.6, "speed": 1.8},
+    "tank": {"health": 2.5, "speed": 0.6},
+}
+
+# 寻路: 走进有Meme的格子的额外代价(多行棋盘上绕路更短时敌人会绕开Meme)
+PATH_MEME_COST = 3
+
 # Meme攻击相关参数
 MEME_ATTACK_INTERVAL = 2.0
 MEME_BASE_DAMAGE = 1
@@ -28,6 +39,8 @@ STAR_DAMAGE_COEFFICIENTS = {
 # 其他游戏平衡参数
 MAX_SLOW_DOWN_EFFECT = 0.75
 PROJECTILE_SIZE = (20, 20)
+# 投射物命中判定方式: "sprite" 逐帧矩形碰撞; "analytic" 发射时解析预测命中/飞出时间
+PROJECTILE_MODE = os.environ.get("MEMEVSTRUMP_PROJECTILES", "sprite")
 
 # 从config.py导入的常量
 WHITE_HOUSE_CELL_INDEX = -1 
\ No newline at end of file
@@ -0,0 +1,261 @@
+# battle_sim.py
+# 不依赖pygame的轻量战斗模拟，规则与 Game.update_game_state 一致(逐帧投射物模式)，
+# 但使用模拟时间而不是 time.time()，结果可复现。用于布阵求解和平衡性测试。
+from collections import namedtuple
+from config import (
+    FPS, NUM_CELLS, PLACEABLE_CELLS, CELL_WIDTH, GAME_BOARD_START_X, SCREEN_WIDTH,
+    TRUMP_MOVE_INTERVAL, TRUMP_SPAWN_CELL_INDEX, WHITE_HOUSE_CELL_INDEX, BOARD_SPRITE_SIZE
+)
+from battle_config import (
+    TRUMP_BASE_HEALTH, TRUMP_HEALTH_PER_LEVEL_INCREASE, TRUMP_BASE_MOVE_SPEED, TRUMP_SLOW_DOWN_RATE,
+    TRUMP_MIN_MOVE_SPEED, MAX_SLOW_DOWN_EFFECT, TRUMP_ATTACK_DAMAGE, TRUMP_ATTACK_INTERVAL,
+    MEME_ATTACK_INTERVAL, MEME_PROJECTILE_SPEED, PROJECTILE_SIZE
+)
+from meme_catalog import CATALOG, compute_stats
+
+BattleResult = namedtuple("BattleResult", ["won", "time", "trump_health", "damage_dealt", "memes_lost"])
+
+# 投射物与Trump矩形重叠时两者中心的最大水平距离(按矩形判定，游戏中两种投射物模式的像素遮罩判定命中略晚)
+_HIT_DISTANCE = (PROJECTILE_SIZE[0] + BOARD_SPRITE_SIZE[0]) // 2
+_MAX_BATTLE_TIME = 600.0
+
+# 调参工具(balance_tuner.py)可以覆盖的参数，与 battle_config 中的常量同名
+TUNABLE_PARAMETERS = (
+    "TRUMP_BASE_HEALTH", "TRUMP_HEALTH_PER_LEVEL_INCREASE", "TRUMP_BASE_MOVE_SPEED", "TRUMP_SLOW_DOWN_RATE",
+    "MAX_SLOW_DOWN_EFFECT", "TRUMP_ATTACK_DAMAGE", "TRUMP_ATTACK_INTERVAL", "MEME_ATTACK_INTERVAL",
+)
+
+
+def set_parameters(params):
+    """覆盖本模块使用的战斗参数，影响当前进程中之后的所有模拟(只在调参的工作进程中使用)
+
+    Args:
+        params (dict): 参数名 -> 值，名称必须在 TUNABLE_PARAMETERS 中
+    """
+    for name, value in params.items():
+        if name not in TUNABLE_PARAMETERS:
+            raise KeyError(f"{name} is not a tunable battle parameter")
+        globals()[name] = value
+
+
+def meme_stats(base_damage, star, name=None):
+    """返回 (单发伤害, 最大生命值)，与 MemeCard 的取值方式相同"""
+    type_id = CATALOG.find(name, star) if name is not None else None
+    if type_id is not None:
+        return CATALOG.damage[type_id], CATALOG.health[type_id]
+    return compute_stats(base_damage, star)
+
+
+def cell_center_x(index):
+    return GAME_BOARD_START_X + index * CELL_WIDTH + CELL_WIDTH // 2
+
+
+def trump_max_health(level):
+    return TRUMP_BASE_HEALTH + (level - 1) * TRUMP_HEALTH_PER_LEVEL_INCREASE
+
+
+class BattleState:
+    """一场战斗的全部可变状态
+
+    只包含数字和扁平列表，clone() 只做几次列表拷贝，适合在搜索中大量复制。
+    memes 中每个元素为 [伤害, 当前生命, 最大生命, 上次攻击时间] 或 None。
+    """
+    __slots__ = (
+        "time", "level", "max_health", "health", "position", "target", "pixel_x", "moving",
+        "retreating", "attacking", "target_cell", "last_attack", "slow", "speed", "move_timer",
+        "memes", "projectiles", "finished", "won",
+    )
+
+    def __init__(self, level):
+        self.time = 0.0
+        self.level = level
+        self.max_health = trump_max_health(level)
+        self.health = self.max_health
+        self.position = TRUMP_SPAWN_CELL_INDEX
+        self.target = TRUMP_SPAWN_CELL_INDEX
+        self.pixel_x = float(cell_center_x(TRUMP_SPAWN_CELL_INDEX))
+        self.moving = False
+        self.retreating = False
+        self.attacking = False
+        self.target_cell = None
+        self.last_attack = float("-inf")
+        self.slow = 1.0
+        self.speed = TRUMP_BASE_MOVE_SPEED  # 无尽模式的敌人类型有不同的基础速度
+        self.move_timer = 0.0
+        self.memes = [None] * NUM_CELLS
+        self.projectiles = []  # [x, 速度, 伤害]
+        self.finished = False
+        self.won = False
+
+    def clone(self):
+        other = BattleState.__new__(BattleState)
+        for name in BattleState.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.memes = [list(m) if m else None for m in self.memes]
+        other.projectiles = [list(p) for p in self.projectiles]
+        return other
+
+    def place(self, cell_index, damage, health):
+        """在空格子上放置一个Meme，成功返回 True"""
+        if not 0 <= cell_index < PLACEABLE_CELLS or self.memes[cell_index] is not None:
+            return False
+        # 与 MemeCard 相同，放下后立即可以射击
+        self.memes[cell_index] = [damage, health, health, float("-inf")]
+        return True
+
+    @classmethod
+    def from_game(cls, game):
+        """从正在进行的 Game 复制出模拟状态(冷却时间换算到模拟时间0点)"""
+        trump = game.trump_character
+        state = cls(game.current_level)
+        now = game.sim_time
+        state.max_health = trump.max_health
+        state.health = trump.current_health
+        state.position = trump.logical_position
+        state.target = trump.target_position
+        state.pixel_x = float(trump.pixel_x)
+        state.moving = trump.is_moving
+        state.retreating = trump.is_retreating
+        state.last_attack = trump.last_attack_time - now
+        state.slow = trump.slow_down_factor
+        state.speed = trump.base_move_speed
+        state.move_timer = game.trump_move_timer_accumulator
+        for index, cell in enumerate(game.game_board.cells):
+            meme = cell.meme
+            if meme:
+                state.memes[index] = [meme.get_attack_damage(), meme.current_health, meme.max_health,
+                                      meme.last_attack_time - now]
+                if trump.target_meme is meme:
+                    state.attacking = trump.is_attacking
+                    state.target_cell = index
+        if game.projectile_resolver:
+            for shot in game.projectile_resolver.shots:
+                x, _ = shot.position(game.projectile_resolver.time)
+                state.projectiles.append([x, shot.vx, shot.damage])
+        else:
+            for p in game.projectiles.sprites():
+                state.projectiles.append([p.x, p.dx, p.damage])
+        return state
+
+
+def step(state, dt):
+    """推进一帧，顺序与 Game.update_game_state 相同"""
+    if state.finished:
+        return
+    state.time += dt
+    now = state.time
+    state.move_timer += dt
+    memes = state.memes
+
+    # 1. Trump前方有存活的Meme时开始攻击
+    ahead = state.position - 1
+    if not state.retreating and not state.moving and not state.attacking and 0 <= ahead < NUM_CELLS:
+        meme = memes[ahead]
+        if meme and meme[1] > 0:
+            state.attacking = True
+            state.target_cell = ahead
+
+    # 2. 攻击目标Meme(死亡的Meme从格子上移除，不再射击，与游戏的 cell.remove_meme() 一致)
+    if state.attacking and now - state.last_attack >= TRUMP_ATTACK_INTERVAL:
+        meme = memes[state.target_cell]
+        meme[1] = max(0, meme[1] - TRUMP_ATTACK_DAMAGE)
+        state.last_attack = now
+        if meme[1] <= 0:
+            memes[state.target_cell] = None
+            state.attacking = False
+            state.target_cell = None
+
+    # 3. 移动
+    if state.move_timer >= TRUMP_MOVE_INTERVAL and not state.moving and not state.attacking:
+        if state.retreating:
+            if state.position < TRUMP_SPAWN_CELL_INDEX:
+                state.target = state.position + 1
+                state.moving = True
+        elif state.position > WHITE_HOUSE_CELL_INDEX:
+            state.target = state.position - 1
+            state.moving = True
+        state.move_timer = 0.0
+    if state.moving:
+        speed = max(TRUMP_MIN_MOVE_SPEED, state.speed * state.slow)
+        target_x = cell_center_x(state.target)
+        if target_x > state.pixel_x:
+            state.pixel_x += speed * dt
+            arrived = state.pixel_x >= target_x
+        else:
+            state.pixel_x -= speed * dt
+            arrived = state.pixel_x <= target_x
+        if arrived:
+            state.pixel_x = float(target_x)
+            state.position = state.target
+            state.moving = False
+
+    # 4. Meme射击
+    trump_x = int(state.pixel_x + 0.5)  # 与 Rect.centerx 的取整方式一致
+    if not state.retreating and state.position < NUM_CELLS:
+        for index in range(NUM_CELLS):
+            meme = memes[index]
+            if meme and now - meme[3] >= MEME_ATTACK_INTERVAL:
+                origin = cell_center_x(index)
+                velocity = MEME_PROJECTILE_SPEED if trump_x >= origin else -MEME_PROJECTILE_SPEED
+                state.projectiles.append([float(origin), velocity, meme[0]])
+                meme[3] = now
+
+    # 5. 投射物移动、命中和越界
+    if state.projectiles:
+        remaining = []
+        for projectile in state.projectiles:
+            projectile[0] += projectile[1] * dt
+            x = int(projectile[0])
+            if abs(x - trump_x) < _HIT_DISTANCE:
+                if not state.retreating:
+                    state.health -= projectile[2]
+                    state.slow = max(1 - MAX_SLOW_DOWN_EFFECT, state.slow * (1 - TRUMP_SLOW_DOWN_RATE))
+                    if state.health <= 0:
+                        state.health = 0
+                        state.retreating = True
+            elif -PROJECTILE_SIZE[0] // 2 <= x <= SCREEN_WIDTH + PROJECTILE_SIZE[0] // 2:
+                remaining.append(projectile)
+        state.projectiles = remaining
+
+    # 7. 回合结束
+    if not state.moving:
+        if not state.retreating and state.position <= WHITE_HOUSE_CELL_INDEX:
+            state.finished = True
+            state.won = False
+        elif state.retreating and state.position >= TRUMP_SPAWN_CELL_INDEX:
+            state.finished = True
+            state.won = True
+
+
+def run_battle(state, dt=1.0 / FPS, max_time=_MAX_BATTLE_TIME):
+    """把状态推进到回合结束(或超时)
+
+    Returns:
+        BattleResult
+    """
+    start_time = state.time
+    start_health = state.health
+    start_memes = sum(1 for meme in state.memes if meme)
+    limit = start_time + max_time
+    while not state.finished and state.time < limit:
+        step(state, dt)
+    memes_lost = start_memes - sum(1 for meme in state.memes if meme)
+    return BattleResult(state.won, state.time - start_time, state.health,
+                        start_health - state.health, memes_lost)
+
+
+def simulate_battle(level, board, dt=1.0 / FPS):
+    """从关卡开始模拟一场战斗
+
+    Args:
+        level (int): 关卡
+        board: 每个可放置格子的 (伤害, 生命值) 或 None
+
+    Returns:
+        BattleResult
+    """
+    state = BattleState(level)
+    for index, stats in enumerate(board):
+        if stats:
+            state.place(index, *stats)
+    return run_battle(state, dt)
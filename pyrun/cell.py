@@ -1,13 +1,15 @@
 # cell.py
 import pygame
 from config import CELL_WIDTH, CELL_HEIGHT, IMAGE_PATHS, load_image, GREY, WHITE
+from render_backend import draw_rect
 
 
 class Cell:
-    def __init__(self, x, y, width, height, is_placeable=True):
+    def __init__(self, x, y, width, height, is_placeable=True, on_change=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.meme = None  # Stores a MemeCard object or None
         self.is_placeable = is_placeable
+        self.on_change = on_change  # Called as on_change(cell) when a meme is planted or removed
         self.bg_image = load_image(IMAGE_PATHS["cell_bg"], size=(width, height))  # Background for each cell
 
     def plant_meme(self, meme_card_instance):  # Expecting an actual MemeCard instance
@@ -15,22 +17,27 @@ class Cell:
             self.meme = meme_card_instance
             # Adjust meme's position to be centered within the cell
             self.meme.rect.center = self.rect.center
+            if self.on_change:
+                self.on_change(self)
             return True
         return False
 
     def remove_meme(self):
-        self.meme = None
+        if self.meme is not None:
+            self.meme = None
+            if self.on_change:
+                self.on_change(self)
 
-    def draw(self, surface):
+    def draw(self, surface, draw_meme=True):
         # Draw cell background image or a simple rectangle
         if self.bg_image:
             surface.blit(self.bg_image, self.rect.topleft)
         else:  # Fallback to drawing a colored rectangle
             color = WHITE if self.is_placeable else GREY
-            pygame.draw.rect(surface, color, self.rect)
+            draw_rect(surface, color, self.rect)
 
-        pygame.draw.rect(surface, (50, 50, 50), self.rect, 1)  # Border for the cell
+        draw_rect(surface, (50, 50, 50), self.rect, 1)  # Border for the cell
 
-        if self.meme:
+        if draw_meme and self.meme:
             # The meme's rect should already be set correctly by plant_meme or externally
             self.meme.draw(surface, self.meme.rect.x, self.meme.rect.y)  # Draw meme if present
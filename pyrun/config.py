@@ -1,6 +1,7 @@
 # config.py
 import pygame
 import os # <--- 添加导入
+from fonts import get_font
 
 # --- Determine the absolute path to the directory config.py is in ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -10,6 +11,21 @@ ASSETS_DIR = os.path.join(BASE_DIR, "assets") # <--- 构建assets文件夹的绝
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 30 # Frames per second
+UNFOCUSED_FPS = 5 # Frame rate while the window is unfocused or minimized
+ADAPTIVE_FRAME_PACING = True # Block on events when nothing animates and slow down when unfocused
+PIPELINED_GAME_LOOP = os.environ.get("MEMEVSTRUMP_PIPELINED") == "1" # Simulate on a worker thread, render on the main thread
+INPUT_COMMAND_QUEUE_SIZE = 64 # Input events buffered from the render thread to the simulation thread
+LOW_LATENCY_INPUT = os.environ.get("MEMEVSTRUMP_LOW_LATENCY") == "1" # Wake the frame early on input instead of sleeping through it
+RENDER_BACKEND = os.environ.get("MEMEVSTRUMP_RENDERER", "surface") # "surface" (software blits) or "renderer" (SDL Renderer/Texture)
+RENDERER_ACCELERATED = -1 # -1: let SDL pick (GPU if available, else its software renderer), 0: software only, 1: GPU only
+RENDERER_VSYNC = False
+DISPLAY_SCALE_MODE = os.environ.get("MEMEVSTRUMP_SCALE_MODE", "fractional") # Resizable window: "fractional", "integer" or "off" (fixed 1024x768)
+SIM_STEP = 1.0 / FPS # Fixed simulation step in seconds; every game speed runs the same steps
+TIME_SCALES = (1, 2, 4, 8, 0) # Selectable game speeds, 0 = as fast as possible
+MAX_SPEED_FRAME_BUDGET = 0.03 # Seconds of simulation per rendered frame at max speed / "run to end"
+MAX_CATCH_UP_STEPS = 4 # Steps per frame (times the speed) before the simulation drops time instead of spiralling
+ENDLESS_MODE = os.environ.get("MEMEVSTRUMP_ENDLESS") == "1" # Levels are waves from WAVE_DEFINITIONS_PATH and follow each other until Trump reaches the White House
+ENDLESS_WAVE_BREAK = 3.0 # Seconds of simulation time between two waves in endless mode
 
 # --- Colors (RGB) ---
 WHITE = (255, 255, 255)
@@ -26,10 +42,9 @@ TRUMP_HEALTH_PER_LEVEL_INCREASE = 50
 TRUMP_MOVE_INTERVAL = 4  # seconds per cell (will translate to game ticks)
 GAME_TICK_DURATION = 1   # Not directly used in Pygame loop same way, FPS controls timing
 
-STAR_COEFFICIENTS = {1: 1.0, 2: 1.2, 3: 1.5, 4: 2.0, 5: 2.5}
-
 NUM_CELLS = 7
 PLACEABLE_CELLS = 5
+NUM_LANES = 1 # Rows of cells Trump walks along (spawn schedules address lanes by index)
 WHITE_HOUSE_CELL_INDEX = -1 # Conceptually Trump wins if he reaches this logical position
 TRUMP_SPAWN_CELL_INDEX = NUM_CELLS - 1
 
@@ -48,6 +63,92 @@ COLLECTION_UI_Y = SCREEN_HEIGHT - MEME_CARD_UI_HEIGHT - 20
 BUTTON_WIDTH = 150
 BUTTON_HEIGHT = 50
 
+# --- Player Profile Storage ---
+PROFILE_DB_PATH = os.path.join(BASE_DIR, "saves", "profile.db")
+PROFILE_FLUSH_INTERVAL = 0.5 # seconds the background writer waits to batch writes
+PROFILE_FLUSH_BATCH_SIZE = 256
+COLLECTION_PAGE_SIZE = (SCREEN_WIDTH - COLLECTION_UI_X) // (MEME_CARD_UI_WIDTH + 10) # cards visible at once
+
+# --- Leaderboard Service (python leaderboard_server.py) ---
+LEADERBOARD_LOG_PATH = os.path.join(BASE_DIR, "saves", "leaderboard.log") # append-only JSON lines, compacted in the background
+LEADERBOARD_FLUSH_INTERVAL = 0.5 # seconds the background writer waits to batch log records
+LEADERBOARD_COMPACT_MIN_RECORDS = 10000 # compact once the log has this many records and twice as many as players
+LEADERBOARD_HOST = "127.0.0.1"
+LEADERBOARD_PORT = 3002
+LEADERBOARD_URL = os.environ.get("MEMEVSTRUMP_LEADERBOARD_URL", "") # e.g. http://127.0.0.1:3002; empty: the game does not report results
+
+# --- Penalties (local view of the penalty_system contract) ---
+PENALTY_EVENT_LOG_PATH = os.path.join(BASE_DIR, "saves", "penalty_events.jsonl") # PenaltyApplied/PenaltyRevoked events, one JSON per line
+
+# --- Local Chain Stand-in (python local_chain.py) ---
+LOCAL_CHAIN_BATCH_SIZE = 64 # transactions executed per simulated block
+LOCAL_CHAIN_BATCH_WAIT = 0.002 # seconds the block builder waits for more transactions
+LOCAL_CHAIN_LATENCY = 0.0 # simulated network + finality delay per block, in seconds
+
+# --- Side Effects (blocking work triggered from UI handlers) ---
+SIDE_EFFECT_WORKERS = 2 # background threads running browser launches and similar calls
+SIDE_EFFECT_QUEUE_SIZE = 16 # queued operations before new ones are rejected
+SIDE_EFFECT_MAX_SAMPLES = 1000 # queue-wait/run timings kept for the report
+SIDE_EFFECT_CLOSE_TIMEOUT = 2.0 # seconds to wait for running operations at exit
+
+# --- Placement Solver ---
+PLACEMENT_SOLVER_TIME_BUDGET = 0.5 # seconds per "suggest placement" search
+PLACEMENT_SOLVER_BEAM_WIDTH = 8 # partial boards kept per step of the search
+
+# --- Balance Tuner (python balance_tuner.py) ---
+TUNER_CACHE_PATH = os.path.join(BASE_DIR, "saves", "tuner_cache.jsonl") # evaluated battles, appended as they finish; reruns resume from it
+TUNER_RESULT_PATH = os.path.join(BASE_DIR, "saves", "tuned_battle_config.json") # best parameters found
+TUNER_TARGET_WIN_RATES = (0.95, 0.9, 0.85, 0.8, 0.7, 0.6, 0.5, 0.45, 0.4, 0.35) # wanted win rate of random boards, levels 1..N
+TUNER_WORKERS = os.cpu_count() or 1 # battle simulation processes
+TUNER_CHUNK_SIZE = 32 # battles per task sent to a worker
+
+# --- Startup Metrics ---
+STARTUP_METRICS_PATH = os.path.join(BASE_DIR, "saves", "startup_metrics.jsonl") # one JSON record per launch
+
+# --- Combat Analytics (event bus -> compressed JSONL) ---
+ANALYTICS_ENABLED = os.environ.get("MEMEVSTRUMP_ANALYTICS", "1") != "0"
+ANALYTICS_DIR = os.path.join(BASE_DIR, "saves", "analytics")
+ANALYTICS_MAX_FILE_BYTES = 1024 * 1024 # compressed size at which a new .jsonl.gz file is started
+ANALYTICS_MAX_FILES = 20 # oldest files beyond this are deleted
+ANALYTICS_FLUSH_INTERVAL = 1.0 # seconds the background writer waits to batch events
+ANALYTICS_BATCH_SIZE = 512
+
+# --- Input Latency Tracing (F7 starts/stops) ---
+LATENCY_TRACE_ENABLED = os.environ.get("MEMEVSTRUMP_LATENCY_TRACE") == "1"
+LATENCY_REPORT_DIR = os.path.join(BASE_DIR, "saves")
+LATENCY_MAX_SAMPLES = 10000 # per event type
+
+# --- Battle Recording (F6 starts/stops, or headless: python frame_capture.py --level N) ---
+CAPTURE_DIR = os.path.join(BASE_DIR, "saves", "captures")
+CAPTURE_FPS = FPS # frames recorded per second of simulation time, independent of the display rate
+CAPTURE_FORMAT = "png" # "png" (numbered PNG files) or "raw" (one rgb0 rawvideo file for ffmpeg)
+CAPTURE_RING_SIZE = 8 # shared-memory frame slots; frames are dropped instead of waiting when all are busy
+CAPTURE_WORKERS = min(4, os.cpu_count() or 1) # encoder processes
+
+# --- Sprite Effects (frames baked once, chosen by simulation time) ---
+SPRITE_EFFECTS_ENABLED = os.environ.get("MEMEVSTRUMP_EFFECTS", "1") != "0" # Hit flash, damage tint, mirrored retreat, walk sway
+EFFECT_CACHE_MAX_BYTES = 16 * 1024 * 1024 # pixel memory of baked variant frames before the least recently used are dropped
+HIT_FLASH_TIME = 0.2 # seconds a hit flash takes to fade
+HIT_FLASH_LEVELS = 3 # brightness steps of the fading flash
+DAMAGE_TINT_LEVELS = 4 # red tint steps as a meme loses health
+WALK_FRAME_TIME = 0.25 # seconds per walk frame while Trump moves between cells
+WALK_ANGLES = (0, 4, 0, -4) # sway of the walk frames in degrees
+
+# --- Projectile Collision (sprite projectile mode) ---
+MASK_COLLISION_ENABLED = os.environ.get("MEMEVSTRUMP_MASK_COLLISION", "1") != "0" # Pixel-exact hits after the rect check; "0" counts hits on transparent margins too
+MASK_ALPHA_THRESHOLD = 127 # pixels with higher alpha are solid for hit detection
+
+# --- Memory Accounting (F9 overlay, F10 JSON dump) ---
+MEMORY_STATS_ENABLED = os.environ.get("MEMEVSTRUMP_MEMSTATS") == "1" # Track surfaces/entities from startup and run tracemalloc
+MEMORY_TRACE_FRAMES = 4 # Stack depth recorded by tracemalloc
+MEMORY_DUMP_DIR = os.path.join(BASE_DIR, "saves")
+MEMORY_OVERLAY_REFRESH = 1.0 # seconds between overlay recomputations
+
+# --- Profiler Capture (F8 starts/stops) ---
+PROFILE_MODE = os.environ.get("MEMEVSTRUMP_PROFILE", "") # "1": capture the whole session, "level": only the first level
+PROFILE_OUTPUT_DIR = os.path.join(BASE_DIR, "saves", "profiles") # .pstats and .collapsed (flamegraph) files
+PROFILE_SAMPLE_INTERVAL = 0.002 # seconds between stack samples for the collapsed output
+
 # --- Image Asset Paths (REPLACE WITH YOUR ACTUAL PATHS) ---
 # Create an 'assets' folder in your project directory for these
 # ASSET_PATH = "assets/" # No longer used directly like this
@@ -60,21 +161,51 @@ IMAGE_PATHS = {
     "Stonks": os.path.join(ASSETS_DIR, "stonks.png"),
     "Grumpy Cat": os.path.join(ASSETS_DIR, "grumpy_cat.png"),
     "Distracted BF": os.path.join(ASSETS_DIR, "distracted_bf.png"),
-    "default_meme": os.path.join(ASSETS_DIR, "default_meme.png")
+    "default_meme": os.path.join(ASSETS_DIR, "default_meme.png"),
+    "begin": os.path.join(ASSETS_DIR, "begin", "begin.png")
 }
 
-# Predefined Meme types (name, base_damage, star_rating, image_key - refers to IMAGE_PATHS)
-PREDEFINED_MEMES_POOL = [
-    {"name": "Pepe", "base_damage": 15, "star": 4, "image_key": "Pepe"},
-    {"name": "Doge", "base_damage": 10, "star": 3, "image_key": "Doge"},
-    {"name": "Stonks", "base_damage": 20, "star": 5, "image_key": "Stonks"},
-    {"name": "Grumpy Cat", "base_damage": 8, "star": 2, "image_key": "Grumpy Cat"},
-    {"name": "Distracted BF", "base_damage": 5, "star": 1, "image_key": "Distracted BF"},
+# Fixed sizes the images are scaled to (used by the screens and by the asset bundle)
+BOARD_SPRITE_SIZE = (CELL_WIDTH - 10, CELL_HEIGHT - 10) # Trump and memes placed on the board
+LOADING_TRUMP_SIZE = (150, 200)
+BEGIN_IMAGE_SIZE = (int(SCREEN_WIDTH * 0.8), int(SCREEN_HEIGHT * 0.5))
+
+# --- Pre-scaled Asset Bundle ---
+# Every (image_key, size) pair the game loads; asset_bundle.py packs them pre-decoded into one file
+ASSET_BUNDLE_PATH = os.path.join(BASE_DIR, "build", "assets.bundle")
+ASSET_BUNDLE_VARIANTS = [
+    ("white_house", (WHITE_HOUSE_WIDTH, CELL_HEIGHT * 2)),
+    ("trump", BOARD_SPRITE_SIZE),
+    ("trump", LOADING_TRUMP_SIZE),
+    ("cell_bg", (CELL_WIDTH, CELL_HEIGHT)),
+    ("begin", BEGIN_IMAGE_SIZE),
+] + [
+    (key, size)
+    for key in ("Pepe", "Doge", "Stonks", "Grumpy Cat", "Distracted BF", "default_meme")
+    for size in ((MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT), BOARD_SPRITE_SIZE)
 ]
 
+# Meme types are defined in the catalog file and compiled by meme_catalog.py
+# (name, base_damage, star, rarity, image_key - refers to IMAGE_PATHS, drop_rate)
+MEME_CATALOG_PATH = os.path.join(BASE_DIR, "data", "memes.json")
+
+# Endless-mode waves are defined in this file and compiled by waves.py into one flat spawn schedule
+WAVE_DEFINITIONS_PATH = os.path.join(BASE_DIR, "data", "waves.json")
+
 # Helper function to load images (and handle missing images)
 def load_image(path, size=None):
+    image = _load_image(path, size)
+    import memory_stats # Records the surface when memory accounting is on
+    return memory_stats.track_surface(image, os.path.basename(path))
+
+def _load_image(path, size=None):
     # The 'path' received here will now be an absolute path from IMAGE_PATHS
+    if size:
+        # Pre-scaled variants come straight from the memory-mapped bundle, no PNG decoding
+        import asset_bundle
+        bundled = asset_bundle.get_surface(path, size)
+        if bundled is not None:
+            return bundled
     try:
         image = pygame.image.load(path)
         if path.endswith(".png"): # Ensure alpha transparency for PNGs
@@ -91,7 +222,7 @@ def load_image(path, size=None):
         surface = pygame.Surface(fallback_size)
         surface.fill(RED) # Fill with a noticeable color like red
         # Draw a small 'X' or '?' on the placeholder
-        font = pygame.font.SysFont(None, fallback_size[0]//2)
+        font = get_font(fallback_size[0]//2)
         text_surf = font.render("X", True, BLACK)
         text_rect = text_surf.get_rect(center=(fallback_size[0]//2, fallback_size[1]//2))
         surface.blit(text_surf, text_rect)
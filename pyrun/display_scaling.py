@@ -0,0 +1,234 @@
+# display_scaling.py
+# 逻辑分辨率绘制: 游戏始终按 config 中的 SCREEN_WIDTH x SCREEN_HEIGHT 坐标绘制，
+# 窗口可以任意缩放。ScaledCanvas 把逻辑坐标换算到窗口，居中并留黑边。
+#   integer     整数倍缩放(最近邻，像素清晰)；窗口小于逻辑分辨率时退回小数倍
+#   fractional  按窗口大小等比缩放(平滑)
+#
+# 每个图片/文字表面按当前比例缩放一次，之后直接 blit 缩放好的版本，大窗口每帧的开销与
+# 1024x768 相同。窗口尺寸改变时在后台线程重建全部缩放版本；重建完成之前先画在逻辑分辨率
+# 的表面上再整帧缩放，重建完成后在下一次 present() 时切换。
+#
+# 比较每帧耗时: python display_scaling.py
+import threading
+import time
+import weakref
+import pygame
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK
+
+
+def scale_surface(surface, scale, smooth):
+    """按比例缩放一个表面
+
+    Args:
+        surface (pygame.Surface): 源表面
+        scale (float): 缩放比例
+        smooth (bool): True 用平滑缩放，False 用最近邻
+    """
+    size = (max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale)))
+    if smooth:
+        try:
+            return pygame.transform.smoothscale(surface, size)
+        except ValueError:  # smoothscale 只支持24/32位表面
+            pass
+    return pygame.transform.scale(surface, size)
+
+
+def fit_scale(window_size, logical_size, mode):
+    """逻辑画面放进窗口时的缩放比例和左上角偏移
+
+    Returns:
+        tuple: (scale, (offset_x, offset_y))
+    """
+    fit = min(window_size[0] / logical_size[0], window_size[1] / logical_size[1])
+    scale = float(int(fit)) if mode == "integer" and fit >= 1 else fit
+    width, height = round(logical_size[0] * scale), round(logical_size[1] * scale)
+    return scale, ((window_size[0] - width) // 2, (window_size[1] - height) // 2)
+
+
+class ScaledCanvas:
+    """按逻辑坐标绘制到窗口的画布，接口与游戏用到的 Surface 方法一致
+
+    Args:
+        window (pygame.Surface): 显示表面
+        logical_size (tuple): 逻辑分辨率
+        mode (str): "integer" 或 "fractional"
+    """
+
+    def __init__(self, window, logical_size=(SCREEN_WIDTH, SCREEN_HEIGHT), mode="fractional"):
+        self.size = tuple(logical_size)
+        self.mode = mode
+        self.smooth = mode != "integer"
+        self.logical = pygame.Surface(self.size)  # 缩放版本就绪之前的绘制目标，也是加载页/开始页的画面
+        self.window = window
+        self.scale = 1.0
+        self.offset = (0, 0)
+        self.viewport = pygame.Rect((0, 0), self.size)
+        self.rebuilds = 0
+        self._target = self.logical  # 本帧的绘制目标: self.logical 或 self.window
+        self._sources = weakref.WeakSet()  # 画过的源表面，窗口缩放时全部重建
+        self._variants = weakref.WeakKeyDictionary()  # 源表面 -> 当前比例的缩放版本
+        self._pending = None  # 后台重建完成的 (generation, variants)
+        self._generation = 0
+        self.resize(window.get_size())
+
+    def resize(self, window_size):
+        """窗口尺寸改变(处理 VIDEORESIZE 时调用)"""
+        self.window = pygame.display.get_surface() or self.window
+        scale, offset = fit_scale(window_size, self.size, self.mode)
+        self.offset = offset
+        self.viewport = pygame.Rect(offset, (round(self.size[0] * scale), round(self.size[1] * scale)))
+        self.window.fill(BLACK)  # 黑边
+        if scale == self.scale and self._generation:
+            return  # 只是位置变了，缩放版本仍然可用(或正在按这个比例重建)
+        self.scale = scale
+        self._generation += 1
+        self._pending = None
+        if scale == 1.0:
+            # 原尺寸直接 blit 源表面
+            self._variants = weakref.WeakKeyDictionary()
+            self._target = self.window
+            return
+        self._target = self.logical
+        # 缩放时会锁定源表面，主线程同时 blit 同一个表面会失败，所以后台线程只读取副本
+        sources = [(source, source.copy()) for source in list(self._sources)]
+        threading.Thread(target=self._rebuild, args=(self._generation, scale, sources),
+                         name="ScaledAssets", daemon=True).start()
+
+    def _rebuild(self, generation, scale, sources):
+        variants = weakref.WeakKeyDictionary()
+        for source, pixels in sources:
+            if generation != self._generation:
+                return  # 窗口又改变了，放弃这一次
+            variants[source] = scale_surface(pixels, scale, self.smooth)
+        self._pending = (generation, variants)
+
+    def _variant(self, source):
+        variant = self._variants.get(source)
+        if variant is None:
+            # 重建之后才出现的表面(例如新的文字)，当场缩放一次
+            variant = self._variants[source] = scale_surface(source, self.scale, self.smooth)
+        return variant
+
+    def _to_window(self, rect):
+        scale = self.scale
+        left = self.offset[0] + round(rect[0] * scale)
+        top = self.offset[1] + round(rect[1] * scale)
+        right = self.offset[0] + round((rect[0] + rect[2]) * scale)
+        bottom = self.offset[1] + round((rect[1] + rect[3]) * scale)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def to_logical(self, pos):
+        """窗口坐标换算为逻辑坐标"""
+        return (int((pos[0] - self.offset[0]) / self.scale), int((pos[1] - self.offset[1]) / self.scale))
+
+    def get_size(self):
+        return self.size
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        self._sources.add(source)
+        target = self._target
+        if target is self.logical:
+            return target.blit(source, dest, area, special_flags)
+        if self.scale == 1.0:
+            return target.blit(source, (dest[0] + self.offset[0], dest[1] + self.offset[1]), area, special_flags)
+        scale = self.scale
+        position = (self.offset[0] + round(dest[0] * scale), self.offset[1] + round(dest[1] * scale))
+        if area is not None:
+            area = pygame.Rect(area)
+            area = pygame.Rect(round(area.x * scale), round(area.y * scale),
+                               round(area.w * scale), round(area.h * scale))
+        return target.blit(self._variant(source), position, area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = [self.blit(item[0], item[1], *item[2:]) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None):
+        if self._target is self.logical:
+            return self.logical.fill(color, rect)
+        return self.window.fill(color, self.viewport if rect is None else self._to_window(pygame.Rect(rect)))
+
+    def draw_rect(self, color, rect, width=0):
+        """与 pygame.draw.rect 相同，宽度按比例缩放"""
+        if self._target is self.logical:
+            return pygame.draw.rect(self.logical, color, rect, width)
+        if width > 0:
+            width = max(1, round(width * self.scale))
+        return pygame.draw.rect(self.window, color, self._to_window(pygame.Rect(rect)), width)
+
+    def present(self):
+        """显示本帧；后台重建完成时从下一帧起改为直接绘制缩放版本"""
+        if self._target is self.logical:
+            self.present_logical()
+        else:
+            pygame.display.flip()
+        pending = self._pending
+        if pending is not None and pending[0] == self._generation:
+            self._pending = None
+            self._variants = pending[1]
+            self._target = self.window
+            self.rebuilds += 1
+
+    def present_logical(self):
+        """把逻辑分辨率的画面整帧缩放到窗口并显示"""
+        if self.scale == 1.0:
+            self.window.blit(self.logical, self.offset)
+        elif self.smooth:
+            pygame.transform.smoothscale(self.logical, self.viewport.size, self.window.subsurface(self.viewport))
+        else:
+            pygame.transform.scale(self.logical, self.viewport.size, self.window.subsurface(self.viewport))
+        pygame.display.flip()
+
+
+def benchmark(window_size=(2048, 1536), frames=200):
+    """比较原尺寸、整帧缩放和预缩放版本三种方式的每帧耗时(无窗口运行)"""
+    import os
+    import io
+    import contextlib
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    from game import Game
+    from meme_card import MemeCard
+    from meme_catalog import CATALOG
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game(screen=pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+        game.setup_level(2)
+        for cell_index, template in enumerate(CATALOG.templates[:5]):
+            game.game_board.get_cell_by_index(cell_index).plant_meme(
+                MemeCard(template["name"], template["base_damage"], template["star"], template["image_key"]))
+        for _ in range(60):
+            game.update_game_state(1.0 / 30)
+
+    def run(canvas, finish):
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.draw_frame(canvas)
+            finish()
+        return (time.perf_counter() - start) / frames * 1000.0
+
+    canvas = ScaledCanvas(pygame.display.get_surface(), mode="fractional")
+    native = run(canvas, canvas.present)
+    pygame.display.set_mode(window_size)
+    canvas.resize(window_size)  # 后台开始重建，期间整帧缩放
+    whole_frame = run(canvas, canvas.present_logical)
+    while canvas._pending is None:
+        time.sleep(0.001)
+    canvas.present()
+    pre_scaled = run(canvas, canvas.present)
+    game.close()
+    print(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT} native:      {native:.2f} ms/frame")
+    print(f"{window_size[0]}x{window_size[1]} whole frame: {whole_frame:.2f} ms/frame")
+    print(f"{window_size[0]}x{window_size[1]} pre-scaled:  {pre_scaled:.2f} ms/frame "
+          f"({len(canvas._variants)} variants)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,70 @@
+# event_bus.py
+# 进程内的类型化事件总线。每种事件是一个 namedtuple 类型，订阅和发布都以类型为主题。
+# 发布方调用 BUS.emit(事件类型, 字段...)，没有订阅者时只做一次字典查找，不创建事件对象。
+from collections import namedtuple
+
+# time 均为 Game.sim_time(秒)
+LevelStarted = namedtuple("LevelStarted", ["time", "level", "trump_health"])
+MemePlaced = namedtuple("MemePlaced", ["time", "level", "cell", "name", "star"])
+ShotFired = namedtuple("ShotFired", ["time", "level", "cell", "name", "damage"])
+TrumpHit = namedtuple("TrumpHit", ["time", "level", "source", "damage", "health"])
+MemeDefeated = namedtuple("MemeDefeated", ["time", "level", "cell", "name"])
+TrumpRetreating = namedtuple("TrumpRetreating", ["time", "level"])
+WhiteHouseReached = namedtuple("WhiteHouseReached", ["time", "level"])
+LevelCleared = namedtuple("LevelCleared", ["time", "level"])
+CardDrawn = namedtuple("CardDrawn", ["player_id", "name", "star", "cost", "currency"])
+# 由 analytics.LevelAnalytics 在关卡结束时发布
+LevelSummary = namedtuple("LevelSummary", [
+    "level", "won", "duration", "time_to_kill", "damage_by_type", "shots_by_type", "memes_lost",
+])
+
+EVENT_TYPES = (
+    LevelStarted, MemePlaced, ShotFired, TrumpHit, MemeDefeated, TrumpRetreating,
+    WhiteHouseReached, LevelCleared, CardDrawn, LevelSummary,
+)
+
+
+class EventBus:
+    """按事件类型分发的同步事件总线
+
+    处理函数在发布方的线程上同步调用，应当很快返回(例如只把事件放进队列)。
+    订阅列表是不可变的元组，订阅/退订时整体替换，发布过程中修改订阅不会影响本次分发。
+    """
+
+    def __init__(self):
+        self._handlers = {}  # 事件类型 -> 处理函数元组
+
+    def subscribe(self, event_type, handler):
+        """订阅一种事件
+
+        Returns:
+            callable: 调用即可退订
+        """
+        self._handlers[event_type] = self._handlers.get(event_type, ()) + (handler,)
+        return lambda: self.unsubscribe(event_type, handler)
+
+    def subscribe_all(self, handler, event_types=EVENT_TYPES):
+        """订阅多种事件，返回一个退订全部的函数"""
+        unsubscribers = [self.subscribe(event_type, handler) for event_type in event_types]
+        return lambda: [unsubscribe() for unsubscribe in unsubscribers]
+
+    def unsubscribe(self, event_type, handler):
+        handlers = tuple(h for h in self._handlers.get(event_type, ()) if h is not handler)
+        if handlers:
+            self._handlers[event_type] = handlers
+        else:
+            self._handlers.pop(event_type, None)
+
+    def has_subscribers(self, event_type):
+        return event_type in self._handlers
+
+    def emit(self, event_type, *fields):
+        """发布事件；没有订阅者时不创建事件对象"""
+        handlers = self._handlers.get(event_type)
+        if handlers:
+            event = event_type(*fields)
+            for handler in handlers:
+                handler(event)
+
+
+BUS = EventBus()
@@ -0,0 +1,56 @@
+# fonts.py
+import pygame
+from collections import OrderedDict
+
+# 每个 (字体名, 字号) 只创建一次 Font 对象
+_fonts = {}
+
+# 渲染好的文字表面缓存(LRU)，静态按钮文字和不常变化的分数每帧直接复用
+TEXT_CACHE_SIZE = 256
+_text_cache = OrderedDict()
+
+
+def get_font(size, name=None):
+    """获取共享的字体对象
+
+    Args:
+        size (int): 字号
+        name (str, optional): 系统字体名，None 表示pygame默认字体
+
+    Returns:
+        pygame.font.Font: 同一 (name, size) 总是返回同一个对象
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text, size, color, background=None, name=None):
+    """渲染文字并缓存结果
+
+    返回的表面是共享的，调用方只能 blit，不能在上面绘制。
+
+    Returns:
+        pygame.Surface: 渲染好的文字
+    """
+    key = (text, size, name, tuple(color), tuple(background) if background else None)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    surface = get_font(size, name).render(text, True, color, background)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+
+def clear_cache():
+    """清空字体和文字缓存(例如 pygame.quit() 之后)"""
+    _fonts.clear()
+    _text_cache.clear()
@@ -0,0 +1,236 @@
+# frame_capture.py
+# 战斗录像: 按固定的模拟帧率把画面绘制到离屏表面，由进程池编码为PNG序列或原始视频。
+# 离屏表面直接建立在共享内存的环形缓冲区上，绘制即写入共享内存，不再拷贝；
+# 编码进程按共享内存名称和偏移读取像素。所有槽位都在编码时丢弃该帧，游戏不会等待编码。
+#
+# 无窗口录制一关: python frame_capture.py --level 3 [--board Pepe,Doge,,Stonks] [--format raw]
+# 不指定 --board 时使用布阵求解器给出的最佳方案。
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pygame
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, CAPTURE_DIR, CAPTURE_FPS, CAPTURE_FORMAT, CAPTURE_RING_SIZE, CAPTURE_WORKERS
+)
+
+PIXEL_FORMAT = "RGBX"  # 每像素4字节，原始视频对应 ffmpeg 的 rgb0
+_RAW_FILE_NAME = "frames.rgb0"
+
+_attached = {}  # 编码进程中已打开的共享内存: 名称 -> SharedMemory
+
+
+def _encode_frame(shm_name, offset, size, fmt, path, index):
+    """在编码进程中执行: 把共享内存中的一帧写成PNG，或写到原始视频文件中对应的位置"""
+    shm = _attached.get(shm_name)
+    if shm is None:
+        shm = _attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    frame_bytes = size[0] * size[1] * 4
+    pixels = shm.buf[offset:offset + frame_bytes]
+    try:
+        if fmt == "png":
+            surface = pygame.image.frombuffer(pixels, size, PIXEL_FORMAT)
+            pygame.image.save(surface, path)
+            del surface
+        else:
+            # 每帧写到固定偏移，多个进程可以乱序写同一个文件
+            with open(path, "r+b") as f:
+                f.seek(index * frame_bytes)
+                f.write(pixels)
+    finally:
+        pixels.release()
+    return index
+
+
+class FrameCapture:
+    """按模拟时间录制画面
+
+    Args:
+        size (tuple): 画面尺寸
+        fps (float): 每秒模拟时间录制的帧数
+        fmt (str): "png" 或 "raw"
+        output_dir (str): 每次录制在其中新建一个目录
+        ring_size (int): 共享内存中的帧槽位数量
+        workers (int): 编码进程数量
+        block (bool): 槽位用完时等待编码完成而不是丢帧(无窗口录制时使用)
+    """
+
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), fps=CAPTURE_FPS, fmt=CAPTURE_FORMAT,
+                 output_dir=CAPTURE_DIR, ring_size=CAPTURE_RING_SIZE, workers=CAPTURE_WORKERS, block=False):
+        if fmt not in ("png", "raw"):
+            raise ValueError(f"Unknown capture format: {fmt}")
+        self.size = tuple(size)
+        self.interval = 1.0 / fps
+        self.fps = fps
+        self.fmt = fmt
+        self.output_dir = output_dir
+        self.ring_size = ring_size
+        self.workers = workers
+        self.block = block
+        self.active = False
+        self.directory = None
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._frame_bytes = self.size[0] * self.size[1] * 4
+        self._shm = None
+        self._slots = []  # 每个槽位上的 (memoryview, Surface)
+        self._free = queue.SimpleQueue()
+        self._executor = None
+        self._next_time = None
+        self._raw_path = None
+
+    def start(self, label=None):
+        """创建共享内存和编码进程池，返回输出目录"""
+        name = time.strftime("capture_%Y%m%d_%H%M%S") + (f"_{label}" if label else "")
+        self.directory = os.path.join(self.output_dir, name)
+        os.makedirs(self.directory, exist_ok=True)
+        if self.fmt == "raw":
+            self._raw_path = os.path.join(self.directory, _RAW_FILE_NAME)
+            open(self._raw_path, "wb").close()
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._frame_bytes * self.ring_size)
+        for slot in range(self.ring_size):
+            view = self._shm.buf[slot * self._frame_bytes:(slot + 1) * self._frame_bytes]
+            self._slots.append((view, pygame.image.frombuffer(view, self.size, PIXEL_FORMAT)))
+            self._free.put(slot)
+        # spawn: 不在编码进程中复制游戏的线程和显示状态
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self.frames_submitted = self.frames_written = self.frames_dropped = 0
+        self._next_time = None
+        self.active = True
+        print(f"Recording to {self.directory}")
+        return self.directory
+
+    def capture(self, sim_time, draw):
+        """到了下一帧的模拟时间就录制一帧
+
+        Args:
+            sim_time (float): 当前模拟时间
+            draw (callable): draw(surface) 把当前画面绘制到给定的表面上
+        """
+        if not self.active:
+            return
+        if self._next_time is None:
+            self._next_time = sim_time
+        if sim_time < self._next_time:
+            return
+        while self._next_time <= sim_time:
+            self._next_time += self.interval
+        try:
+            slot = self._free.get(block=self.block)
+        except queue.Empty:
+            self.frames_dropped += 1
+            return
+        draw(self._slots[slot][1])
+        index = self.frames_submitted
+        self.frames_submitted += 1
+        if self.fmt == "png":
+            path = os.path.join(self.directory, f"frame_{index:06d}.png")
+        else:
+            path = self._raw_path
+        future = self._executor.submit(_encode_frame, self._shm.name, slot * self._frame_bytes,
+                                       self.size, self.fmt, path, index)
+        future.add_done_callback(lambda f, slot=slot: self._frame_done(f, slot))
+
+    def _frame_done(self, future, slot):
+        # 在进程池的结果线程中调用
+        error = future.exception()
+        if error is not None:
+            print(f"Warning: Failed to encode frame: {error}")
+        else:
+            self.frames_written += 1
+        self._free.put(slot)
+
+    def stop(self):
+        """等待编码完成，写出说明文件并释放共享内存
+
+        Returns:
+            str: 输出目录
+        """
+        if not self.active:
+            return self.directory
+        self.active = False
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        views = [view for view, _ in self._slots]
+        self._slots = []  # 先释放表面，再释放它们引用的共享内存
+        for view in views:
+            view.release()
+        self._free = queue.SimpleQueue()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+        info = {"format": self.fmt, "width": self.size[0], "height": self.size[1], "fps": self.fps,
+                "frames": self.frames_written, "dropped": self.frames_dropped}
+        if self.fmt == "raw":
+            info["ffmpeg"] = (f"ffmpeg -f rawvideo -pix_fmt rgb0 -s {self.size[0]}x{self.size[1]} "
+                              f"-r {self.fps} -i {_RAW_FILE_NAME} capture.mp4")
+        else:
+            info["ffmpeg"] = f"ffmpeg -framerate {self.fps} -i frame_%06d.png capture.mp4"
+        with open(os.path.join(self.directory, "capture.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2)
+        print(f"Recorded {self.frames_written} frames ({self.frames_dropped} dropped) to {self.directory}")
+        return self.directory
+
+
+def record_level(level, board=None, fmt=CAPTURE_FORMAT, output_dir=CAPTURE_DIR, workers=CAPTURE_WORKERS):
+    """无窗口运行一关并录制
+
+    Args:
+        level (int): 关卡
+        board (list, optional): 每个可放置格子的Meme名称或 None；默认用布阵求解器的最佳方案
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    from game import Game
+    from meme_card import MemeCard
+    from meme_catalog import CATALOG
+
+    game = Game(screen=screen)
+    game.setup_level(level)
+    if board is None:
+        from placement_solver import suggest_placements
+        options = suggest_placements(CATALOG.templates, level, top_n=1)
+        board = [None] * len(game.game_board.cells)
+        if options:
+            for cell_index, name in options[0].placements:
+                board[cell_index] = name
+    for cell_index, name in enumerate(board):
+        if not name:
+            continue
+        type_id = CATALOG.find(name)
+        if type_id is None:
+            raise ValueError(f"Unknown meme: {name}")
+        template = CATALOG.template(type_id)
+        game.game_board.get_cell_by_index(cell_index).plant_meme(
+            MemeCard(template["name"], template["base_damage"], template["star"], template["image_key"]))
+
+    game.frame_capture = FrameCapture(fmt=fmt, output_dir=output_dir, workers=workers, block=True)
+    game.frame_capture.start(label=f"level{level}")
+    game.run_to_end = True
+    while game.level_active:
+        game.advance(0.0)
+    directory = game.frame_capture.stop()
+    game.close()
+    pygame.quit()
+    return directory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record one level headlessly")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--board", help="comma separated meme names per cell, empty for none")
+    parser.add_argument("--format", choices=("png", "raw"), default=CAPTURE_FORMAT)
+    parser.add_argument("--workers", type=int, default=CAPTURE_WORKERS)
+    args = parser.parse_args()
+    cells = [name.strip() or None for name in args.board.split(",")] if args.board else None
+    record_level(args.level, cells, args.format, workers=args.workers)
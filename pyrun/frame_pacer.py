@@ -0,0 +1,96 @@
+# frame_pacer.py
+import time
+import pygame
+from config import FPS, UNFOCUSED_FPS, ADAPTIVE_FRAME_PACING, LOW_LATENCY_INPUT
+
+# 影响窗口是否可见/有焦点的事件
+_FOCUS_LOST_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN)
+_FOCUS_GAINED_EVENTS = (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)
+# 低延迟模式下会提前结束等待的输入事件
+_INPUT_EVENTS = (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN)
+
+
+class FramePacer:
+    """自适应帧率控制
+
+    - 有动画时按 fps 运行
+    - 窗口失去焦点或最小化时降到 unfocused_fps
+    - 没有动画时阻塞等待事件，空闲时几乎不占用CPU(游戏只在关卡之间空闲，此时没有定时器；
+      无尽模式的波次间隔在关卡进行中，后台操作完成时投递的事件本身会结束等待)
+    - 低延迟模式(low_latency)下，等待下一帧时有输入到达就立即结束等待，
+      输入在到达后马上被处理、模拟并显示，而不是等到下一个固定的帧边界
+
+    等待时从队列取出的事件保留在 FramePacer 中，调用方用 events() 代替 pygame.event.get()，
+    这些事件排在队列中其余事件之前，顺序与到达顺序一致。
+    """
+
+    def __init__(self, fps=FPS, unfocused_fps=UNFOCUSED_FPS, adaptive=ADAPTIVE_FRAME_PACING,
+                 low_latency=LOW_LATENCY_INPUT):
+        self.fps = fps
+        self.unfocused_fps = unfocused_fps
+        self.adaptive = adaptive
+        self.low_latency = low_latency
+        self.clock = pygame.time.Clock()
+        self.focused = True
+        self.input_seen_at = None  # 低延迟模式下最近一次被输入唤醒的时间(perf_counter)
+        self._held = []  # 等待时取出、还没有交给调用方的事件
+        self._last_frame = time.perf_counter()
+
+    def handle_event(self, event):
+        """在事件循环中对每个事件调用，用于跟踪窗口焦点"""
+        if event.type in _FOCUS_LOST_EVENTS:
+            self.focused = False
+        elif event.type in _FOCUS_GAINED_EVENTS:
+            self.focused = True
+
+    def events(self):
+        """等待时取出的事件和队列中的其余事件，按到达顺序"""
+        held, self._held = self._held, []
+        return held + pygame.event.get()
+
+    def tick(self, animating=True):
+        """等待到下一帧
+
+        Args:
+            animating (bool): 当前是否有需要逐帧推进的动画或模拟
+
+        Returns:
+            float: 距上一帧的秒数。空闲等待后返回 0，避免把等待时间计入模拟。
+        """
+        if not self.adaptive:
+            return self.clock.tick(self.fps) / 1000.0
+
+        if not animating:
+            if not self._held and not pygame.event.peek():
+                self._held.append(pygame.event.wait())
+            self.clock.tick()  # 重置计时起点
+            self._last_frame = time.perf_counter()
+            return 0.0
+
+        fps = self.fps if self.focused else self.unfocused_fps
+        if self.low_latency and self.focused:
+            return self._wait_for_frame_or_input(1.0 / fps)
+        dt = self.clock.tick(fps) / 1000.0
+        self._last_frame = time.perf_counter()
+        return dt
+
+    def _wait_for_frame_or_input(self, frame_time):
+        """等到下一帧的时间点，期间收到输入事件则提前返回"""
+        deadline = self._last_frame + frame_time
+        self.input_seen_at = None
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            event = pygame.event.wait(max(1, int(remaining * 1000)))
+            if event.type == pygame.NOEVENT:
+                continue
+            self._held.append(event)
+            if event.type in _INPUT_EVENTS:
+                self.input_seen_at = time.perf_counter()
+                break
+        now = time.perf_counter()
+        dt = now - self._last_frame
+        self._last_frame = now
+        self.clock.tick()
+        return dt
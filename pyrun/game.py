@@ -2,25 +2,44 @@
 import pygame
 import sys
 import time
-import webbrowser
+import memory_stats
+import side_effects
 from player import Player
 from game_board import GameBoard
 from trump import Trump
 from meme_card import MemeCard
-from projectile import Projectile
+from projectile import ProjectilePool
+from collision import spritecollide_mask
+from projectile_resolver import ProjectileResolver
+from fonts import get_font, render_text
+from frame_pacer import FramePacer
+from profiler import Profiler
+from latency_tracer import LatencyTracer
+from event_bus import (
+    BUS, LevelStarted, MemePlaced, ShotFired, TrumpHit, MemeDefeated, TrumpRetreating, WhiteHouseReached,
+    LevelCleared
+)
+from game_snapshot import capture_snapshot
+from penalty_cache import PenaltyCache
+from waves import load_waves, enemy_health
+from render_backend import draw_rect, get_display, translate_event
 from config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, FPS, WHITE, BLACK, GREEN, RED, LIGHT_BLUE,
     TRUMP_MOVE_INTERVAL, WHITE_HOUSE_CELL_INDEX, TRUMP_SPAWN_CELL_INDEX, NUM_CELLS,
-    BUTTON_WIDTH, BUTTON_HEIGHT, PREDEFINED_MEMES_POOL
+    BUTTON_WIDTH, BUTTON_HEIGHT, PIPELINED_GAME_LOOP, SIM_STEP, TIME_SCALES, MAX_SPEED_FRAME_BUDGET,
+    MAX_CATCH_UP_STEPS, ANALYTICS_ENABLED, LEADERBOARD_URL, PENALTY_EVENT_LOG_PATH, GREY,
+    ENDLESS_MODE, ENDLESS_WAVE_BREAK
 )
-from battle_config import MEME_ATTACK_INTERVAL
+from battle_config import MEME_ATTACK_INTERVAL, PROJECTILE_MODE, TRUMP_BASE_HEALTH, TRUMP_BASE_MOVE_SPEED, ENEMY_TYPES
 
 class Game:
-    def __init__(self, screen=None):
+    def __init__(self, screen=None, profile_store=None, player_id="guest"):
         """初始化游戏
         
         Args:
             screen (pygame.Surface, optional): 已初始化的屏幕对象。如果为None，则创建一个新的。
+            profile_store (ProfileStore, optional): 玩家存档。如果为None，则不保存进度。
+            player_id (str): 存档中的玩家标识
         """
         if screen is None:
             # 如果没有提供屏幕对象，则初始化Pygame并创建一个新的
@@ -31,16 +50,39 @@ class Game:
         else:
             # 使用提供的屏幕对象
             self.screen = screen
+        # renderer 后端下游戏画面画在纹理画布上，screen 只留给加载页和开始页
+        display = get_display()
+        self.display = display if display is not None and display.screen is self.screen else None
+        self.canvas = self.display.canvas if self.display is not None else self.screen
         
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 48)  # 一般字体
-        self.small_font = pygame.font.SysFont(None, 30)
+        self.frame_pacer = FramePacer()
+        self.profiler = Profiler()  # F8 或 MEMEVSTRUMP_PROFILE 开始采集
+        self.latency_tracer = LatencyTracer()  # F7 或 MEMEVSTRUMP_LATENCY_TRACE 开始统计
+        self.frame_capture = None  # F6 开始/停止录像(FrameCapture)
+        self.analytics_writer = None
+        self.level_analytics = None
+        if ANALYTICS_ENABLED:
+            from analytics import AnalyticsWriter, LevelAnalytics
+            self.analytics_writer = AnalyticsWriter()
+            self.level_analytics = LevelAnalytics()
+        # 链上惩罚的本地视图，每帧检查是否禁止抽卡
+        self.penalties = PenaltyCache.from_event_log(PENALTY_EVENT_LOG_PATH)
+        self.leaderboard = None
+        if LEADERBOARD_URL:
+            from leaderboard_client import LeaderboardReporter
+            self.leaderboard = LeaderboardReporter(LEADERBOARD_URL)
+        self.font = get_font(48)  # 一般字体
+        self.small_font = get_font(30)
 
-        self.player = Player()
+        self.profile_store = profile_store
+        self.player = Player(profile_store=profile_store, player_id=player_id)
         self.game_board = GameBoard()
-        self.trump_character = None
+        self.trump_character = None  # 场上的Trump；无尽模式下两个敌人之间为 None
+        self._trump = None  # 唯一的Trump对象，每关/每个敌人出场时重置后重复使用
         self.current_level = 0
         self.trump_score = 0
+        self.resume_level = 1  # 从存档恢复时开始的关卡
         self.game_running = True  # 游戏是否运行
         self.level_active = False  # 特定关卡是否进行中
 
@@ -51,100 +93,371 @@ class Game:
         self.next_level_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, 
                                                  SCREEN_HEIGHT - BUTTON_HEIGHT - 70, BUTTON_WIDTH, BUTTON_HEIGHT)
         self.open_browser_button_rect = pygame.Rect(SCREEN_WIDTH - BUTTON_WIDTH - 20, 20 + BUTTON_HEIGHT + 10, BUTTON_WIDTH, BUTTON_HEIGHT)
+        # 倍速按钮(关卡标题下方一排)和"跑完本关"按钮
+        self.speed_button_rects = [
+            (scale, pygame.Rect(SCREEN_WIDTH // 2 - 150 + i * 48, 55, 44, 30)) for i, scale in enumerate(TIME_SCALES)
+        ]
+        self.run_to_end_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150 + len(TIME_SCALES) * 48, 55, 80, 30)
         self.game_message = ""  # 显示消息如"Trump到达白宫"或"关卡完成"
         self.message_timer = 0  # 显示消息的时间
         
         # 新增投射物相关
         self.projectiles = pygame.sprite.Group()
-        self.last_projectile_update = time.time()
+        self.projectile_pool = ProjectilePool()  # 命中或飞出屏幕的投射物放回，下次发射时重复使用
+        self.sim_time = 0.0  # 模拟时间(秒)，攻击冷却都以它为准，不受真实时间影响
+        self.time_scale = 1  # 游戏倍速，0 表示尽可能快
+        self.run_to_end = False  # 以最快速度跑完当前关卡
+        self.sim_accumulator = 0.0  # 尚未模拟的时间(秒)
+        self.show_memory_overlay = False  # F9 切换内存统计叠加层
+        # 解析模式下由 ProjectileResolver 预测命中时间，不再逐帧做碰撞检测
+        self.projectile_resolver = ProjectileResolver() if PROJECTILE_MODE == "analytic" else None
+        # 无尽模式: 每关是出场表中的一波，本波的出场按下标 [wave_cursor, wave_end) 依次进行
+        self.waves = None
+        if ENDLESS_MODE:
+            self.waves = load_waves()
+        self.wave_cursor = 0
+        self.wave_end = 0
+        self.wave_scale = 1.0  # 本波所在循环的生命倍数
+        self.wave_clock = 0.0  # 本波开始后的模拟时间(秒)
+        self.wave_break = None  # 本波已清除，距离下一波开始的剩余时间(秒)
 
     def setup_level(self, level):
+        if self.waves is not None and self.level_active:
+            # 无尽模式接着进入下一波: 棋盘上的Meme留在原处并恢复满血
+            self.game_board.reset_board_memes()
+        else:
+            self.game_board.clear_board_memes(self.player.board_memes.release)
         self.current_level = level
-        self.game_board.clear_board_memes()
-        self.trump_character = Trump(level, TRUMP_SPAWN_CELL_INDEX)
-        self.trump_move_timer_accumulator = 0
         self.level_active = True
         self.player.selected_meme_from_collection_idx = None  # 取消选择任何meme
-        self.game_message = f"Level {self.current_level} Start!"
+        self.game_message = f"{'Wave' if self.waves is not None else 'Level'} {self.current_level} Start!"
         self.message_timer = FPS * 2  # 显示2秒
         print(f"\n--- Level {self.current_level} Starting ---")
-        print(f"Trump has {self.trump_character.max_health} HP this level.")
+        if self.waves is None:
+            health = self._spawn_trump(level).max_health
+            print(f"Trump has {health} HP this level.")
+        else:
+            self.wave_cursor, self.wave_end, self.wave_scale = self.waves.spawn_range(level)
+            self.wave_clock = 0.0
+            self.wave_break = None
+            self.trump_character = None
+            health = self.waves.wave_health(level, TRUMP_BASE_HEALTH)
+            print(f"Wave {level}: {self.wave_end - self.wave_cursor} enemies, {health} HP in total.")
+            self._spawn_due()
+        self.profiler.level_started(level)
+        BUS.emit(LevelStarted, self.sim_time, level, health)
+
+    def _spawn_trump(self, level, max_health=None, move_speed=TRUMP_BASE_MOVE_SPEED):
+        """让Trump在出生格子出场，重复使用同一个对象(只有第一次创建并加载图片)"""
+        if self._trump is None:
+            self._trump = Trump(level, TRUMP_SPAWN_CELL_INDEX, max_health, move_speed)
+        else:
+            self._trump.reset(level, TRUMP_SPAWN_CELL_INDEX, max_health, move_speed)
+        self.trump_character = self._trump
+        self.trump_move_timer_accumulator = 0
+        return self._trump
+
+    def _spawn_due(self):
+        """无尽模式: 本波下一个敌人的出场时间已到时让它出场"""
+        if self.wave_cursor >= self.wave_end or self.waves.time[self.wave_cursor] > self.wave_clock:
+            return
+        spawn = self.waves.spawn(self.wave_cursor, self.wave_scale)
+        self.wave_cursor += 1
+        trump = self._spawn_trump(self.current_level, enemy_health(TRUMP_BASE_HEALTH, spawn.health),
+                                  TRUMP_BASE_MOVE_SPEED * ENEMY_TYPES[spawn.enemy]["speed"])
+        print(f"{spawn.enemy} enters with {trump.max_health} HP.")
+
+    def _enemy_left(self):
+        """无尽模式: 敌人撤出地图，射向它的投射物随之消失(放回池中)"""
+        self.trump_character = None
+        if self.projectile_resolver:
+            self.projectile_resolver.clear()
+        else:
+            for projectile in self.projectiles.sprites():
+                self.projectile_pool.release(projectile)
+
+    def _wait_for_spawn(self, dt):
+        """无尽模式下场上没有敌人时推进一步: 两波之间休息，或等待本波下一个敌人的出场时间"""
+        self.sim_time += dt
+        self.wave_clock += dt
+        if self.wave_break is not None:
+            self.wave_break -= dt
+            if self.wave_break <= 0:
+                self.setup_level(self.current_level + 1)
+        else:
+            self._spawn_due()
 
     def initial_setup_phase(self):  # 游戏开始时调用一次
         print("Welcome to Meme vs Trump!")
-        self.player.scan_inventory_for_initial_funds()  # 模拟扫描库存
+        profile = self.player.load_from_profile()
+        if profile:
+            self.trump_score = profile["trump_score"]
+            self.resume_level = max(1, profile["max_level"])
+        else:
+            self.player.scan_inventory_for_initial_funds()  # 模拟扫描库存
+            self.save_progress()
+
+    def save_progress(self):
+        """将当前进度交给存档的后台线程写入(不阻塞游戏循环)，并提交到排行榜"""
+        self.player.save_progress(self.trump_score, self.current_level)
+        if self.leaderboard:
+            self.leaderboard.submit(self.player.player_id, self.player.score, self.trump_score, self.current_level)
 
     def handle_input(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.game_running = False
-                self.level_active = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # 左键点击
-                    mouse_pos = pygame.mouse.get_pos()
-
-                    # 1. 首先检查UI按钮
-                    if self.draw_card_button_rect.collidepoint(mouse_pos):
-                        print("Draw Card button clicked")
-                        drawn_meme_template = self.player.blind_box_draw(cost=10)
-                        if drawn_meme_template:
-                            self.game_message = f"Drew: {drawn_meme_template['name']}!"
-                        else:
-                            self.game_message = f"Draw failed. Currency: {self.player.currency}"
-                        self.message_timer = FPS * 2
-                        return  # 消耗点击
-
-                    if self.open_browser_button_rect.collidepoint(mouse_pos):
-                        print("Open Browser button clicked")
-                        try:
-                            webbrowser.open("http://localhost:5173")
-                            self.game_message = "Opening browser..."
-                        except Exception as e:
-                            self.game_message = f"Failed to open browser: {e}"
+        tracer = self.latency_tracer
+        if tracer.enabled:
+            tracer.begin_poll(self.frame_pacer.input_seen_at)
+        for event in self.frame_pacer.events():
+            event = translate_event(event)
+            self.frame_pacer.handle_event(event)
+            if tracer.enabled:
+                trace = tracer.arrived(event)
+                self.handle_event(event)
+                tracer.handled(trace)
+            else:
+                self.handle_event(event)
+
+    def handle_event(self, event):
+        """处理单个输入事件(流水线模式下在模拟线程中调用)"""
+        if side_effects.dispatch(event):
+            return
+        if event.type == pygame.QUIT:
+            self.game_running = False
+            self.level_active = False
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+            self.show_placement_hint()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+            # F键循环切换倍速
+            index = TIME_SCALES.index(self.time_scale) if self.time_scale in TIME_SCALES else -1
+            self.set_time_scale(TIME_SCALES[(index + 1) % len(TIME_SCALES)])
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+            self.player.change_collection_page(-1 if event.key == pygame.K_PAGEUP else 1)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+            self.toggle_recording()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F7:
+            self.toggle_latency_trace()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F8:
+            self.profiler.toggle()
+            self.game_message = "Profiler stopping..." if self.profiler.active else "Profiler started"
+            self.message_timer = FPS * 2
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+            if not memory_stats.is_enabled():
+                memory_stats.enable()
+                print("Memory accounting enabled (objects created before now are not counted)")
+            self.show_memory_overlay = not self.show_memory_overlay
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F10:
+            if not memory_stats.is_enabled():
+                memory_stats.enable()
+            path = memory_stats.dump_json()
+            print(f"Memory report written to {path}")
+            self.game_message = "Memory report saved"
+            self.message_timer = FPS * 2
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # 左键点击
+                mouse_pos = event.pos
+
+                # 1. 首先检查UI按钮
+                if self.draw_card_button_rect.collidepoint(mouse_pos):
+                    print("Draw Card button clicked")
+                    if not self.penalties.can_draw(self.player.player_id):
+                        self.game_message = "Drawing is blocked by a penalty"
                         self.message_timer = FPS * 2
                         return
+                    drawn_meme_template = self.player.blind_box_draw(cost=10)
+                    if drawn_meme_template:
+                        self.game_message = f"Drew: {drawn_meme_template['name']}!"
+                        self.save_progress()
+                    else:
+                        self.game_message = f"Draw failed. Currency: {self.player.currency}"
+                    self.message_timer = FPS * 2
+                    return  # 消耗点击
+
+                if self.open_browser_button_rect.collidepoint(mouse_pos):
+                    print("Open Browser button clicked")
+                    import webbrowser  # 很少使用，延迟导入
+                    if side_effects.submit("open_browser", webbrowser.open, "http://localhost:5173",
+                                           on_done=self._browser_opened):
+                        self.game_message = "Opening browser..."
+                    else:
+                        self.game_message = "Busy, try again"
+                    self.message_timer = FPS * 2
+                    return
+
+                for scale, rect in self.speed_button_rects:
+                    if rect.collidepoint(mouse_pos):
+                        self.set_time_scale(scale)
+                        return
+
+                if self.run_to_end_button_rect.collidepoint(mouse_pos):
+                    if self.level_active:
+                        self.run_to_end = True
+                    return
+
+                if not self.level_active and self.next_level_button_rect.collidepoint(mouse_pos):
+                    if self.trump_score > 0 or self.player.score > 0:  # 如果一轮已经结束
+                        print("Next Level button clicked")
+                        self.setup_level(self.current_level + 1)
+                    return  # 消耗点击
+
+                # 2. 处理玩家的meme收藏点击(选择一个meme放置)
+                if self.player.handle_collection_click(mouse_pos):
+                    return  # 点击由收藏UI处理
+
+                # 3. 处理在游戏板上放置所选meme(如果关卡活动)
+                if self.level_active and self.player.selected_meme_from_collection_idx is not None:
+                    cell_idx, target_cell = self.game_board.get_cell_at_pos(mouse_pos)
+                    if target_cell and target_cell.is_placeable:
+                        meme_to_place = self.player.get_selected_meme_for_placement()  # 取出棋盘用的实例
+                        if meme_to_place:
+                            if target_cell.plant_meme(meme_to_place):
+                                print(f"Placed {meme_to_place.name} in cell {cell_idx}")
+                                BUS.emit(MemePlaced, self.sim_time, self.current_level, cell_idx,
+                                         meme_to_place.name, meme_to_place.star_rating)
+                            else:
+                                print(f"Could not place {meme_to_place.name} in cell {cell_idx}. Occupied?")
+                                self.player.board_memes.release(meme_to_place)
+                                self.game_message = "Cell occupied or not placeable."
+                                self.message_timer = FPS * 1.5
+                        else:  # 如果selected_meme_from_collection_idx有效，不应该发生
+                            print("Error: No meme instance to place despite selection.")
+                    elif target_cell and not target_cell.is_placeable:
+                        self.game_message = "Cannot place meme in this cell."
+                        self.message_timer = FPS * 1.5
+
+    def _browser_opened(self, job):
+        """打开浏览器的后台操作完成(side_effects 回调)"""
+        if not job.ok:
+            self.game_message = f"Failed to open browser: {job.error}"
+        elif not job.result:
+            self.game_message = "No browser available"
+        else:
+            return
+        self.message_timer = FPS * 2
+
+    def show_placement_hint(self):
+        """用布阵求解器为当前关卡的空格子给出建议(H键)"""
+        if not self.level_active or not self.trump_character or not self.player.collection_total:
+            return
+        from battle_sim import BattleState
+        from placement_solver import suggest_placements, describe_option
+        # 考虑所有收藏页中的卡牌类型，而不只是当前显示的一页
+        options = suggest_placements(self.player.owned_card_types(), self.current_level,
+                                     state=BattleState.from_game(self), top_n=1)
+        if options:
+            self.game_message = f"Hint: {describe_option(options[0])}"
+            print(self.game_message)
+            self.message_timer = FPS * 4
+
+    def toggle_recording(self):
+        """开始或停止录制战斗画面"""
+        if self.frame_capture and self.frame_capture.active:
+            self.frame_capture.stop()
+            self.game_message = "Recording saved"
+        else:
+            from frame_capture import FrameCapture
+            self.frame_capture = FrameCapture()
+            self.frame_capture.start(label=f"level{self.current_level}")
+            self.game_message = "Recording..."
+        self.message_timer = FPS * 2
+
+    def toggle_latency_trace(self):
+        """开始或结束输入延迟统计；结束时打印分布并写入JSON"""
+        tracer = self.latency_tracer
+        if not tracer.enabled:
+            tracer.start()
+            self.game_message = "Latency trace started"
+        else:
+            tracer.stop()
+            tracer.print_report()
+            path = tracer.dump_json()
+            print(f"Latency report written to {path}")
+            self.game_message = "Latency report saved"
+        self.message_timer = FPS * 2
+
+    def set_time_scale(self, scale):
+        """切换倍速(0 表示最快)，模拟步长不变，只改变每帧模拟的步数"""
+        self.time_scale = scale
+        self.sim_accumulator = 0.0
+        print(f"Game speed: {'max' if scale == 0 else f'{scale}x'}")
+
+    def advance(self, dt):
+        """按当前倍速推进模拟
+
+        模拟总是以固定步长 SIM_STEP 调用 update_game_state，倍速只决定每帧执行多少步，
+        所以投射物不会因为步长变大而穿过Trump，任何倍速下的战斗结果都与1倍速完全相同。
+        最快速度和"跑完本关"时每帧模拟到 MAX_SPEED_FRAME_BUDGET 用完为止，其余时间才绘制。
+
+        Args:
+            dt (float): 距上一帧的真实时间(秒)
+
+        Returns:
+            int: 本帧执行的模拟步数
+        """
+        if not self.level_active:
+            self.run_to_end = False
+            self.sim_accumulator = 0.0
+            return 0
+        if self.message_timer > 0:
+            # 消息按真实时间倒计时(单位仍是 FPS 下的帧数)，不随倍速和每帧的模拟步数变快
+            self.message_timer -= dt * FPS
+
+        steps = 0
+        if self.run_to_end or self.time_scale == 0:
+            deadline = time.perf_counter() + MAX_SPEED_FRAME_BUDGET
+            while self.level_active and time.perf_counter() < deadline:
+                self._step()
+                steps += 1
+            self.animate()
+            self.sim_accumulator = 0.0
+            return steps
 
-                    if not self.level_active and self.next_level_button_rect.collidepoint(mouse_pos):
-                        if self.trump_score > 0 or self.player.score > 0:  # 如果一轮已经结束
-                            print("Next Level button clicked")
-                            self.setup_level(self.current_level + 1)
-                        return  # 消耗点击
-
-                    # 2. 处理玩家的meme收藏点击(选择一个meme放置)
-                    if self.player.handle_collection_click(mouse_pos):
-                        return  # 点击由收藏UI处理
-
-                    # 3. 处理在游戏板上放置所选meme(如果关卡活动)
-                    if self.level_active and self.player.selected_meme_from_collection_idx is not None:
-                        cell_idx, target_cell = self.game_board.get_cell_at_pos(mouse_pos)
-                        if target_cell and target_cell.is_placeable:
-                            meme_to_place = self.player.get_selected_meme_for_placement()  # 获取新实例
-                            if meme_to_place:
-                                if target_cell.plant_meme(meme_to_place):
-                                    print(f"Placed {meme_to_place.name} in cell {cell_idx}")
-                                else:
-                                    print(f"Could not place {meme_to_place.name} in cell {cell_idx}. Occupied?")
-                                    self.game_message = "Cell occupied or not placeable."
-                                    self.message_timer = FPS * 1.5
-                            else:  # 如果selected_meme_from_collection_idx有效，不应该发生
-                                print("Error: No meme instance to place despite selection.")
-                        elif target_cell and not target_cell.is_placeable:
-                            self.game_message = "Cannot place meme in this cell."
-                            self.message_timer = FPS * 1.5
+        # 落后太多时丢弃时间(画面变慢)，而不是越积越多
+        limit = SIM_STEP * MAX_CATCH_UP_STEPS * self.time_scale
+        self.sim_accumulator = min(self.sim_accumulator + dt * self.time_scale, limit)
+        while self.sim_accumulator >= SIM_STEP and self.level_active:
+            self._step()
+            self.sim_accumulator -= SIM_STEP
+            steps += 1
+        if steps:
+            self.animate()
+        return steps
+
+    def _step(self):
+        """模拟一个固定步长，录像时按模拟时间录制画面"""
+        self.penalties.expire()
+        self.update_game_state(SIM_STEP)
+        if self.frame_capture is not None and self.frame_capture.active:
+            self.animate()
+            self.frame_capture.capture(self.sim_time, self.draw_frame)
+
+    def animate(self):
+        """按模拟时间更新Trump和棋盘上Meme的当前帧(每次显示或录制前调用一次，不必每步调用)"""
+        now = self.sim_time
+        if self.trump_character:
+            self.trump_character.animate(now)
+        for cell in self.game_board.cells:
+            if cell.meme:
+                cell.meme.animate(now)
 
     def update_game_state(self, dt):
-        current_time = time.time()
-        
-        if not self.level_active or not self.trump_character:
+        if not self.level_active:
+            return
+        if not self.trump_character:
+            if self.waves is not None:
+                self._wait_for_spawn(dt)
             return
         
+        self.sim_time += dt
+        self.wave_clock += dt
+        current_time = self.sim_time
         self.trump_move_timer_accumulator += dt
         
         # 1. 检查Trump前方是否有Meme，如果有则攻击
-        next_cell_idx = self.trump_character.logical_position - 1
+        next_cell_idx = self.game_board.next_cell(self.trump_character.logical_position)
         if (not self.trump_character.is_retreating and 
             not self.trump_character.is_moving and 
             not self.trump_character.is_attacking and
+            next_cell_idx is not None and next_cell_idx != self.trump_character.logical_position and
             0 <= next_cell_idx < NUM_CELLS):
             
             next_cell = self.game_board.get_cell_by_index(next_cell_idx)
@@ -154,23 +467,24 @@ class Game:
         
         # 2. 如果Trump正在攻击，执行攻击
         if self.trump_character.is_attacking:
-            damage_done = self.trump_character.attack_meme(current_time)  # 修改这里，获取攻击结果
-            if damage_done:  # 如果造成了伤害
-                target_meme = self.trump_character.target_meme
-                if target_meme and target_meme.take_damage(damage_done):  # 如果Meme死亡
-                    # 找到并移除死亡的Meme
-                    for cell_idx in range(NUM_CELLS):
-                        cell = self.game_board.get_cell_by_index(cell_idx)
-                        if cell and cell.meme == target_meme:
-                            cell.meme = None  # 移除死亡的Meme
-                            self.trump_character.target_meme = None  # 清除Trump的目标
-                            self.trump_character.is_attacking = False  # 停止攻击
-                            print(f"Meme in cell {cell_idx} has been defeated!")
-                            break
+            target_meme = self.trump_character.target_meme  # attack_meme 在Meme死亡时会清除目标，先记下
+            if self.trump_character.attack_meme(current_time):  # 返回 True 表示Meme已死亡
+                # 找到并移除死亡的Meme(不再射击)
+                for cell_idx in range(NUM_CELLS):
+                    cell = self.game_board.get_cell_by_index(cell_idx)
+                    if cell and cell.meme == target_meme:
+                        cell.remove_meme()  # 移除死亡的Meme
+                        self.player.board_memes.release(target_meme)
+                        self.trump_character.target_meme = None  # 清除Trump的目标
+                        self.trump_character.is_attacking = False  # 停止攻击
+                        print(f"Meme in cell {cell_idx} has been defeated!")
+                        BUS.emit(MemeDefeated, current_time, self.current_level, cell_idx, target_meme.name)
+                        break
         # 3. Trump移动(基于累计时间)
         if self.trump_move_timer_accumulator >= TRUMP_MOVE_INTERVAL:
             if not self.trump_character.is_moving and not self.trump_character.is_attacking:
-                self.trump_character.move_logical()
+                trump = self.trump_character
+                trump.move_logical(self.game_board.next_cell(trump.logical_position, trump.is_retreating))
                 self.trump_move_timer_accumulator = 0  # 重置累计器
         
         # 更新Trump的平滑移动
@@ -185,31 +499,55 @@ class Game:
                     meme = cell.meme
                     if hasattr(meme, 'can_attack') and meme.can_attack(current_time):
                         # 创建一个射向Trump的投射物
-                        if hasattr(meme, 'create_projectile'):
+                        if self.projectile_resolver:
+                            self.projectile_resolver.fire(
+                                meme.rect.centerx, meme.rect.centery,
+                                self.trump_character.rect.centerx, self.trump_character.rect.centery,
+                                meme.get_attack_damage(), self.trump_character, meme.name
+                            )
+                            meme.mark_attacked(current_time)
+                            print(f"{meme.name} in cell {cell_idx} fires at Trump!")
+                            BUS.emit(ShotFired, current_time, self.current_level, cell_idx, meme.name,
+                                     meme.get_attack_damage())
+                        elif hasattr(meme, 'create_projectile'):
                             projectile = meme.create_projectile(
                                 self.trump_character.rect.centerx,
-                                self.trump_character.rect.centery
+                                self.trump_character.rect.centery,
+                                current_time,
+                                self.projectile_pool
                             )
                             self.projectiles.add(projectile)
                             print(f"{meme.name} in cell {cell_idx} fires at Trump!")
+                            BUS.emit(ShotFired, current_time, self.current_level, cell_idx, meme.name,
+                                     projectile.damage)
         
         # 5. 更新投射物并检查碰撞
-        self.projectiles.update(dt)
+        if self.projectile_resolver:
+            hits = self.projectile_resolver.update(dt, self.trump_character)
+        else:
+            self.projectiles.update(dt)
+            
+            # 检查投射物碰撞
+            hits = spritecollide_mask(self.trump_character, self.projectiles, True)
+            
+            # 移除超出屏幕的投射物
+            for projectile in self.projectiles.sprites():
+                if (projectile.rect.right < 0 or projectile.rect.left > SCREEN_WIDTH or
+                    projectile.rect.bottom < 0 or projectile.rect.top > SCREEN_HEIGHT):
+                    self.projectile_pool.release(projectile)
         
-        # 检查投射物碰撞
-        collided_projectiles = pygame.sprite.spritecollide(self.trump_character, self.projectiles, True)
-        for projectile in collided_projectiles:
-            self.trump_character.take_damage(projectile.damage)
+        for hit in hits:
+            was_retreating = self.trump_character.is_retreating
+            self.trump_character.take_damage(hit.damage)
+            if not was_retreating:
+                self._emit_trump_hit(current_time, hit.source, hit.damage)
             if self.trump_character.current_health <= 0 and not self.trump_character.is_retreating:
                 self.trump_character.is_retreating = True
                 self.game_message = "Trump is retreating!"
                 self.message_timer = FPS * 2
-        
-        # 移除超出屏幕的投射物
-        for projectile in self.projectiles.sprites():
-            if (projectile.rect.right < 0 or projectile.rect.left > SCREEN_WIDTH or
-                projectile.rect.bottom < 0 or projectile.rect.top > SCREEN_HEIGHT):
-                projectile.kill()
+        if not self.projectile_resolver:
+            for hit in hits:
+                self.projectile_pool.release(hit)
         
         # 6. 原始攻击逻辑 - Trump在格子上时，meme攻击
         if not self.trump_character.is_retreating and not self.trump_character.is_moving and \
@@ -221,12 +559,16 @@ class Game:
                     damage = meme.get_attack_damage()
                     print(f"{meme.name} in cell {self.trump_character.logical_position} attacks Trump for {damage} damage!")
                     self.trump_character.take_damage(damage)
+                    self._emit_trump_hit(current_time, meme.name, damage)
                     if meme.current_health <= 0:  # 如果Meme死亡
-                        cell_trump_is_on.meme = None  # 完全移除Meme
+                        cell_trump_is_on.remove_meme()  # 完全移除Meme
+                        self.player.board_memes.release(meme)
                         if self.trump_character.target_meme == meme:
                             self.trump_character.target_meme = None  # 清除Trump的目标
                             self.trump_character.is_attacking = False  # 停止攻击
                         print(f"Meme in cell {self.trump_character.logical_position} has been defeated!")
+                        BUS.emit(MemeDefeated, current_time, self.current_level,
+                                 self.trump_character.logical_position, meme.name)
                     if self.trump_character.current_health <= 0 and not self.trump_character.is_retreating:
                         self.trump_character.is_retreating = True
                         self.game_message = "Trump is retreating!"
@@ -241,90 +583,188 @@ class Game:
                 self.message_timer = FPS * 3
                 self.trump_score += 1
                 self.level_active = False
+                self.save_progress()
+                BUS.emit(WhiteHouseReached, current_time, self.current_level)
             
             # Trump被击败(撤退出地图)
             if self.trump_character.is_retreating and self.trump_character.logical_position >= TRUMP_SPAWN_CELL_INDEX:
-                print("\nSuccess! Trump has retreated from the map!")
-                self.game_message = f"Level {self.current_level} Cleared! Trump Retreated!"
-                self.message_timer = FPS * 3
-                self.player.score += 1
-                self.level_active = False
-        
-        if self.message_timer > 0:
-            self.message_timer -= 1
+                if self.waves is not None and self.wave_cursor < self.wave_end:
+                    # 本波还有敌人，等下一个出场
+                    print("\nTrump has retreated, the next one is coming!")
+                    self._enemy_left()
+                    self._spawn_due()
+                else:
+                    print("\nSuccess! Trump has retreated from the map!")
+                    self.game_message = f"{'Wave' if self.waves is not None else 'Level'} {self.current_level} Cleared! Trump Retreated!"
+                    self.message_timer = FPS * 3
+                    self.player.score += 1
+                    if self.waves is None:
+                        self.level_active = False
+                    else:
+                        # 无尽模式休息片刻后自动开始下一波，关卡保持进行中
+                        self._enemy_left()
+                        self.wave_break = ENDLESS_WAVE_BREAK
+                        self.run_to_end = False
+                    self.save_progress()
+                    BUS.emit(LevelCleared, current_time, self.current_level)
+
+    def _emit_trump_hit(self, current_time, source, damage):
+        """发布命中事件；这次命中让Trump开始撤退时同时发布 TrumpRetreating"""
+        BUS.emit(TrumpHit, current_time, self.current_level, source, damage, self.trump_character.current_health)
+        if self.trump_character.is_retreating:
+            BUS.emit(TrumpRetreating, current_time, self.current_level)
 
-    def draw_ui_elements(self):
+    def draw_ui_elements(self, state=None, surface=None):
+        """绘制UI元素
+        
+        Args:
+            state (GameSnapshot, optional): 要显示的数据。如果为None，则从当前游戏状态复制。
+            surface (pygame.Surface, optional): 绘制目标，默认为屏幕
+        """
+        if state is None:
+            state = capture_snapshot(self, world=False)
+        screen = surface or self.screen
+        
         # 绘制"Draw Card"按钮
-        pygame.draw.rect(self.screen, LIGHT_BLUE, self.draw_card_button_rect)
-        pygame.draw.rect(self.screen, BLACK, self.draw_card_button_rect, 2)  # 边框
-        draw_text = self.small_font.render("Draw Meme (10)", True, BLACK)
-        self.screen.blit(draw_text, (self.draw_card_button_rect.x + 10, self.draw_card_button_rect.y + 15))
+        draw_rect(screen, GREY if state.draw_blocked else LIGHT_BLUE, self.draw_card_button_rect)
+        draw_rect(screen, BLACK, self.draw_card_button_rect, 2)  # 边框
+        draw_text = render_text("Draw Blocked" if state.draw_blocked else "Draw Meme (10)", 30, BLACK)
+        screen.blit(draw_text, (self.draw_card_button_rect.x + 10, self.draw_card_button_rect.y + 15))
         
         # 绘制"Open Browser"按钮
-        pygame.draw.rect(self.screen, LIGHT_BLUE, self.open_browser_button_rect)
-        pygame.draw.rect(self.screen, BLACK, self.open_browser_button_rect, 2)
-        browser_text = self.small_font.render("Open WebApp", True, BLACK)
-        self.screen.blit(browser_text, (self.open_browser_button_rect.x + 10, self.open_browser_button_rect.y + 15))
+        draw_rect(screen, LIGHT_BLUE, self.open_browser_button_rect)
+        draw_rect(screen, BLACK, self.open_browser_button_rect, 2)
+        browser_text = render_text("Open WebApp", 30, BLACK)
+        screen.blit(browser_text, (self.open_browser_button_rect.x + 10, self.open_browser_button_rect.y + 15))
         
         # 绘制分数和货币
-        score_text = self.small_font.render(f"Player: {self.player.score} | Trump: {self.trump_score}", True, BLACK)
-        self.screen.blit(score_text, (20, 20))
-        currency_text = self.small_font.render(f"Currency: {self.player.currency}", True, BLACK)
-        self.screen.blit(currency_text, (20, 50))
-        level_text = self.small_font.render(f"Level: {self.current_level}", True, BLACK)
-        self.screen.blit(level_text, (SCREEN_WIDTH // 2 - 50, 20))
+        score_text = render_text(f"Player: {state.player_score} | Trump: {state.trump_score}", 30, BLACK)
+        screen.blit(score_text, (20, 20))
+        currency_text = render_text(f"Currency: {state.currency}", 30, BLACK)
+        screen.blit(currency_text, (20, 50))
+        level_text = render_text(f"Level: {state.level}", 30, BLACK)
+        screen.blit(level_text, (SCREEN_WIDTH // 2 - 50, 20))
+        
+        # 绘制倍速按钮，当前倍速高亮
+        for scale, rect in self.speed_button_rects:
+            active = scale == state.time_scale and not state.run_to_end
+            draw_rect(screen, GREEN if active else LIGHT_BLUE, rect)
+            draw_rect(screen, BLACK, rect, 2)
+            label = render_text("Max" if scale == 0 else f"{scale}x", 24, BLACK)
+            screen.blit(label, label.get_rect(center=rect.center))
+        if state.level_active:
+            draw_rect(screen, GREEN if state.run_to_end else LIGHT_BLUE, self.run_to_end_button_rect)
+            draw_rect(screen, BLACK, self.run_to_end_button_rect, 2)
+            label = render_text("To End", 24, BLACK)
+            screen.blit(label, label.get_rect(center=self.run_to_end_button_rect.center))
         
         # 绘制玩家的Meme收藏UI
-        self.player.display_collection_ui(self.screen)
+        Player.draw_collection(screen, state.collection, state.selected_idx, state.collection_page)
         
         # 如果关卡不活动且游戏已开始，绘制"Next Level"按钮
-        if not self.level_active and (self.player.score > 0 or self.trump_score > 0 or self.current_level > 0):
-            pygame.draw.rect(self.screen, GREEN, self.next_level_button_rect)
-            pygame.draw.rect(self.screen, BLACK, self.next_level_button_rect, 2)
-            next_level_text = self.small_font.render("Next Level", True, BLACK)
-            self.screen.blit(next_level_text, (self.next_level_button_rect.x + 25, self.next_level_button_rect.y + 15))
+        if not state.level_active and (state.player_score > 0 or state.trump_score > 0 or state.level > 0):
+            draw_rect(screen, GREEN, self.next_level_button_rect)
+            draw_rect(screen, BLACK, self.next_level_button_rect, 2)
+            next_level_text = render_text("Next Level", 30, BLACK)
+            screen.blit(next_level_text, (self.next_level_button_rect.x + 25, self.next_level_button_rect.y + 15))
         
         # 显示游戏消息
-        if self.message_timer > 0 and self.game_message:
-            msg_surf = self.font.render(self.game_message, True, RED if "Trump reached" in self.game_message else BLACK,
-                                       WHITE if "Trump reached" in self.game_message else None)  # 重要消息白色背景
+        if state.message_timer > 0 and state.game_message:
+            msg_surf = render_text(state.game_message, 48, RED if "Trump reached" in state.game_message else BLACK,
+                                   WHITE if "Trump reached" in state.game_message else None)  # 重要消息白色背景
             msg_rect = msg_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-            self.screen.blit(msg_surf, msg_rect)
+            screen.blit(msg_surf, msg_rect)
+        
+        if self.show_memory_overlay:
+            memory_stats.draw_overlay(screen)
 
-    def render_game(self):
-        self.screen.fill(WHITE)  # 背景
+    def draw_frame(self, surface):
+        """把当前画面绘制到任意表面(屏幕或录像用的离屏表面)"""
+        surface.fill(WHITE)  # 背景
         
         # 绘制游戏板(包括白宫和带有Meme的格子)
-        self.game_board.draw(self.screen)
+        self.game_board.draw(surface)
         
         # 绘制Trump
         if self.trump_character and self.level_active:  # 只有在存在且关卡活动时绘制
-            self.trump_character.draw(self.screen)
+            self.trump_character.draw(surface)
         
         # 绘制所有投射物
-        self.projectiles.draw(self.screen)
+        if self.projectile_resolver:
+            self.projectile_resolver.draw(surface)
+        else:
+            self.projectiles.draw(surface)
         
         # 在顶部绘制UI元素
-        self.draw_ui_elements()
-        
-        pygame.display.flip()  # 更新整个屏幕
+        self.draw_ui_elements(surface=surface)
+
+    def present(self):
+        """显示画布上的内容"""
+        if self.display is not None:
+            self.display.present()
+        else:
+            pygame.display.flip()  # 更新整个屏幕
+
+    def render_game(self):
+        self.draw_frame(self.canvas)
+        self.present()
 
     def game_loop(self):
         self.initial_setup_phase()
         # 自动开始第1关或等待"开始游戏"按钮
-        self.setup_level(1)  # 现在自动开始第1关
+        self.setup_level(self.resume_level)  # 现在自动开始第1关(或存档中到达的关卡)
         
-        while self.game_running:
-            dt = self.clock.tick(FPS) / 1000.0  # 秒为单位的增量时间
-            
-            self.handle_input()
-            self.update_game_state(dt)
-            self.render_game()
+        if PIPELINED_GAME_LOOP:
+            # 模拟在工作线程运行，主线程只处理事件和绘制快照；模拟线程出错时 run() 重新抛出异常
+            from pipeline import PipelinedGameLoop
+            PipelinedGameLoop(self).run()
+        else:
+            self._serial_loop()
         
         self.display_final_scores()
+        self.close()
         pygame.quit()
         sys.exit()
 
+    def _serial_loop(self):
+        """在主线程中交替处理输入、模拟和绘制，直到游戏结束"""
+        profiler = self.profiler
+        while self.game_running:
+            if profiler.active:
+                profiler.set_phase("wait")
+            # 关卡之间画面是静止的，阻塞等待输入而不是空转
+            dt = self.frame_pacer.tick(animating=self.level_active)  # 秒为单位的增量时间
+            
+            if profiler.active:
+                profiler.set_phase("update")
+            self.handle_input()
+            self.advance(dt)
+            if profiler.active:
+                profiler.set_phase("render")
+            self.render_game()
+            if self.latency_tracer.enabled:
+                self.latency_tracer.presented()
+            profiler.frame_end(self.level_active)
+
+    def close(self):
+        """保存进度并结束所有后台任务(存档、采集、录像、统计、排行榜、后台操作)"""
+        if self.profile_store:
+            self.save_progress()
+            self.profile_store.close()
+        self.profiler.close()
+        if self.frame_capture and self.frame_capture.active:
+            self.frame_capture.stop()
+        if self.latency_tracer.enabled:
+            self.latency_tracer.print_report()
+            self.latency_tracer.dump_json()
+        if self.level_analytics:
+            self.level_analytics.close()
+        if self.analytics_writer:
+            self.analytics_writer.close()
+        if self.leaderboard:
+            self.leaderboard.close()
+        side_effects.shutdown()
+
     def display_final_scores(self):  # 目前基于文本，可以是Pygame屏幕
         print("\n=== GAME OVER ===")
         print(f"Final Score - Player: {self.player.score} | Trump: {self.trump_score}")
@@ -1,6 +1,7 @@
 # game_board.py
 import pygame
 from cell import Cell # Use the Pygame version
+from pathing import FlowField
 from config import (
     NUM_CELLS, PLACEABLE_CELLS, CELL_WIDTH, CELL_HEIGHT,
     GAME_BOARD_Y, GAME_BOARD_START_X, IMAGE_PATHS, load_image, WHITE_HOUSE_WIDTH, SCREEN_HEIGHT
@@ -16,19 +17,22 @@ class GameBoard:
             centery=GAME_BOARD_Y + CELL_HEIGHT / 2 # Align with cell row
         )
 
+        # Next-cell tables toward the White House and the retreat edge, recomputed after the board changes
+        self.flow_field = FlowField(columns=NUM_CELLS)
+
         for i in range(NUM_CELLS):
             cell_x = GAME_BOARD_START_X + (i * CELL_WIDTH)
             cell_y = GAME_BOARD_Y
             is_placeable = i < PLACEABLE_CELLS
-            self.cells.append(Cell(cell_x, cell_y, CELL_WIDTH, CELL_HEIGHT, is_placeable))
+            self.cells.append(Cell(cell_x, cell_y, CELL_WIDTH, CELL_HEIGHT, is_placeable, self._cell_changed))
 
-    def draw(self, surface, trump_object=None):
+    def draw(self, surface, trump_object=None, draw_memes=True):
         # Draw White House
         surface.blit(self.white_house_image, self.white_house_rect)
 
-        # Draw cells
+        # Draw cells (memes can be skipped when they are drawn from a snapshot instead)
         for cell in self.cells:
-            cell.draw(surface)
+            cell.draw(surface, draw_meme=draw_memes)
 
         # Draw Trump (handled by Game class draw method to ensure correct layering if needed)
         # if trump_object:
@@ -40,14 +44,34 @@ class GameBoard:
                 return i, cell # Return index and cell object
         return None, None
 
+    def _cell_changed(self, cell):
+        self.flow_field.set_occupied(self.cells.index(cell), cell.meme is not None)
+
+    def next_cell(self, index, retreating=False):
+        # Where an enemy standing on cell index moves next (see pathing.FlowField.next_cell):
+        # index itself when it has no way out, None when index is not a board cell (the White House)
+        if not 0 <= index < NUM_CELLS:
+            return None
+        step = self.flow_field.next_cell(index, retreating)
+        return index if step is None else step
+
     def get_cell_by_index(self, index):
         if 0 <= index < NUM_CELLS:
             return self.cells[index]
         return None
 
-    def clear_board_memes(self):
+    def clear_board_memes(self, release=None):
+        # release(meme) is called for every removed meme so it can be reused (MemePool.release)
         for cell in self.cells:
+            if release and cell.meme:
+                release(cell.meme)
             cell.remove_meme()
+
+    def reset_board_memes(self):
+        # Memes stay where they are with full health and no attack cooldown (next endless wave)
+        for cell in self.cells:
+            if cell.meme:
+                cell.meme.reset()
     # game_board.py 中的 Cell 类
     def remove_meme(self):
         self.meme = None
\ No newline at end of file
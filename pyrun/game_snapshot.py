@@ -0,0 +1,92 @@
+# game_snapshot.py
+from collections import namedtuple
+from meme_card import MemeCard
+from trump import Trump
+from config import WHITE
+
+# 绘制一个实体所需的全部数据；image 只读共享，rect 为拷贝
+EntityView = namedtuple("EntityView", ["image", "rect", "current_health", "max_health", "is_retreating"])
+
+# 某一帧结束时的完整游戏画面状态，创建后不再修改，可以安全地交给其他线程绘制
+GameSnapshot = namedtuple("GameSnapshot", [
+    "frame",
+    "memes",          # 棋盘上的 Meme (EntityView)
+    "trump",          # EntityView 或 None
+    "projectiles",    # (image, topleft) 列表
+    "collection",     # 收藏UI中的卡牌 (EntityView)
+    "selected_idx",
+    "collection_page",  # (页码, 总页数)
+    "player_score",
+    "trump_score",
+    "currency",
+    "level",
+    "level_active",
+    "game_message",
+    "message_timer",
+    "game_running",
+    "time_scale",
+    "run_to_end",
+    "draw_blocked",   # 玩家当前被惩罚禁止抽卡
+])
+
+
+def view_of(entity):
+    return EntityView(entity.image, entity.rect.copy(), entity.current_health, entity.max_health,
+                      getattr(entity, "is_retreating", False))
+
+
+def capture_snapshot(game, frame=0, world=True):
+    """从游戏对象复制出一份不可变的画面状态
+
+    Args:
+        game (Game): 游戏对象
+        frame (int): 模拟帧编号
+        world (bool): False 时只复制UI需要的数据(棋盘、Trump和投射物为空)
+    """
+    memes = ()
+    trump = None
+    projectiles = ()
+    if world:
+        memes = tuple(view_of(cell.meme) for cell in game.game_board.cells if cell.meme)
+        if game.trump_character and game.level_active:
+            trump = view_of(game.trump_character)
+        if game.projectile_resolver:
+            image = game.projectile_resolver.image
+            projectiles = tuple((image, pos) for pos in game.projectile_resolver.positions())
+        else:
+            projectiles = tuple((p.image, p.rect.topleft) for p in game.projectiles.sprites())
+
+    player = game.player
+    return GameSnapshot(
+        frame=frame,
+        memes=memes,
+        trump=trump,
+        projectiles=projectiles,
+        collection=tuple(view_of(card) for card in player.meme_collection),
+        selected_idx=player.selected_meme_from_collection_idx,
+        collection_page=(player.collection_page, player.collection_page_count),
+        player_score=player.score,
+        trump_score=game.trump_score,
+        currency=player.currency,
+        level=game.current_level,
+        level_active=game.level_active,
+        game_message=game.game_message,
+        message_timer=game.message_timer,
+        game_running=game.game_running,
+        time_scale=game.time_scale,
+        run_to_end=game.run_to_end,
+        draw_blocked=not game.penalties.can_draw(player.player_id),
+    )
+
+
+def draw_snapshot(game, surface, snapshot):
+    """按快照绘制一帧(不读取任何会被模拟线程修改的对象)"""
+    surface.fill(WHITE)  # 背景
+    game.game_board.draw(surface, draw_memes=False)  # 白宫和格子是静态的
+    for meme in snapshot.memes:
+        MemeCard.draw_view(surface, meme)
+    if snapshot.trump:
+        Trump.draw_view(surface, snapshot.trump)
+    for image, pos in snapshot.projectiles:
+        surface.blit(image, pos)
+    game.draw_ui_elements(snapshot, surface)
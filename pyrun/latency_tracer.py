@@ -0,0 +1,163 @@
+# latency_tracer.py
+# 输入到画面(input-to-photon)延迟跟踪。每个输入事件记录四个时间点:
+#   arrival  事件到达(pygame 事件没有时间戳，用上一次轮询事件队列的时间作为上限估计；
+#            低延迟模式下由 FramePacer 被输入唤醒的时间给出)
+#   polled   从事件队列取出
+#   handled  handle_event 返回，状态已经改变
+#   shown    显示该状态的 display.flip() 完成
+# 按事件类型统计各阶段的延迟分布(毫秒)。
+import json
+import os
+import threading
+import time
+from collections import deque
+import pygame
+from config import LATENCY_TRACE_ENABLED, LATENCY_REPORT_DIR, LATENCY_MAX_SAMPLES
+
+_TRACED_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN)
+_STAGES = ("queued", "handling", "to_flip", "total")
+
+
+class _Trace:
+    __slots__ = ("event_type", "arrival", "polled", "handled", "frame")
+
+    def __init__(self, event_type, arrival, polled):
+        self.event_type = event_type
+        self.arrival = arrival
+        self.polled = polled
+        self.handled = None
+        self.frame = None  # 流水线模式下包含此输入结果的第一个快照编号
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class LatencyTracer:
+    """记录输入事件从到达到显示的各阶段时间
+
+    调用顺序: begin_poll() -> 对每个事件 arrived() -> handled() -> 每次 flip 后 presented()。
+    handled() 和 presented() 可以在不同线程调用(流水线模式)。
+    """
+
+    def __init__(self, enabled=LATENCY_TRACE_ENABLED, max_samples=LATENCY_MAX_SAMPLES):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._samples = {}  # 事件类型名 -> {阶段: deque(毫秒)}
+        self._waiting = []  # 已处理、等待显示的 _Trace
+        self._lock = threading.Lock()
+        self._last_poll = time.perf_counter()
+        self._poll_arrival = None
+
+    def start(self):
+        self.reset()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._waiting.clear()
+        self._last_poll = time.perf_counter()
+
+    def begin_poll(self, input_seen_at=None):
+        """即将读取事件队列
+
+        Args:
+            input_seen_at (float, optional): 已知的输入到达时间(FramePacer.input_seen_at)
+        """
+        # 本次取到的事件最早在上一次轮询之后到达
+        self._poll_arrival = input_seen_at if input_seen_at is not None else self._last_poll
+        self._last_poll = time.perf_counter()
+
+    def arrived(self, event):
+        """事件从队列取出；不跟踪的事件类型返回 None"""
+        if event.type not in _TRACED_EVENTS:
+            return None
+        now = time.perf_counter()
+        return _Trace(pygame.event.event_name(event.type), min(self._poll_arrival, now), now)
+
+    def handled(self, trace, frame=None):
+        """事件处理完成
+
+        Args:
+            trace (_Trace | None): arrived() 的返回值
+            frame (int, optional): 流水线模式下包含处理结果的快照编号，None 表示下一次 flip 即显示
+        """
+        if trace is None:
+            return
+        trace.handled = time.perf_counter()
+        trace.frame = frame
+        with self._lock:
+            self._waiting.append(trace)
+
+    def presented(self, frame=None):
+        """一次 display.flip() 完成
+
+        Args:
+            frame (int, optional): 本次显示的快照编号(流水线模式)
+        """
+        if not self._waiting:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            still_waiting = []
+            for trace in self._waiting:
+                if trace.frame is not None and (frame is None or frame < trace.frame):
+                    still_waiting.append(trace)
+                    continue
+                self._record(trace.event_type, "queued", trace.polled - trace.arrival)
+                self._record(trace.event_type, "handling", trace.handled - trace.polled)
+                self._record(trace.event_type, "to_flip", now - trace.handled)
+                self._record(trace.event_type, "total", now - trace.arrival)
+            self._waiting = still_waiting
+
+    def _record(self, event_type, stage, seconds):
+        stages = self._samples.get(event_type)
+        if stages is None:
+            stages = self._samples[event_type] = {s: deque(maxlen=self.max_samples) for s in _STAGES}
+        stages[stage].append(seconds * 1000.0)
+
+    def report(self):
+        """各事件类型各阶段的延迟分布
+
+        Returns:
+            dict: {事件类型: {阶段: {count, mean, p50, p90, p99, max}}}，单位毫秒
+        """
+        result = {}
+        with self._lock:
+            samples = {name: {stage: sorted(values) for stage, values in stages.items()}
+                       for name, stages in self._samples.items()}
+        for name, stages in samples.items():
+            result[name] = {}
+            for stage, values in stages.items():
+                if not values:
+                    continue
+                result[name][stage] = {
+                    "count": len(values),
+                    "mean": round(sum(values) / len(values), 2),
+                    "p50": round(_percentile(values, 0.5), 2),
+                    "p90": round(_percentile(values, 0.9), 2),
+                    "p99": round(_percentile(values, 0.99), 2),
+                    "max": round(values[-1], 2),
+                }
+        return result
+
+    def print_report(self):
+        for name, stages in self.report().items():
+            parts = [f"{stage} p50 {s['p50']:.1f} / p90 {s['p90']:.1f} / max {s['max']:.1f} ms"
+                     for stage, s in stages.items()]
+            count = stages["total"]["count"] if "total" in stages else 0
+            print(f"Latency {name} (n={count}): " + "; ".join(parts))
+
+    def dump_json(self, path=None):
+        """写出统计结果，返回文件路径"""
+        if path is None:
+            path = os.path.join(LATENCY_REPORT_DIR, time.strftime("latency_%Y%m%d_%H%M%S.json"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
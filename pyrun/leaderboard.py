@@ -0,0 +1,371 @@
+# leaderboard.py
+# 排行榜存储: 内存中的名次索引 + 追加写日志。
+#   RankIndex    有序集合，名次、按名次取元素都是 O(log n)
+#   Leaderboard  每个玩家一条成绩，提交时更新索引并把记录交给后台线程追加到日志；
+#                日志中的过期记录超过一半时由后台线程压缩(写新文件后原子替换)
+#
+# 排名规则: 玩家得分高者在前；相同时到达关卡高者在前；再相同时 Trump 得分低者在前；
+# 全部相同时先达到该成绩的在前。
+# HTTP 接口见 leaderboard_server.py。
+import json
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left, insort
+from config import LEADERBOARD_LOG_PATH, LEADERBOARD_FLUSH_INTERVAL, LEADERBOARD_COMPACT_MIN_RECORDS
+
+_LOAD = 1000  # 每个小列表的目标长度，超过两倍时拆分
+_STOP = object()
+
+
+class RankIndex:
+    """支持按名次查询的有序集合(元素必须互不相同)
+
+    元素按顺序分在若干个有序的小列表中，树状数组记录各小列表的长度:
+    求名次 = 前面小列表的长度之和 + 本列表内二分；按名次取元素时在树状数组上二分。
+    插入和删除只移动一个小列表中的元素，小列表拆分或删空时才重建树状数组。
+    """
+
+    def __init__(self, items=(), load=_LOAD):
+        self.load = load
+        items = sorted(items)
+        self._lists = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [sub[-1] for sub in self._lists]
+        self._len = len(items)
+        self._build_tree()
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for sub in self._lists:
+            yield from sub
+
+    def __contains__(self, item):
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return False
+        sub = self._lists[i]
+        j = bisect_left(sub, item)
+        return sub[j] == item
+
+    # --- 树状数组(下标从1开始，_tree[i] 是若干个连续小列表的长度之和) ---
+
+    def _build_tree(self):
+        tree = [0] + [len(sub) for sub in self._lists]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, index, delta):
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _tree_prefix(self, end):
+        """前 end 个小列表的元素总数"""
+        tree = self._tree
+        total = 0
+        while end > 0:
+            total += tree[end]
+            end -= end & -end
+        return total
+
+    def _tree_locate(self, index):
+        """名次 index(从0开始)所在的 (小列表下标, 列表内下标)"""
+        tree = self._tree
+        size = len(tree) - 1
+        pos = 0
+        step = 1 << size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= index:
+                pos = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return pos, index
+
+    # --- 修改 ---
+
+    def add(self, item):
+        maxes = self._maxes
+        if not maxes:
+            self._lists = [[item]]
+            self._maxes = [item]
+            self._len = 1
+            self._build_tree()
+            return
+        i = bisect_left(maxes, item)
+        if i == len(maxes):
+            i -= 1
+            self._lists[i].append(item)
+            maxes[i] = item
+        else:
+            insort(self._lists[i], item)
+        self._len += 1
+        sub = self._lists[i]
+        if len(sub) > 2 * self.load:
+            half = len(sub) // 2
+            self._lists[i:i + 1] = [sub[:half], sub[half:]]
+            maxes[i:i + 1] = [sub[half - 1], sub[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, item):
+        """删除元素，不存在时抛出 KeyError"""
+        maxes = self._maxes
+        i = bisect_left(maxes, item)
+        if i == len(maxes):
+            raise KeyError(item)
+        sub = self._lists[i]
+        j = bisect_left(sub, item)
+        if sub[j] != item:
+            raise KeyError(item)
+        del sub[j]
+        self._len -= 1
+        if sub:
+            maxes[i] = sub[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._lists[i]
+            del maxes[i]
+            self._build_tree()
+
+    # --- 查询 ---
+
+    def rank(self, item):
+        """小于 item 的元素个数(item 在集合中时就是它的名次，从0开始)"""
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return self._len
+        return self._tree_prefix(i) + bisect_left(self._lists[i], item)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("RankIndex index out of range")
+        i, j = self._tree_locate(index)
+        return self._lists[i][j]
+
+    def slice(self, start, stop):
+        """名次 [start, stop) 的元素列表"""
+        start = max(0, start)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        i, j = self._tree_locate(start)
+        result = []
+        wanted = stop - start
+        while len(result) < wanted:
+            sub = self._lists[i]
+            result.extend(sub[j:j + wanted - len(result)])
+            i += 1
+            j = 0
+        return result
+
+
+def _sort_key(player_id, score, trump_score, max_level, seq):
+    return (-score, -max_level, trump_score, seq, player_id)
+
+
+def _row(key, rank):
+    return {"rank": rank, "player_id": key[4], "score": -key[0], "trump_score": key[2], "max_level": -key[1]}
+
+
+class Leaderboard:
+    """排行榜
+
+    所有方法都可以在多个线程中调用(例如HTTP服务的请求线程)。
+    提交成绩只更新内存，日志由后台线程按批次追加，因此查询和提交都不等待磁盘。
+
+    Args:
+        log_path (str): 日志文件路径，每行一条 JSON 成绩记录，同一玩家以最后一条为准
+        flush_interval (float): 后台线程最长等待多少秒后写入一批记录
+        compact_min_records (int): 日志记录数至少达到这个数量才考虑压缩
+    """
+
+    def __init__(self, log_path=LEADERBOARD_LOG_PATH, flush_interval=LEADERBOARD_FLUSH_INTERVAL,
+                 compact_min_records=LEADERBOARD_COMPACT_MIN_RECORDS):
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.compact_min_records = compact_min_records
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._keys = {}  # player_id -> 排序键
+        self._seq = 0
+        self._log_records = 0
+
+        directory = os.path.dirname(log_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        self._replay()
+        self._index = RankIndex(self._keys.values())
+        if self._keys:
+            print(f"Leaderboard: loaded {len(self._keys)} players from {self._log_records} records "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+        self._log = open(log_path, "a", encoding="utf-8")
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="LeaderboardWriter", daemon=True)
+        self._writer.start()
+
+    def _replay(self):
+        if not os.path.exists(self.log_path):
+            return
+        keys = self._keys
+        seq = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if record.get("deleted"):
+                        keys.pop(record["player_id"], None)
+                        self._log_records += 1
+                        continue
+                    key = _sort_key(record["player_id"], record["score"], record["trump_score"],
+                                    record["max_level"], record["seq"])
+                except (ValueError, KeyError, TypeError):
+                    # 写到一半时中断的最后一行
+                    print(f"Warning: Skipping malformed leaderboard record: {line[:80]!r}")
+                    continue
+                keys[key[4]] = key
+                seq = max(seq, key[3])
+                self._log_records += 1
+        self._seq = seq
+
+    # --- 写操作 ---
+
+    def submit(self, player_id, score, trump_score, max_level):
+        """提交玩家的最新成绩
+
+        Returns:
+            int: 提交后的名次(从1开始)
+        """
+        with self._lock:
+            old = self._keys.get(player_id)
+            if old is not None and (old[0], old[1], old[2]) == (-score, -max_level, trump_score):
+                return self._index.rank(old) + 1  # 成绩没有变化，保留原来的先后顺序
+            self._seq += 1
+            key = _sort_key(player_id, score, trump_score, max_level, self._seq)
+            if old is not None:
+                self._index.remove(old)
+            self._index.add(key)
+            self._keys[player_id] = key
+            rank = self._index.rank(key) + 1
+        self._pending.put({"player_id": player_id, "score": score, "trump_score": trump_score,
+                           "max_level": max_level, "seq": key[3]})
+        return rank
+
+    def remove(self, player_id):
+        """删除玩家，返回是否存在"""
+        with self._lock:
+            key = self._keys.pop(player_id, None)
+            if key is None:
+                return False
+            self._index.remove(key)
+        # 重放时删除该玩家，压缩后记录消失
+        self._pending.put({"player_id": player_id, "deleted": True})
+        return True
+
+    # --- 查询 ---
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, player_id):
+        """玩家的成绩和名次，不存在时为 None"""
+        with self._lock:
+            key = self._keys.get(player_id)
+            if key is None:
+                return None
+            return _row(key, self._index.rank(key) + 1)
+
+    def top(self, limit=10, offset=0):
+        """名次 offset+1 起的 limit 个玩家"""
+        with self._lock:
+            keys = self._index.slice(offset, offset + limit)
+        return [_row(key, offset + i + 1) for i, key in enumerate(keys)]
+
+    def around(self, player_id, radius=5):
+        """玩家本人及前后各 radius 名，玩家不存在时为空列表"""
+        with self._lock:
+            key = self._keys.get(player_id)
+            if key is None:
+                return []
+            rank = self._index.rank(key)
+            start = max(0, rank - radius)
+            keys = self._index.slice(start, rank + radius + 1)
+        return [_row(key, start + i + 1) for i, key in enumerate(keys)]
+
+    # --- 日志 ---
+
+    def flush(self):
+        """阻塞直到已提交的成绩全部写入日志"""
+        self._pending.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._pending.put(_STOP)
+            self._writer.join()
+        self._log.close()
+
+    def _writer_loop(self):
+        running = True
+        while running:
+            item = self._pending.get()
+            batch = []
+            taken = 0
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                taken += 1
+                if item is _STOP:
+                    running = False
+                    break
+                batch.append(item)
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+
+            if batch:
+                try:
+                    self._log.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch))
+                    self._log.flush()
+                    self._log_records += len(batch)
+                    if self._log_records >= max(self.compact_min_records, 2 * len(self._keys)):
+                        self._compact()
+                except OSError as e:
+                    print(f"Warning: Failed to write leaderboard log: {e}")
+
+            for _ in range(taken):
+                self._pending.task_done()
+
+    def _compact(self):
+        """用当前的全部成绩重写日志(在写线程中调用)
+
+        快照之后提交的成绩仍在队列中，会追加到新文件里，不会丢失。
+        """
+        with self._lock:
+            keys = list(self._keys.values())
+        temp_path = self.log_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key in keys:
+                record = {"player_id": key[4], "score": -key[0], "trump_score": key[2],
+                          "max_level": -key[1], "seq": key[3]}
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log.close()
+        os.replace(temp_path, self.log_path)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log_records = len(keys)
+        self.compactions += 1
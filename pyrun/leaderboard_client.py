@@ -0,0 +1,69 @@
+# leaderboard_client.py
+# 游戏把每关结束后的成绩提交到排行榜服务(leaderboard_server.py)。
+# 请求在后台线程发送，服务不可用时只打印一次警告，不影响游戏。
+import json
+import queue
+import threading
+import urllib.error
+import urllib.request
+
+_STOP = object()
+
+
+class LeaderboardReporter:
+    """后台提交成绩
+
+    同一玩家排队中的多次提交只发送最新的一次。
+
+    Args:
+        url (str): 服务地址，例如 http://127.0.0.1:3002
+        timeout (float): 单次请求的超时(秒)
+    """
+
+    def __init__(self, url, timeout=2.0):
+        self.endpoint = url.rstrip("/") + "/api/leaderboard/results"
+        self.timeout = timeout
+        self.last_rank = None
+        self._latest = {}  # player_id -> 尚未发送的最新成绩
+        self._latest_lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._warned = False
+        self._sender = threading.Thread(target=self._sender_loop, name="LeaderboardReporter", daemon=True)
+        self._sender.start()
+
+    def submit(self, player_id, score, trump_score, max_level):
+        """排队提交成绩，立即返回"""
+        with self._latest_lock:
+            queued = player_id in self._latest
+            self._latest[player_id] = {"player_id": player_id, "score": score,
+                                       "trump_score": trump_score, "max_level": max_level}
+        if not queued:
+            self._pending.put(player_id)
+
+    def close(self):
+        """发送剩余的成绩后结束后台线程"""
+        if self._sender.is_alive():
+            self._pending.put(_STOP)
+            self._sender.join()
+
+    def _sender_loop(self):
+        while True:
+            player_id = self._pending.get()
+            if player_id is _STOP:
+                break
+            with self._latest_lock:
+                result = self._latest.pop(player_id, None)
+            if result is not None:
+                self._send(result)
+
+    def _send(self, result):
+        request = urllib.request.Request(self.endpoint, data=json.dumps(result).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self.last_rank = json.loads(response.read().decode("utf-8")).get("rank")
+            self._warned = False
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            if not self._warned:
+                print(f"Warning: Failed to submit result to leaderboard: {e}")
+                self._warned = True
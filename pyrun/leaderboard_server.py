@@ -0,0 +1,88 @@
+# leaderboard_server.py
+# 排行榜HTTP服务(Flask)。游戏在每关结束时提交成绩(见 leaderboard_client.py)。
+#
+#   POST /api/leaderboard/results               {"player_id", "score", "trump_score", "max_level"} -> 名次
+#   GET  /api/leaderboard/top?limit=10&offset=0  前K名
+#   GET  /api/leaderboard/players/<id>?radius=5  玩家名次及前后的玩家
+#   GET  /api/leaderboard/stats                  玩家数量
+#
+# 启动: python leaderboard_server.py [--port 3002] [--log saves/leaderboard.log]
+import argparse
+from flask import Flask, jsonify, request
+from leaderboard import Leaderboard
+from config import LEADERBOARD_HOST, LEADERBOARD_PORT, LEADERBOARD_LOG_PATH
+
+MAX_PAGE_SIZE = 100
+_RESULT_FIELDS = ("score", "trump_score", "max_level")
+
+
+def _int_arg(name, default, low, high):
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        value = default
+    return max(low, min(high, value))
+
+
+def create_app(board):
+    """创建使用给定排行榜的 Flask 应用
+
+    Args:
+        board (Leaderboard): 排行榜存储
+    """
+    app = Flask(__name__)
+
+    @app.after_request
+    def allow_dev_server(response):
+        # 与 server/index.cjs 相同，允许 Vite 开发服务器的页面访问
+        response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
+        return response
+
+    @app.post("/api/leaderboard/results")
+    def submit_result():
+        data = request.get_json(silent=True) or {}
+        player_id = data.get("player_id")
+        if not isinstance(player_id, str) or not player_id:
+            return jsonify(success=False, message="Invalid result. player_id is required."), 400
+        values = []
+        for field in _RESULT_FIELDS:
+            value = data.get(field)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                return jsonify(success=False, message=f"Invalid result. {field} must be a non-negative integer."), 400
+            values.append(value)
+        rank = board.submit(player_id, *values)
+        return jsonify(success=True, rank=rank, players=len(board))
+
+    @app.get("/api/leaderboard/top")
+    def top():
+        limit = _int_arg("limit", 10, 1, MAX_PAGE_SIZE)
+        offset = _int_arg("offset", 0, 0, max(0, len(board) - 1))
+        return jsonify(success=True, players=len(board), entries=board.top(limit, offset))
+
+    @app.get("/api/leaderboard/players/<player_id>")
+    def player(player_id):
+        radius = _int_arg("radius", 5, 0, MAX_PAGE_SIZE // 2)
+        entries = board.around(player_id, radius)
+        if not entries:
+            return jsonify(success=False, message="Player not found."), 404
+        me = next(entry for entry in entries if entry["player_id"] == player_id)
+        return jsonify(success=True, player=me, neighbours=entries)
+
+    @app.get("/api/leaderboard/stats")
+    def stats():
+        return jsonify(success=True, players=len(board))
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meme vs Trump leaderboard service")
+    parser.add_argument("--host", default=LEADERBOARD_HOST)
+    parser.add_argument("--port", type=int, default=LEADERBOARD_PORT)
+    parser.add_argument("--log", default=LEADERBOARD_LOG_PATH, help="append-only results log")
+    args = parser.parse_args()
+    board = Leaderboard(args.log)
+    try:
+        create_app(board).run(host=args.host, port=args.port, threaded=True)
+    finally:
+        board.close()
@@ -1,8 +1,11 @@
 # loading_screen.py
 import pygame
 import time
-import os
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, load_image
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, IMAGE_PATHS, LOADING_TRUMP_SIZE, load_image
+from fonts import get_font, render_text
+from frame_pacer import FramePacer
+import render_backend
+import startup_timeline
 
 class LoadingScreen:
     def __init__(self, screen):
@@ -12,17 +15,15 @@ class LoadingScreen:
             screen: pygame Surface对象，游戏的主屏幕
         """
         self.screen = screen
-        self.font = pygame.font.SysFont(None, 36)
-        self.small_font = pygame.font.SysFont(None, 24)
+        self.font = get_font(36)
+        self.small_font = get_font(24)
         
         # 加载Trump图像
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        trump_path = os.path.join(script_dir, "assets", "trump.png")
         try:
-            self.trump_image = load_image(trump_path, size=(150, 200))
+            self.trump_image = load_image(IMAGE_PATHS["trump"], size=LOADING_TRUMP_SIZE)
         except:
             # 如果无法加载特定图像，创建一个占位符
-            self.trump_image = pygame.Surface((150, 200))
+            self.trump_image = pygame.Surface(LOADING_TRUMP_SIZE)
             self.trump_image.fill((255, 215, 0))  # 金色背景
             text_surf = self.font.render("TRUMP", True, (0, 0, 0))
             self.trump_image.blit(text_surf, (30, 80))
@@ -71,7 +72,7 @@ class LoadingScreen:
         # 绘制"NOW LOADING"文本
         dots = "." * self.dots_count
         loading_text = f"NOW LOADING{dots}"
-        loading_surf = self.font.render(loading_text, True, WHITE)
+        loading_surf = render_text(loading_text, 36, WHITE)
         loading_rect = loading_surf.get_rect(center=(SCREEN_WIDTH // 2, self.progress_bar_y - 30))
         self.screen.blit(loading_surf, loading_rect)
         
@@ -92,7 +93,8 @@ class LoadingScreen:
                          self.progress_bar_width, self.progress_bar_height), 2)
         
         # 更新屏幕
-        pygame.display.flip()
+        render_backend.flip()
+        startup_timeline.mark_once("first_frame")
     
     def run(self, load_resources_func=None):
         """运行加载页面
@@ -103,7 +105,7 @@ class LoadingScreen:
         Returns:
             bool: 加载是否完成
         """
-        clock = pygame.time.Clock()
+        frame_pacer = FramePacer(fps=30)
         
         # 如果提供了资源加载函数，则使用它
         if load_resources_func:
@@ -113,11 +115,13 @@ class LoadingScreen:
                     self.draw()
                     
                     # 处理事件，允许用户退出
-                    for event in pygame.event.get():
+                    for event in frame_pacer.events():
+                        event = render_backend.translate_event(event)
+                        frame_pacer.handle_event(event)
                         if event.type == pygame.QUIT:
                             return False
                     
-                    clock.tick(30)
+                    frame_pacer.tick()
             except Exception as e:
                 print(f"Error loading resources: {e}")
                 return False
@@ -128,13 +132,15 @@ class LoadingScreen:
                 self.draw()
                 
                 # 处理事件，允许用户退出
-                for event in pygame.event.get():
+                for event in frame_pacer.events():
+                    event = render_backend.translate_event(event)
+                    frame_pacer.handle_event(event)
                     if event.type == pygame.QUIT:
                         return False
                 
                 # 控制加载速度
                 pygame.time.delay(50)  # 50毫秒延迟
-                clock.tick(30)
+                frame_pacer.tick()
         
         # 完成加载后再显示一小段时间
         pygame.time.delay(500)
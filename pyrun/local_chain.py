@@ -0,0 +1,365 @@
+# local_chain.py
+# card_system / meme_nft 合约的进程内替身，用于在没有Sui节点时压测客户端的抽卡流程。
+# 与 move/meme_game/sources/card_system.move 保持一致:
+#   - 单抽 SINGLE_DRAW_FEE、十连 TEN_DRAW_FEE，费用转给管理员，total_draws / total_fees 在抽卡前累加
+#   - select_card_type: (时间戳 + total_draws) % 100 落在累计掉落率的哪一段；十连的第 i 张时间戳加 i
+#   - 每张卡调用 mint_from_card_system 铸造NFT并发出 NFTMinted，随后发出 CardDrawn
+#   - 余额不足时交易中止(EInsufficientFunds)，状态不变
+# 合约创建了 UserDrawHistory 却没有写入记录，这里按它的字段记录每个用户的抽卡历史。
+# 与合约相同，mint_from_card_system 不增加 minted_count(只有 mint_admin 增加)，铸造总数见 nft_count。
+#
+# 事件格式与 Sui 事件 JSON 相同: {"type": "<package>::card_system::CardDrawn", "parsedJson": {...}}。
+#
+# 压测: python local_chain.py --draws 20000 --clients 8 --batch 64 [--latency 0.05] [--ten]
+import argparse
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from config import LOCAL_CHAIN_BATCH_SIZE, LOCAL_CHAIN_BATCH_WAIT, LOCAL_CHAIN_LATENCY
+
+PACKAGE = "0x0"  # 本地替身的包地址
+SINGLE_DRAW_FEE = 10_000_000  # 0.01 SUI
+TEN_DRAW_FEE = 90_000_000  # 0.09 SUI，打9折
+
+# 合约中止码
+E_INSUFFICIENT_FUNDS = 1
+E_NOT_AUTHORIZED = 2
+E_INVALID_CARD_TYPE = 3
+E_PROBABILITY_NOT_EQUAL_TO_100 = 4
+
+CardType = namedtuple("CardType", ["id", "name", "description", "image_url_prefix", "rarity", "drop_rate"])
+DrawRecord = namedtuple("DrawRecord", ["timestamp", "card_type_id", "nft_id"])
+TransactionResult = namedtuple("TransactionResult", [
+    "digest", "sender", "function", "success", "abort_code", "events", "submitted_at", "executed_at",
+])
+
+# create_card_config 中初始化的卡片类型
+CARD_TYPES = (
+    CardType(1, "Common Meme", "A common meme card", "https://memevstrump.game/nft/common/", 1, 60),
+    CardType(2, "Uncommon Meme", "An uncommon meme card", "https://memevstrump.game/nft/uncommon/", 2, 25),
+    CardType(3, "Rare Meme", "A rare meme card", "https://memevstrump.game/nft/rare/", 3, 10),
+    CardType(4, "Epic Meme", "An epic meme card", "https://memevstrump.game/nft/epic/", 4, 4),
+    CardType(5, "Legendary Meme", "A legendary meme card", "https://memevstrump.game/nft/legendary/", 5, 1),
+)
+
+
+class MoveAbort(Exception):
+    """交易中止，code 为合约中的错误代码"""
+
+    def __init__(self, code):
+        super().__init__(f"Move abort {code}")
+        self.code = code
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class LocalCardChain:
+    """card_system 与 meme_nft 的状态和入口函数
+
+    每笔交易在锁内完整执行，要么全部生效，要么中止且不改变状态。
+
+    Args:
+        card_types (tuple): 卡片类型，掉落率之和必须为100
+        admin (str): 管理员地址(收取费用)
+        clock (callable, optional): 返回毫秒时间戳，默认使用系统时间
+    """
+
+    def __init__(self, card_types=CARD_TYPES, admin="0xad", clock=None):
+        if not card_types:
+            raise MoveAbort(E_INVALID_CARD_TYPE)
+        if sum(card_type.drop_rate for card_type in card_types) != 100:
+            raise MoveAbort(E_PROBABILITY_NOT_EQUAL_TO_100)
+        self.card_types = tuple(card_types)
+        # select_card_type 的查表: 0-99 -> 卡片类型
+        self._by_roll = []
+        for card_type in self.card_types:
+            self._by_roll.extend([card_type] * card_type.drop_rate)
+        self.admin = admin
+        self.clock = clock or _now_ms
+        self.single_draw_fee = SINGLE_DRAW_FEE
+        self.ten_draw_fee = TEN_DRAW_FEE
+        self.total_draws = 0
+        self.total_fees = 0
+        self.minted_count = 0
+        self.nft_count = 0
+        self.transactions = 0
+        self.balances = {}  # 地址 -> SUI 余额(MIST)
+        self.histories = {}  # 地址 -> [DrawRecord]
+        self.nfts = {}  # nft_id -> (名称, 图片URL, 稀有度, 持有者)
+        self._object_counter = 0
+        self._subscribers = ()
+        self._lock = threading.Lock()
+
+    def fund(self, address, amount):
+        """给地址增加余额(测试用的水龙头)"""
+        with self._lock:
+            self.balances[address] = self.balances.get(address, 0) + amount
+
+    def subscribe(self, handler):
+        """订阅事件，handler(event) 在执行交易的线程上调用
+
+        Returns:
+            callable: 调用即可退订
+        """
+        self._subscribers = self._subscribers + (handler,)
+
+        def unsubscribe():
+            self._subscribers = tuple(h for h in self._subscribers if h is not handler)
+        return unsubscribe
+
+    def select_card_type(self, seed):
+        """与合约的 select_card_type 相同"""
+        return self._by_roll[seed % 100]
+
+    def get_user_total_draws(self, address):
+        return len(self.histories.get(address, ()))
+
+    # --- 交易 ---
+
+    def execute(self, sender, function, submitted_at=None):
+        """执行一笔交易
+
+        Args:
+            sender (str): 发送者地址
+            function (str): "draw_card" 或 "draw_cards_batch"
+
+        Returns:
+            TransactionResult
+        """
+        with self._lock:
+            return self._execute(sender, function, submitted_at)
+
+    def execute_block(self, transactions):
+        """在一次加锁内依次执行多笔交易
+
+        Args:
+            transactions (list): (sender, function, submitted_at) 列表
+
+        Returns:
+            list: 每笔交易的 TransactionResult
+        """
+        with self._lock:
+            return [self._execute(sender, function, submitted_at) for sender, function, submitted_at in transactions]
+
+    def _execute(self, sender, function, submitted_at):
+        self.transactions += 1
+        digest = f"tx{self.transactions}"
+        events = []
+        abort_code = None
+        try:
+            if function == "draw_card":
+                self._draw(sender, 1, self.single_draw_fee, events)
+            elif function == "draw_cards_batch":
+                self._draw(sender, 10, self.ten_draw_fee, events)
+            else:
+                raise ValueError(f"Unknown entry function: {function}")
+        except MoveAbort as e:
+            abort_code = e.code
+            events = []
+        result = TransactionResult(digest, sender, function, abort_code is None, abort_code, events,
+                                   submitted_at, time.perf_counter())
+        for handler in self._subscribers:
+            for event in events:
+                handler(event)
+        return result
+
+    def _new_id(self):
+        self._object_counter += 1
+        return f"0x{self._object_counter:064x}"
+
+    def _draw(self, sender, count, fee, events):
+        balance = self.balances.get(sender, 0)
+        if balance < fee:
+            raise MoveAbort(E_INSUFFICIENT_FUNDS)
+        self.balances[sender] = balance - fee
+        self.balances[self.admin] = self.balances.get(self.admin, 0) + fee
+        self.total_draws += count
+        self.total_fees += fee
+        timestamp = self.clock()
+        history = self.histories.setdefault(sender, [])
+        for i in range(count):
+            derived_timestamp = timestamp + i
+            card_type = self.select_card_type(derived_timestamp + self.total_draws)
+            url = f"{card_type.image_url_prefix}{derived_timestamp % 1000000}.png"
+            nft_id = self._mint_from_card_system(card_type, url, sender, events)
+            history.append(DrawRecord(derived_timestamp, card_type.id, nft_id))
+            events.append({"type": f"{PACKAGE}::card_system::CardDrawn", "parsedJson": {
+                "drawer": sender, "card_type_id": card_type.id, "card_name": card_type.name,
+                "rarity": card_type.rarity, "nft_id": nft_id, "timestamp": str(derived_timestamp),
+            }})
+
+    def _mint_from_card_system(self, card_type, url, recipient, events):
+        nft_id = self._new_id()
+        self.nfts[nft_id] = (card_type.name, url, card_type.rarity, recipient)
+        self.nft_count += 1
+        events.append({"type": f"{PACKAGE}::meme_nft::NFTMinted", "parsedJson": {
+            "nft_id": nft_id, "name": card_type.name, "creator": PACKAGE, "owner": recipient,
+            "rarity": card_type.rarity,
+        }})
+        return nft_id
+
+
+_STOP = object()
+
+
+class TransactionQueue:
+    """客户端的批量提交
+
+    submit() 立即返回 Future；后台线程每次取出最多 batch_size 笔交易(第一笔到达后最多再等
+    max_wait 秒)，作为一个块执行。latency 模拟每个块一次的网络往返和确认时间，
+    批量越大，分摊到每笔交易上的等待越少。
+
+    Args:
+        chain (LocalCardChain): 执行交易的链
+        batch_size (int): 每块最多的交易数
+        max_wait (float): 凑块的最长等待(秒)
+        latency (float): 每块的模拟确认延迟(秒)
+    """
+
+    def __init__(self, chain, batch_size=LOCAL_CHAIN_BATCH_SIZE, max_wait=LOCAL_CHAIN_BATCH_WAIT,
+                 latency=LOCAL_CHAIN_LATENCY):
+        self.chain = chain
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.latency = latency
+        self.blocks = 0
+        self._pending = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, name="LocalChainBlocks", daemon=True)
+        self._worker.start()
+
+    def submit(self, sender, function="draw_card"):
+        """提交交易
+
+        Returns:
+            concurrent.futures.Future: 结果为 TransactionResult
+        """
+        future = Future()
+        self._pending.put((sender, function, time.perf_counter(), future))
+        return future
+
+    def close(self):
+        """执行完已提交的交易后结束"""
+        if self._worker.is_alive():
+            self._pending.put(_STOP)
+            self._worker.join()
+
+    def _worker_loop(self):
+        running = True
+        while running:
+            item = self._pending.get()
+            block = []
+            deadline = time.monotonic() + self.max_wait
+            while item is not None:
+                if item is _STOP:
+                    running = False
+                    break
+                block.append(item)
+                if len(block) >= self.batch_size:
+                    break
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+            if not block:
+                continue
+            if self.latency:
+                time.sleep(self.latency)
+            results = self.chain.execute_block([(sender, function, submitted) for sender, function, submitted, _ in block])
+            self.blocks += 1
+            for (_, _, _, future), result in zip(block, results):
+                future.set_result(result)
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def load_test(draws=20000, clients=8, batch_size=LOCAL_CHAIN_BATCH_SIZE, max_wait=LOCAL_CHAIN_BATCH_WAIT,
+              latency=LOCAL_CHAIN_LATENCY, ten_draw=False, in_flight=64):
+    """多个客户端线程持续提交抽卡交易，统计吞吐量和确认延迟
+
+    Args:
+        draws (int): 总抽卡数
+        clients (int): 客户端线程数
+        ten_draw (bool): True 用十连抽(每笔10张)
+        in_flight (int): 每个客户端最多同时等待的交易数
+
+    Returns:
+        dict: 吞吐量、延迟分位数(毫秒)和各稀有度的实际占比
+    """
+    chain = LocalCardChain()
+    tx_queue = TransactionQueue(chain, batch_size, max_wait, latency)
+    function, per_tx, fee = ("draw_cards_batch", 10, TEN_DRAW_FEE) if ten_draw else ("draw_card", 1, SINGLE_DRAW_FEE)
+    tx_per_client = max(1, draws // per_tx // clients)
+    rarity_counts = {}
+
+    def count_rarity(event):
+        if event["type"].endswith("::CardDrawn"):
+            rarity = event["parsedJson"]["rarity"]
+            rarity_counts[rarity] = rarity_counts.get(rarity, 0) + 1
+    chain.subscribe(count_rarity)
+
+    latencies = [[] for _ in range(clients)]
+    failures = [0] * clients
+
+    def client(index):
+        def collect(result):
+            latencies[index].append((result.executed_at - result.submitted_at) * 1000.0)
+            if not result.success:
+                failures[index] += 1
+
+        sender = f"0xc{index:x}"
+        chain.fund(sender, fee * tx_per_client)
+        window = []
+        for _ in range(tx_per_client):
+            window.append(tx_queue.submit(sender, function))
+            if len(window) >= in_flight:
+                collect(window.pop(0).result())
+        for future in window:
+            collect(future.result())
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    tx_queue.close()
+
+    values = sorted(v for client_latencies in latencies for v in client_latencies)
+    total = sum(rarity_counts.values())
+    return {
+        "transactions": len(values),
+        "draws": chain.total_draws,
+        "failed": sum(failures),
+        "blocks": tx_queue.blocks,
+        "seconds": round(elapsed, 3),
+        "draws_per_second": round(chain.total_draws / elapsed),
+        "latency_ms": {"p50": round(_percentile(values, 0.5), 2), "p90": round(_percentile(values, 0.9), 2),
+                       "p99": round(_percentile(values, 0.99), 2), "max": round(values[-1], 2)},
+        "rarity_share": {rarity: round(count / total, 3) for rarity, count in sorted(rarity_counts.items())},
+        "total_fees": chain.total_fees,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test card draws against the local chain stand-in")
+    parser.add_argument("--draws", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=LOCAL_CHAIN_BATCH_SIZE, help="transactions per block")
+    parser.add_argument("--wait", type=float, default=LOCAL_CHAIN_BATCH_WAIT, help="seconds to fill a block")
+    parser.add_argument("--latency", type=float, default=LOCAL_CHAIN_LATENCY, help="simulated seconds per block")
+    parser.add_argument("--ten", action="store_true", help="use ten-card draws")
+    args = parser.parse_args()
+    report = load_test(args.draws, args.clients, args.batch, args.wait, args.latency, args.ten)
+    print(f"{report['draws']} draws in {report['transactions']} transactions / {report['blocks']} blocks, "
+          f"{report['failed']} failed, {report['seconds']}s")
+    print(f"Throughput: {report['draws_per_second']} draws/s")
+    latency = report["latency_ms"]
+    print(f"Latency: p50 {latency['p50']} / p90 {latency['p90']} / p99 {latency['p99']} / max {latency['max']} ms")
+    print("Rarity share: " + ", ".join(f"{rarity}: {share:.1%}" for rarity, share in report["rarity_share"].items()))
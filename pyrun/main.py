@@ -4,14 +4,18 @@
 # and the 'assets' folder (or whatever you named it) is in the same
 # directory as main_pygame.py, and contains the necessary images.
 
+import startup_timeline  # 最先导入，作为启动计时起点
 import pygame
 import time
 import random
-from game import Game
 from loading_screen import LoadingScreen
 from start_screen import StartScreen
+import side_effects
+from render_backend import open_display
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
 
+startup_timeline.mark("imports")
+
 def load_game_resources():
     """模拟加载游戏资源的函数，生成进度值
     
@@ -35,15 +39,19 @@ def load_game_resources():
 if __name__ == "__main__":
     # 初始化Pygame
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Meme vs Trump (Pygame Edition)")
+    # MEMEVSTRUMP_RENDERER=renderer 时使用 SDL Renderer 后端
+    display = open_display((SCREEN_WIDTH, SCREEN_HEIGHT), "Meme vs Trump (Pygame Edition)")
+    screen = display.screen
+    startup_timeline.mark("display_init")
     
     print("Starting Meme vs Trump (Pygame Edition)...")
     print("Ensure you have an 'assets' folder with images as specified in config.py")
     
     # 显示加载页面
     loading = LoadingScreen(screen)
-    if loading.run(load_game_resources):
+    loaded = loading.run(load_game_resources)
+    startup_timeline.report()
+    if loaded:
         # 加载完成后，显示开始页面
         start_screen = StartScreen(screen)
         choice = start_screen.run()
@@ -52,11 +60,15 @@ if __name__ == "__main__":
             # 根据用户选择启动游戏
             # 无论是'guest'还是'wallet'模式都启动游戏
             # 'wallet'模式已经在StartScreen中打开了浏览器
-            main_game = Game(screen=screen)
+            # 游戏模块和存档在首帧之后才导入，不计入启动时间
+            from game import Game
+            from profile_store import ProfileStore
+            main_game = Game(screen=screen, profile_store=ProfileStore(), player_id=choice)
             main_game.game_loop()
     else:
         # 如果加载被中断（例如用户关闭窗口）
         print("Game loading was interrupted.")
     
-    # 清理Pygame
+    # 等待开始页面提交的后台操作(打开浏览器)结束，然后清理Pygame
+    side_effects.shutdown()
     pygame.quit()
@@ -1,32 +1,40 @@
 # meme_card.py
-import pygame
-import time
-from config import STAR_COEFFICIENTS, IMAGE_PATHS, load_image, MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT, CELL_WIDTH, CELL_HEIGHT
-from battle_config import MEME_BASE_HEALTH, MEME_HEALTH_PER_STAR, MEME_ATTACK_INTERVAL, MEME_BASE_DAMAGE, MEME_PROJECTILE_SPEED
+import memory_stats
+from config import IMAGE_PATHS, load_image, MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT, BOARD_SPRITE_SIZE
+from battle_config import MEME_ATTACK_INTERVAL
+from meme_catalog import CATALOG, compute_stats
+from render_backend import draw_rect
+from sprite_effects import Animator
 
 class MemeCard:
     def __init__(self, name, base_damage, star_rating, image_key, is_preview=False):
         self.name = name
         self.base_damage = base_damage
         self.star_rating = star_rating
-        self.damage_coefficient = STAR_COEFFICIENTS.get(star_rating, 1.0)
         self.image_key = image_key
         
-        # 生命值相关
-        self.max_health = MEME_BASE_HEALTH + (star_rating - 1) * MEME_HEALTH_PER_STAR
+        # 目录中的类型直接取编译好的属性，未知类型(例如旧存档)按星级计算
+        self.type_id = CATALOG.find(name, star_rating)
+        if self.type_id is not None:
+            self.attack_damage = CATALOG.damage[self.type_id]
+            self.max_health = CATALOG.health[self.type_id]
+        else:
+            self.attack_damage, self.max_health = compute_stats(base_damage, star_rating)
         self.current_health = self.max_health
         
         # 攻击相关
-        self.last_attack_time = 0
+        self.last_attack_time = float("-inf")  # 放置后立即可以攻击
         self.attack_interval = MEME_ATTACK_INTERVAL
         
         image_path = IMAGE_PATHS.get(self.image_key, IMAGE_PATHS["default_meme"])
-        display_size = (MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT) if is_preview else (CELL_WIDTH - 10, CELL_HEIGHT - 10)
+        display_size = (MEME_CARD_UI_WIDTH, MEME_CARD_UI_HEIGHT) if is_preview else BOARD_SPRITE_SIZE
         self.image = load_image(image_path, size=display_size)
+        self.animator = Animator(self.image_key, self.image, tint=True)  # 棋盘上受击闪白、受伤变红
         self.rect = self.image.get_rect()
+        memory_stats.track_entity(self, self.image)
 
     def get_attack_damage(self):
-        return self.base_damage * self.damage_coefficient
+        return self.attack_damage
 
     def get_details(self):
         return f"{self.name} ({self.star_rating}★) - DMG: {self.get_attack_damage()}"
@@ -34,18 +42,39 @@ class MemeCard:
     def can_attack(self, current_time):
         return current_time - self.last_attack_time >= self.attack_interval
 
-    def create_projectile(self, target_x, target_y):
-        from projectile import Projectile
-        projectile = Projectile(
-            self.rect.centerx, 
-            self.rect.centery,
-            target_x,
-            target_y,
-            self.get_attack_damage()
-        )
-        self.last_attack_time = time.time()
+    def create_projectile(self, target_x, target_y, current_time, pool=None):
+        """向目标点发射投射物；给出 pool(ProjectilePool) 时从池中取出重复使用的对象"""
+        if pool is not None:
+            projectile = pool.acquire(self.rect.centerx, self.rect.centery, target_x, target_y,
+                                      self.get_attack_damage(), self.name)
+        else:
+            from projectile import Projectile
+            projectile = Projectile(
+                self.rect.centerx, 
+                self.rect.centery,
+                target_x,
+                target_y,
+                self.get_attack_damage(),
+                self.name
+            )
+        self.mark_attacked(current_time)
         return projectile
+
+    def mark_attacked(self, current_time):
+        # 开始新的攻击冷却(current_time 为游戏的模拟时间)
+        self.last_attack_time = current_time
     
+    def reset(self):
+        """恢复满血并清除攻击冷却(对象重复使用时调用)"""
+        self.current_health = self.max_health
+        self.last_attack_time = float("-inf")
+        self.image = self.animator.image
+        self.animator.reset(self.max_health)
+
+    def animate(self, now):
+        """按模拟时间选出当前帧"""
+        self.image = self.animator.frame(now, self.current_health, self.max_health)
+
     def take_damage(self, damage):
         self.current_health -= damage
         if self.current_health < 0:
@@ -57,25 +86,60 @@ class MemeCard:
     
     def draw(self, surface, x, y):
         self.rect.topleft = (x, y)
-        surface.blit(self.image, self.rect)
+        MemeCard.draw_view(surface, self)
+
+    @staticmethod
+    def draw_view(surface, view):
+        """绘制Meme图片和血条
+
+        view 可以是 MemeCard 本身，也可以是带有 image/rect/current_health/max_health 的快照
+        """
+        surface.blit(view.image, view.rect)
         
         # 修改：总是显示血条，除非满血
-        if self.current_health < self.max_health:  # 移除了 current_health > 0 的检查
-            health_bar_width = self.rect.width
+        if view.current_health < view.max_health:  # 移除了 current_health > 0 的检查
+            health_bar_width = view.rect.width
             health_bar_height = 5
-            health_ratio = self.current_health / self.max_health
+            health_ratio = view.current_health / view.max_health
             current_health_width = int(health_bar_width * health_ratio)
             
             # 绘制血条背景（红色）
-            pygame.draw.rect(surface, (255, 0, 0), (
-                self.rect.left, self.rect.top - health_bar_height - 2, 
+            draw_rect(surface, (255, 0, 0), (
+                view.rect.left, view.rect.top - health_bar_height - 2, 
                 health_bar_width, health_bar_height))
             
             # 绘制当前血量（绿色）
-            if self.current_health > 0:  # 只在有血量时绘制绿色部分
-                pygame.draw.rect(surface, (0, 255, 0), (
-                    self.rect.left, self.rect.top - health_bar_height - 2, 
+            if view.current_health > 0:  # 只在有血量时绘制绿色部分
+                draw_rect(surface, (0, 255, 0), (
+                    view.rect.left, view.rect.top - health_bar_height - 2, 
                     current_health_width, health_bar_height))
 
     def __str__(self):
-        return f"{self.name}({self.star_rating}*)" 
\ No newline at end of file
+        return f"{self.name}({self.star_rating}*)" 
+
+
+class MemePool:
+    """棋盘上 Meme 的对象池
+
+    Meme 被击败或关卡结束清空棋盘时放回池中，之后放置同一种卡牌时取出并重置，
+    不重新创建对象和加载图片。池中的数量不超过同时在棋盘上的数量。
+    """
+
+    def __init__(self):
+        self._free = {}  # (名称, 基础伤害, 星级, 图片) -> [MemeCard]
+
+    def acquire(self, name, base_damage, star_rating, image_key):
+        """取出一个满血的棋盘尺寸 MemeCard"""
+        free = self._free.get((name, base_damage, star_rating, image_key))
+        if free:
+            meme = free.pop()
+            meme.reset()
+            return meme
+        return MemeCard(name, base_damage, star_rating, image_key)
+
+    def release(self, meme):
+        """放回一个已经离开棋盘的 MemeCard"""
+        self._free.setdefault((meme.name, meme.base_damage, meme.star_rating, meme.image_key), []).append(meme)
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
@@ -0,0 +1,159 @@
+# meme_catalog.py
+# 读取 data/memes.json 中的Meme类型定义，校验一次后编译成按整数ID索引的数组。
+# 战斗中查询伤害/生命只需一次数组下标访问，成千上万种卡牌也能快速加载。
+import bisect
+import json
+from array import array
+from config import MEME_CATALOG_PATH, IMAGE_PATHS
+from battle_config import STAR_DAMAGE_COEFFICIENTS, MEME_BASE_HEALTH, MEME_HEALTH_PER_STAR
+
+_REQUIRED_FIELDS = {"name": str, "base_damage": (int, float), "star": int, "image_key": str}
+
+
+class CatalogError(ValueError):
+    """目录文件格式错误"""
+
+
+def compute_stats(base_damage, star):
+    """按星级计算 (单发伤害, 最大生命值)"""
+    damage = base_damage * STAR_DAMAGE_COEFFICIENTS.get(star, 1.0)
+    health = MEME_BASE_HEALTH + (star - 1) * MEME_HEALTH_PER_STAR
+    return damage, health
+
+
+class MemeCatalog:
+    """编译后的Meme目录
+
+    所有属性都是以类型ID为下标的数组:
+        damage[i]       单发伤害(已乘星级系数)
+        health[i]       最大生命值
+        star[i]         星级
+        rarity[i]       稀有度
+        image_index[i]  在 image_keys 中的下标
+    另有 by_name、by_star、by_rarity 索引和按掉落概率抽取用的累计权重。
+    """
+
+    def __init__(self, entries):
+        count = len(entries)
+        self.names = [e["name"] for e in entries]
+        self.base_damage = array("d", (e["base_damage"] for e in entries))
+        self.star = array("B", (e["star"] for e in entries))
+        self.rarity = array("B", (e.get("rarity", e["star"]) for e in entries))
+        self.damage = array("d")
+        self.health = array("i")
+        for e in entries:
+            damage, health = compute_stats(e["base_damage"], e["star"])
+            self.damage.append(e.get("damage", damage))
+            self.health.append(e.get("health", health))
+
+        self.image_keys = []
+        image_ids = {}
+        self.image_index = array("H")
+        for e in entries:
+            key = e["image_key"]
+            if key not in image_ids:
+                image_ids[key] = len(self.image_keys)
+                self.image_keys.append(key)
+            self.image_index.append(image_ids[key])
+
+        self.by_name = {name: i for i, name in enumerate(self.names)}
+        self.by_star = {}
+        self.by_rarity = {}
+        for i in range(count):
+            self.by_star.setdefault(self.star[i], array("I")).append(i)
+            self.by_rarity.setdefault(self.rarity[i], array("I")).append(i)
+
+        self._cumulative_weights = []
+        total = 0
+        for e in entries:
+            total += e.get("drop_rate", 1)
+            self._cumulative_weights.append(total)
+
+        # 与旧的 PREDEFINED_MEMES_POOL 相同格式的模板，供抽卡和存档使用
+        self.templates = [
+            {"name": e["name"], "base_damage": e["base_damage"], "star": e["star"], "image_key": e["image_key"]}
+            for e in entries
+        ]
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name, star=None):
+        """按名称(和星级)查找类型ID，找不到时返回 None"""
+        type_id = self.by_name.get(name)
+        if type_id is None or (star is not None and self.star[type_id] != star):
+            return None
+        return type_id
+
+    def image_key(self, type_id):
+        return self.image_keys[self.image_index[type_id]]
+
+    def template(self, type_id):
+        return self.templates[type_id]
+
+    def draw_type(self, rng):
+        """按 drop_rate 权重随机抽取一个类型ID(二分查找，O(log n))"""
+        if not self._cumulative_weights:
+            return None
+        point = rng.random() * self._cumulative_weights[-1]
+        return bisect.bisect_right(self._cumulative_weights, point)
+
+
+def validate_entries(entries):
+    """检查每个条目的字段和取值，有错误时抛出 CatalogError"""
+    if not isinstance(entries, list):
+        raise CatalogError("'memes' must be a list")
+    seen = set()
+    total_weight = 0
+    for index, entry in enumerate(entries):
+        where = f"memes[{index}]"
+        if not isinstance(entry, dict):
+            raise CatalogError(f"{where} must be an object")
+        for field, expected in _REQUIRED_FIELDS.items():
+            if field not in entry:
+                raise CatalogError(f"{where} is missing '{field}'")
+            if not isinstance(entry[field], expected) or isinstance(entry[field], bool):
+                raise CatalogError(f"{where}.{field} has the wrong type")
+        if entry["name"] in seen:
+            raise CatalogError(f"{where}: duplicate meme name '{entry['name']}'")
+        seen.add(entry["name"])
+        if entry["star"] not in STAR_DAMAGE_COEFFICIENTS:
+            raise CatalogError(f"{where}: star {entry['star']} has no damage coefficient")
+        if entry["image_key"] not in IMAGE_PATHS:
+            raise CatalogError(f"{where}: unknown image_key '{entry['image_key']}'")
+        if entry["base_damage"] < 0:
+            raise CatalogError(f"{where}: base_damage must not be negative")
+        rarity = entry.get("rarity", entry["star"])
+        if not isinstance(rarity, int) or not 1 <= rarity <= 255:
+            raise CatalogError(f"{where}: rarity must be an integer from 1 to 255")
+        drop_rate = entry.get("drop_rate", 1)
+        if not isinstance(drop_rate, (int, float)) or isinstance(drop_rate, bool) or drop_rate < 0:
+            raise CatalogError(f"{where}: drop_rate must be a non-negative number")
+        total_weight += drop_rate
+        damage = entry.get("damage", 0)
+        if not isinstance(damage, (int, float)) or isinstance(damage, bool) or damage < 0:
+            raise CatalogError(f"{where}: damage must be a non-negative number")
+        health = entry.get("health", 1)
+        if not isinstance(health, int) or isinstance(health, bool) or health < 1:
+            raise CatalogError(f"{where}: health must be a positive integer")
+    if entries and total_weight <= 0:
+        raise CatalogError("at least one meme must have a positive drop_rate")
+
+
+def load_catalog(path=MEME_CATALOG_PATH):
+    """读取、校验并编译目录文件
+
+    Returns:
+        MemeCatalog
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise CatalogError(f"{path}: top level must be an object")
+    entries = data.get("memes", [])
+    validate_entries(entries)
+    return MemeCatalog(entries)
+
+
+CATALOG = load_catalog()
+PREDEFINED_MEMES_POOL = CATALOG.templates
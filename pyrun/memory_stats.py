@@ -0,0 +1,202 @@
+# memory_stats.py
+# 内存统计: 记录存活的 pygame Surface(来源、尺寸、持有者类型、像素字节数)和各类实体的数量，
+# 结合 tracemalloc 快照，可以在游戏中用叠加层查看(F9)或导出为JSON(F10)。
+#
+# 默认关闭，关闭时 track_* 只做一次布尔判断。设置 MEMEVSTRUMP_MEMSTATS=1 从启动开始记录，
+# 或在游戏中按F9从当前时刻开始记录。
+import json
+import os
+import time
+import tracemalloc
+import weakref
+from config import (
+    MEMORY_STATS_ENABLED, MEMORY_TRACE_FRAMES, MEMORY_DUMP_DIR, MEMORY_OVERLAY_REFRESH, BLACK, WHITE
+)
+
+_enabled = False
+_surfaces = {}  # id(surface) -> _SurfaceRecord
+_entities = {}  # 类型名 -> WeakSet
+_last_snapshot = None  # 上次导出时的 tracemalloc 快照，用于计算增长
+_overlay_lines = []
+_overlay_time = float("-inf")
+
+
+class _SurfaceRecord:
+    __slots__ = ("ref", "origin", "size", "bytes", "owners")
+
+    def __init__(self, ref, origin, size, nbytes):
+        self.ref = ref
+        self.origin = origin
+        self.size = size
+        self.bytes = nbytes
+        self.owners = set()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    """开始记录(已创建的对象不会被补记)"""
+    global _enabled
+    _enabled = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+
+def track_surface(surface, origin, owner=None):
+    """登记一个 Surface，返回原对象
+
+    同一个 Surface 只登记一次，被多个类型共享时合并持有者。
+
+    Args:
+        surface (pygame.Surface): 要登记的表面
+        origin (str): 来源，例如图片文件名或 "projectile"
+        owner (str, optional): 持有者类型名
+    """
+    if not _enabled or surface is None:
+        return surface
+    key = id(surface)
+    record = _surfaces.get(key)
+    if record is None or record.ref() is not surface:
+        def forget(_, key=key):
+            if _surfaces.get(key) is record:
+                del _surfaces[key]
+        record = _SurfaceRecord(weakref.ref(surface, forget), origin,
+                                surface.get_size(), surface.get_pitch() * surface.get_height())
+        _surfaces[key] = record
+    if owner:
+        record.owners.add(owner)
+    return surface
+
+
+def track_entity(entity, surface=None):
+    """登记一个实体(按类型计数)，surface 为它持有的图片"""
+    if not _enabled:
+        return
+    name = type(entity).__name__
+    instances = _entities.get(name)
+    if instances is None:
+        instances = _entities[name] = weakref.WeakSet()
+    instances.add(entity)
+    if surface is not None:
+        track_surface(surface, "unknown", name)
+
+
+def _text_cache_stats():
+    from fonts import _text_cache
+    surfaces = list(_text_cache.values())
+    return {"count": len(surfaces), "bytes": sum(s.get_pitch() * s.get_height() for s in surfaces)}
+
+
+def collect(top_n=10, snapshot=True):
+    """汇总当前的内存统计
+
+    Args:
+        top_n (int): tracemalloc 分配最多和增长最多的位置各列出多少个
+        snapshot (bool): False 时只读取 tracemalloc 的当前和峰值(不拍快照，代价很小)
+
+    Returns:
+        dict: surfaces(总数和字节)、by_origin(按来源/尺寸/持有者分组，字节数从大到小)、
+            duplicates(同一来源和尺寸存在多个 Surface 的分组)、entities、text_cache、tracemalloc
+    """
+    groups = {}
+    total_bytes = 0
+    records = [r for r in list(_surfaces.values()) if r.ref() is not None]
+    for record in records:
+        owners = ",".join(sorted(record.owners)) or "-"
+        key = (record.origin, record.size, owners)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"origin": record.origin, "size": list(record.size), "owners": owners,
+                                   "count": 0, "bytes": 0}
+        group["count"] += 1
+        group["bytes"] += record.bytes
+        total_bytes += record.bytes
+    by_origin = sorted(groups.values(), key=lambda g: g["bytes"], reverse=True)
+
+    report = {
+        "time": time.time(),
+        "enabled": _enabled,
+        "surfaces": {"count": len(records), "bytes": total_bytes},
+        "by_origin": by_origin,
+        "duplicates": [g for g in by_origin if g["count"] > 1],
+        "entities": {name: len(instances) for name, instances in sorted(_entities.items())},
+        "text_cache": _text_cache_stats(),
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report["tracemalloc"] = {"current": current, "peak": peak}
+    if tracemalloc.is_tracing() and snapshot:
+        snapshot = tracemalloc.take_snapshot()
+        report["tracemalloc"].update({
+            "top": [{"where": str(stat.traceback), "size": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:top_n]],
+            "growth": [{"where": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                       for stat in snapshot.compare_to(_last_snapshot, "lineno")[:top_n]]
+                      if _last_snapshot is not None else [],
+        })
+        report["_snapshot"] = snapshot
+    return report
+
+
+def dump_json(path=None, top_n=25):
+    """把统计写入JSON文件，并记住本次的 tracemalloc 快照供下次比较增长
+
+    Returns:
+        str: 写入的文件路径
+    """
+    global _last_snapshot
+    report = collect(top_n)
+    snapshot = report.pop("_snapshot", None)
+    if snapshot is not None:
+        _last_snapshot = snapshot
+    if path is None:
+        path = os.path.join(MEMORY_DUMP_DIR, time.strftime("memory_%Y%m%d_%H%M%S.json"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def _format_bytes(n):
+    return f"{n / 1024:.0f} KiB" if n < 1024 * 1024 else f"{n / (1024 * 1024):.1f} MiB"
+
+
+def overlay_lines():
+    """叠加层要显示的文字(每 MEMORY_OVERLAY_REFRESH 秒重新统计一次)"""
+    global _overlay_lines, _overlay_time
+    now = time.perf_counter()
+    if now - _overlay_time < MEMORY_OVERLAY_REFRESH:
+        return _overlay_lines
+    _overlay_time = now
+    # 叠加层只显示堆的当前和峰值，不拍快照(快照只在 F10 导出时使用)
+    report = collect(snapshot=False)
+    surfaces = report["surfaces"]
+    text = report["text_cache"]
+    lines = [f"Surfaces: {surfaces['count']} ({_format_bytes(surfaces['bytes'])})",
+             f"Text cache: {text['count']} ({_format_bytes(text['bytes'])})"]
+    for group in report["by_origin"][:5]:
+        width, height = group["size"]
+        lines.append(f"  {group['origin']} {width}x{height} [{group['owners']}] "
+                     f"x{group['count']} {_format_bytes(group['bytes'])}")
+    if report["entities"]:
+        lines.append("Entities: " + ", ".join(f"{name} {count}" for name, count in report["entities"].items()))
+    if "tracemalloc" in report:
+        heap = report["tracemalloc"]
+        lines.append(f"Python heap: {_format_bytes(heap['current'])} (peak {_format_bytes(heap['peak'])})")
+    _overlay_lines = lines
+    return lines
+
+
+def draw_overlay(surface, x=10, y=90):
+    """在左上角绘制统计叠加层"""
+    from fonts import render_text
+    for line in overlay_lines():
+        text = render_text(line, 20, BLACK, WHITE)
+        surface.blit(text, (x, y))
+        y += text.get_height() + 2
+
+
+if MEMORY_STATS_ENABLED:
+    enable()
@@ -0,0 +1,184 @@
+# pathing.py
+# 敌人寻路用的距离场(flow field)。棋盘变化(放置Meme、Meme死亡、格子被封锁)时标记失效，
+# 下一次查询时重新计算两张表:
+#   前进表  每个格子走向白宫的下一格
+#   撤退表  每个格子走向撤退边(出生列)的下一格
+# 每个敌人每次移动只查一次表，与敌人数量无关；计算一次的代价是 O(格子数 log 格子数)。
+#
+# 格子按 lane * columns + column 编号；单行棋盘(NUM_LANES = 1)时编号就是 logical_position。
+# 有Meme的格子仍可通过(敌人要先打倒Meme)，但代价更高，多行棋盘上敌人会在绕路更短时绕开；
+# 被封锁的格子不可通过。不依赖pygame。
+import heapq
+from array import array
+from config import NUM_CELLS, NUM_LANES, WHITE_HOUSE_CELL_INDEX
+from battle_config import PATH_MEME_COST
+
+NO_PATH = -2  # 表中的值: 没有通往目标的路
+_UNREACHABLE = 1 << 30
+
+
+class FlowField:
+    """前进和撤退两张下一格表
+
+    Args:
+        lanes (int): 行数
+        columns (int): 每行的格子数；第0列与白宫相邻，最后一列是出生/撤退边
+        meme_cost (int): 走进有Meme的格子的额外代价
+    """
+
+    def __init__(self, lanes=NUM_LANES, columns=NUM_CELLS, meme_cost=PATH_MEME_COST):
+        self.lanes = lanes
+        self.columns = columns
+        self.meme_cost = meme_cost
+        size = lanes * columns
+        self.occupied = bytearray(size)  # 1: 格子上有Meme
+        self.blocked = bytearray(size)  # 1: 格子不可通过
+        self.advance_next = array("i", [NO_PATH]) * size
+        self.advance_distance = array("i", [_UNREACHABLE]) * size
+        self.retreat_next = array("i", [NO_PATH]) * size
+        self.retreat_distance = array("i", [_UNREACHABLE]) * size
+        self.rebuilds = 0
+        self._dirty = True
+
+    # --- 棋盘变化 ---
+
+    def set_occupied(self, index, occupied):
+        occupied = 1 if occupied else 0
+        if self.occupied[index] != occupied:
+            self.occupied[index] = occupied
+            self._dirty = True
+
+    def set_blocked(self, index, blocked):
+        blocked = 1 if blocked else 0
+        if self.blocked[index] != blocked:
+            self.blocked[index] = blocked
+            self._dirty = True
+
+    def invalidate(self):
+        self._dirty = True
+
+    # --- 查询(O(1)) ---
+
+    def next_cell(self, index, retreating=False):
+        """从 index 出发的下一格
+
+        Returns:
+            int | None: 下一格编号，前进时第0列的下一格是 WHITE_HOUSE_CELL_INDEX；
+                        撤退时已在撤退边返回 index 本身；没有路时为 None
+        """
+        if self._dirty:
+            self.rebuild()
+        if not 0 <= index < len(self.advance_next):
+            return None
+        step = (self.retreat_next if retreating else self.advance_next)[index]
+        return None if step == NO_PATH else step
+
+    def distance(self, index, retreating=False):
+        """从 index 到目标的路径代价，没有路时为 None"""
+        if self._dirty:
+            self.rebuild()
+        value = (self.retreat_distance if retreating else self.advance_distance)[index]
+        return None if value >= _UNREACHABLE else value
+
+    # --- 计算 ---
+
+    def rebuild(self):
+        """从目标出发反向求最短路(Dijkstra)，重新填写两张表"""
+        columns = self.columns
+        last = columns - 1
+        advance_starts = []
+        retreat_starts = []
+        for lane in range(self.lanes):
+            first = lane * columns
+            if not self.blocked[first]:
+                advance_starts.append((self._enter_cost(WHITE_HOUSE_CELL_INDEX), first, WHITE_HOUSE_CELL_INDEX))
+            if not self.blocked[first + last]:
+                retreat_starts.append((0, first + last, first + last))
+        self._fill(advance_starts, self.advance_next, self.advance_distance)
+        self._fill(retreat_starts, self.retreat_next, self.retreat_distance)
+        self.rebuilds += 1
+        self._dirty = False
+
+    def _enter_cost(self, index):
+        if index == WHITE_HOUSE_CELL_INDEX:
+            return 1
+        return 1 + (self.meme_cost if self.occupied[index] else 0)
+
+    def _neighbours(self, index):
+        lane, column = divmod(index, self.columns)
+        if column > 0:
+            yield index - 1
+        if column < self.columns - 1:
+            yield index + 1
+        if lane > 0:
+            yield index - self.columns
+        if lane < self.lanes - 1:
+            yield index + self.columns
+
+    def _fill(self, starts, next_table, distance_table):
+        """starts: (代价, 格子, 该格子的下一格)；表中每个格子记录沿最短路走的下一格"""
+        for i in range(len(next_table)):
+            next_table[i] = NO_PATH
+            distance_table[i] = _UNREACHABLE
+        heap = list(starts)
+        heapq.heapify(heap)
+        blocked = self.blocked
+        while heap:
+            cost, index, step = heapq.heappop(heap)
+            if cost >= distance_table[index]:
+                continue
+            distance_table[index] = cost
+            next_table[index] = step
+            through = cost + self._enter_cost(index)  # 邻格经过 index 到达目标的代价
+            for neighbour in self._neighbours(index):
+                if not blocked[neighbour] and through < distance_table[neighbour]:
+                    heapq.heappush(heap, (through, neighbour, index))
+
+
+def benchmark(lanes=20, columns=100, enemies=10000, steps=100):
+    """比较查表与每个敌人每步自己搜索路径的耗时(秒)"""
+    import random
+    import time
+    rng = random.Random(0)
+    field = FlowField(lanes, columns)
+    for index in rng.sample(range(lanes * columns), lanes * columns // 5):
+        field.set_occupied(index, True)
+    for index in rng.sample(range(lanes * columns), lanes * columns // 20):
+        if index % columns not in (0, columns - 1):
+            field.set_blocked(index, True)
+    start = time.perf_counter()
+    field.rebuild()
+    rebuild_time = time.perf_counter() - start
+
+    positions = [rng.randrange(lanes * columns) for _ in range(enemies)]
+    start = time.perf_counter()
+    for _ in range(steps):
+        next_cell = field.next_cell
+        positions = [p if (n := next_cell(p)) is None or n < 0 else n for p in positions]
+    lookup_time = (time.perf_counter() - start) / steps
+
+    # 每个敌人自己求路径(只测前100个敌人，按比例折算)
+    sample = positions[:100]
+    start = time.perf_counter()
+    for p in sample:
+        single = FlowField(lanes, columns)
+        single.occupied[:] = field.occupied
+        single.blocked[:] = field.blocked
+        single.rebuild()
+        single.next_cell(p)
+    search_time = (time.perf_counter() - start) * enemies / len(sample)
+    return rebuild_time, lookup_time, search_time
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Flow-field pathing benchmark")
+    parser.add_argument("--lanes", type=int, default=20)
+    parser.add_argument("--columns", type=int, default=100)
+    parser.add_argument("--enemies", type=int, default=10000)
+    args = parser.parse_args()
+    rebuild_time, lookup_time, search_time = benchmark(args.lanes, args.columns, args.enemies)
+    print(f"{args.lanes}x{args.columns} board, {args.enemies} enemies")
+    print(f"rebuild once per board change: {rebuild_time * 1000:.2f} ms")
+    print(f"one move for every enemy (table lookups): {lookup_time * 1000:.2f} ms")
+    print(f"one move for every enemy (per-enemy search): {search_time * 1000:.0f} ms")
@@ -0,0 +1,231 @@
+# penalty_cache.py
+# 链上 penalty_system 模块的本地只读视图，由它发出的 PenaltyApplied / PenaltyRevoked 事件驱动。
+# 游戏每帧都可以检查"玩家现在是否被禁止抽卡"等限制，不需要访问链。
+#
+# 与合约的语义一致:
+#   - 惩罚在 end_time 之前有效，end_time 为 0 表示永久
+#   - 解除(PenaltyRevoked)后立即失效，包括合约清理过期惩罚时发出的解除事件
+#   - has_active_penalty 只检查给定的类型；游戏的限制检查(can_draw 等)把 BAN 也算在内
+#
+# 事件可以是 Sui 事件 JSON({"type": "...::penalty_system::PenaltyApplied", "parsedJson": {...}})，
+# 也可以直接是字段字典加上 "type"；u64 字段可以是字符串。
+import heapq
+import json
+import os
+import time
+
+# 与 penalty_system.move 中的常量相同
+PENALTY_TYPE_WARNING = 1
+PENALTY_TYPE_NO_DRAW = 2
+PENALTY_TYPE_NO_BATTLE = 3
+PENALTY_TYPE_BAN = 4
+PERMANENT_PENALTY = 0
+
+_FOREVER = float("inf")
+
+
+def now_ms():
+    """与链上 Clock 相同单位的当前时间(毫秒)"""
+    return int(time.time() * 1000)
+
+
+def _event_name(event):
+    return str(event.get("type", "")).rsplit("::", 1)[-1]
+
+
+def _event_fields(event):
+    return event.get("parsedJson", event)
+
+
+class PenaltyCache:
+    """按 (用户, 惩罚类型) 索引的有效惩罚
+
+    每个 (用户, 类型) 记录其有效惩罚中最晚的结束时间，检查只需一次字典查找。
+    所有有期限的惩罚按结束时间放在最小堆中，expire() 从堆顶移除已经过期的惩罚；
+    解除的惩罚在堆中延迟删除(出堆时发现已不存在就跳过)。
+    只在一个线程中使用。
+    """
+
+    def __init__(self):
+        self._penalties = {}  # penalty_id -> (user, 类型, 结束时间; 永久为 inf)
+        self._by_key = {}  # (user, 类型) -> {penalty_id: 结束时间}
+        self._until = {}  # (user, 类型) -> 最晚结束时间
+        self._user_types = {}  # user -> 有有效惩罚的类型集合
+        self._user_until = {}  # user -> 任意类型的最晚结束时间
+        self._expiry = []  # (结束时间, penalty_id) 最小堆
+        self.history_counts = {}  # user -> 收到过的惩罚数量(对应合约的 get_penalty_count)
+        self.total_penalties = 0
+
+    # --- 事件 ---
+
+    def apply_event(self, event):
+        """处理一条链上事件，不相关的事件忽略"""
+        name = _event_name(event)
+        fields = _event_fields(event)
+        if name == "PenaltyApplied":
+            self.add(fields["penalty_id"], fields["target"], int(fields["penalty_type"]), int(fields["end_time"]))
+        elif name == "PenaltyRevoked":
+            self.revoke(fields["penalty_id"])
+
+    def add(self, penalty_id, user, penalty_type, end_time):
+        """添加一条惩罚
+
+        Args:
+            end_time (int): 结束时间(毫秒)，PERMANENT_PENALTY 表示永久
+        """
+        if penalty_id in self._penalties:
+            return
+        self._count(user)
+        until = self._index(penalty_id, user, penalty_type, end_time)
+        if until != _FOREVER:
+            heapq.heappush(self._expiry, (until, penalty_id))
+
+    def _count(self, user):
+        self.history_counts[user] = self.history_counts.get(user, 0) + 1
+        self.total_penalties += 1
+
+    def _index(self, penalty_id, user, penalty_type, end_time):
+        until = _FOREVER if end_time == PERMANENT_PENALTY else end_time
+        key = (user, penalty_type)
+        self._penalties[penalty_id] = (user, penalty_type, until)
+        self._by_key.setdefault(key, {})[penalty_id] = until
+        if until > self._until.get(key, -1):
+            self._until[key] = until
+        self._user_types.setdefault(user, set()).add(penalty_type)
+        if until > self._user_until.get(user, -1):
+            self._user_until[user] = until
+        return until
+
+    def revoke(self, penalty_id):
+        """解除一条惩罚，返回它是否存在"""
+        record = self._penalties.pop(penalty_id, None)
+        if record is None:
+            return False
+        user, penalty_type, _ = record
+        key = (user, penalty_type)
+        remaining = self._by_key[key]
+        del remaining[penalty_id]
+        if remaining:
+            self._until[key] = max(remaining.values())
+        else:
+            del self._by_key[key]
+            del self._until[key]
+            self._user_types[user].discard(penalty_type)
+        types = self._user_types[user]
+        if types:
+            self._user_until[user] = max(self._until[(user, t)] for t in types)
+        else:
+            del self._user_types[user]
+            del self._user_until[user]
+        return True
+
+    def expire(self, now=None):
+        """移除已经过期的惩罚
+
+        Returns:
+            int: 移除的数量
+        """
+        if now is None:
+            now = now_ms()
+        expiry = self._expiry
+        removed = 0
+        while expiry and expiry[0][0] <= now:
+            _, penalty_id = heapq.heappop(expiry)
+            if self.revoke(penalty_id):
+                removed += 1
+        return removed
+
+    # --- 查询(O(1)) ---
+
+    def has_active_penalty(self, user, penalty_type, now=None):
+        """用户现在是否有该类型的有效惩罚"""
+        until = self._until.get((user, penalty_type))
+        if until is None:
+            return False
+        return until > (now_ms() if now is None else now)
+
+    def has_any_active_penalty(self, user, now=None):
+        until = self._user_until.get(user)
+        if until is None:
+            return False
+        return until > (now_ms() if now is None else now)
+
+    def can_draw(self, user, now=None):
+        """用户现在能否抽卡(NO_DRAW 或 BAN 都会禁止)"""
+        now = now_ms() if now is None else now
+        return not (self.has_active_penalty(user, PENALTY_TYPE_NO_DRAW, now)
+                    or self.has_active_penalty(user, PENALTY_TYPE_BAN, now))
+
+    def can_battle(self, user, now=None):
+        """用户现在能否开始战斗(NO_BATTLE 或 BAN 都会禁止)"""
+        now = now_ms() if now is None else now
+        return not (self.has_active_penalty(user, PENALTY_TYPE_NO_BATTLE, now)
+                    or self.has_active_penalty(user, PENALTY_TYPE_BAN, now))
+
+    def active_count(self, user):
+        """用户有效惩罚的数量(对应合约的 get_active_penalty_count，未调用 expire 时包含刚过期的)"""
+        return sum(len(self._by_key[(user, penalty_type)]) for penalty_type in self._user_types.get(user, ()))
+
+    def __len__(self):
+        return len(self._penalties)
+
+    # --- 批量加载 ---
+
+    def load_events(self, events, now=None):
+        """批量加载事件(例如启动时读取的事件日志)
+
+        先合并出最终仍有效的惩罚，再一次性建立索引和堆，不逐条入堆；
+        加载时已经过期的惩罚只计入历史数量。事件顺序不要求与链上一致。
+
+        Returns:
+            int: 加载后仍有效的惩罚数量
+        """
+        now = now_ms() if now is None else now
+        applied = {}
+        revoked = set()
+        for event in events:
+            name = _event_name(event)
+            fields = _event_fields(event)
+            if name == "PenaltyApplied":
+                applied[fields["penalty_id"]] = fields
+            elif name == "PenaltyRevoked":
+                revoked.add(fields["penalty_id"])
+
+        added = 0
+        new_entries = []
+        for penalty_id, fields in applied.items():
+            if penalty_id in self._penalties:
+                continue
+            user = fields["target"]
+            self._count(user)
+            end_time = int(fields["end_time"])
+            if penalty_id in revoked or (end_time != PERMANENT_PENALTY and end_time <= now):
+                continue
+            until = self._index(penalty_id, user, int(fields["penalty_type"]), end_time)
+            added += 1
+            if until != _FOREVER:
+                new_entries.append((until, penalty_id))
+        for penalty_id in revoked:
+            self.revoke(penalty_id)  # 之前已经加载过的惩罚
+        self._expiry.extend(new_entries)
+        heapq.heapify(self._expiry)
+        return added
+
+    @classmethod
+    def from_event_log(cls, path, now=None):
+        """从 JSONL 事件日志创建；文件不存在时返回空的缓存"""
+        cache = cls()
+        if not os.path.exists(path):
+            return cache
+        events = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    print(f"Warning: Skipping malformed penalty event: {line[:80]!r}")
+        cache.load_events(events, now)
+        return cache
@@ -0,0 +1,168 @@
+# pipeline.py
+import queue
+import threading
+import time
+import pygame
+from config import FPS, INPUT_COMMAND_QUEUE_SIZE
+from game_snapshot import capture_snapshot, draw_snapshot
+from render_backend import translate_event
+from side_effects import SIDE_EFFECT_DONE
+
+# 只有这些事件会影响游戏状态，需要转交给模拟线程(后台操作的完成回调也修改游戏状态)
+_GAME_EVENT_TYPES = (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, SIDE_EFFECT_DONE)
+
+
+class SnapshotBuffer:
+    """双缓冲的快照：模拟线程写后台槽位后翻转，渲染线程总是读取前台槽位"""
+
+    def __init__(self):
+        self._slots = [None, None]
+        self._front = 0
+        self._published = threading.Condition()
+
+    def publish(self, snapshot):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._published:
+            self._front = back
+            self._published.notify_all()
+
+    def latest(self):
+        with self._published:
+            return self._slots[self._front]
+
+    def wait_newer(self, frame, timeout):
+        """等待编号大于 frame 的快照(最多 timeout 秒)，返回最新快照"""
+        with self._published:
+            self._published.wait_for(lambda: self._slots[self._front].frame > frame, timeout)
+            return self._slots[self._front]
+
+
+class PipelinedGameLoop:
+    """模拟与渲染流水线
+
+    模拟线程: 处理输入命令 -> advance(按倍速固定步长模拟) -> 发布快照
+    主线程:   处理pygame事件 -> 把输入放入有界队列 -> 绘制最新快照 -> flip
+
+    两个阶段并行执行，慢的一帧绘制不会拖慢模拟，反之亦然。
+    pygame的事件和显示操作只在主线程进行。
+    低延迟模式下模拟线程收到输入命令就提前开始下一帧，主线程提交输入后等待包含其结果的快照再绘制。
+    """
+
+    def __init__(self, game, fps=FPS, command_queue_size=INPUT_COMMAND_QUEUE_SIZE):
+        self.game = game
+        self.fps = fps
+        self.commands = queue.Queue(maxsize=command_queue_size)
+        self.snapshots = SnapshotBuffer()
+        self.dropped_commands = 0
+        self._stop = threading.Event()
+        self._sim_thread = None
+        self._sim_error = None  # 模拟线程中未处理的异常
+
+    def run(self):
+        """运行直到游戏结束(在主线程调用)
+
+        模拟线程因异常结束时，在主线程重新抛出该异常，不在只更新了一半的状态上继续运行。
+        """
+        self.snapshots.publish(capture_snapshot(self.game))
+        self._sim_thread = threading.Thread(target=self._simulate, name="GameSimulation", daemon=True)
+        self._sim_thread.start()
+
+        last_drawn_frame = None
+        try:
+            tracer = self.game.latency_tracer
+            low_latency = self.game.frame_pacer.low_latency
+            while self._sim_thread.is_alive():
+                if tracer.enabled:
+                    tracer.begin_poll(self.game.frame_pacer.input_seen_at)
+                submitted = False
+                for event in self.game.frame_pacer.events():
+                    event = translate_event(event)
+                    self.game.frame_pacer.handle_event(event)
+                    if event.type in _GAME_EVENT_TYPES:
+                        self._submit(event, tracer.arrived(event) if tracer.enabled else None)
+                        submitted = True
+
+                snapshot = self.snapshots.latest()
+                if low_latency and submitted:
+                    # 模拟线程收到命令后会立即发布新快照，等它出来再绘制，而不是等到下一帧
+                    snapshot = self.snapshots.wait_newer(snapshot.frame, 1.0 / self.fps)
+                if self.game.profiler.active:
+                    self.game.profiler.set_phase("render")
+                if snapshot.frame != last_drawn_frame:
+                    draw_snapshot(self.game, self.game.canvas, snapshot)
+                    self.game.present()
+                    last_drawn_frame = snapshot.frame
+                    if tracer.enabled:
+                        tracer.presented(snapshot.frame)
+                if not snapshot.game_running:
+                    break
+                self.game.frame_pacer.tick()
+        finally:
+            self._stop.set()
+            self._sim_thread.join()
+        if self._sim_error is not None:
+            raise self._sim_error
+
+    def _submit(self, event, trace=None):
+        if event.type == pygame.QUIT or event.type == SIDE_EFFECT_DONE:
+            # 退出命令和后台操作的结果不能丢，队列满时等待模拟线程取走
+            self.commands.put((event, trace))
+            return
+        try:
+            self.commands.put_nowait((event, trace))
+        except queue.Full:
+            self.dropped_commands += 1
+            print(f"Warning: Input queue full, dropped {pygame.event.event_name(event.type)}")
+
+    def _next_command(self, last_frame):
+        """低延迟模式: 等到下一帧的时间点，期间有输入命令就立即返回它"""
+        timeout = last_frame + 1.0 / self.fps - time.perf_counter()
+        if timeout <= 0:
+            return None
+        try:
+            return self.commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _simulate(self):
+        try:
+            self._simulate_frames()
+        except Exception as e:
+            self._sim_error = e
+
+    def _simulate_frames(self):
+        clock = pygame.time.Clock()
+        frame = 0
+        last_frame = time.perf_counter()
+        low_latency = self.game.frame_pacer.low_latency
+        tracer = self.game.latency_tracer
+        while not self._stop.is_set() and self.game.game_running:
+            profiler = self.game.profiler
+            if profiler.active:
+                profiler.set_phase("wait")
+            command = None
+            if low_latency:
+                command = self._next_command(last_frame)
+            else:
+                clock.tick(self.fps)
+            now = time.perf_counter()
+            dt = now - last_frame
+            last_frame = now
+            if profiler.active:
+                profiler.set_phase("update")
+            while True:
+                if command is None:
+                    try:
+                        command = self.commands.get_nowait()
+                    except queue.Empty:
+                        break
+                event, trace = command
+                command = None
+                self.game.handle_event(event)
+                if trace is not None:
+                    tracer.handled(trace, frame + 1)  # 结果出现在本次循环发布的快照中
+            self.game.advance(dt)
+            frame += 1
+            self.snapshots.publish(capture_snapshot(self.game, frame))
+            profiler.frame_end(self.game.level_active)
@@ -0,0 +1,161 @@
+# placement_solver.py
+import time
+from collections import namedtuple
+from config import PLACEABLE_CELLS, PLACEMENT_SOLVER_TIME_BUDGET, PLACEMENT_SOLVER_BEAM_WIDTH
+from battle_sim import BattleState, meme_stats, run_battle
+
+PlacementOption = namedtuple("PlacementOption", ["placements", "result", "score"])
+
+# 从关卡开始求解时的评估结果可以跨调用复用: (关卡, 棋盘) -> BattleResult
+_MEMO_LIMIT = 200000
+_memo = {}
+
+
+def clear_cache():
+    """清空跨调用的评估缓存(修改 battle_config 中的参数后需要调用)"""
+    _memo.clear()
+
+
+def score_result(result):
+    """胜利优先，其次越快越好；失败时比较造成的伤害"""
+    if result.won:
+        return (1, -result.time)
+    return (0, result.damage_dealt)
+
+
+def _card_types(cards):
+    """把收藏归并为不同属性的卡牌类型: {(伤害, 生命): [名称, 数量]}
+
+    字典可以带 "count" 表示同一种卡牌的数量(Player.owned_card_types)。
+    """
+    types = {}
+    for card in cards:
+        count = 1
+        if isinstance(card, dict):
+            name, base_damage, star = card["name"], card["base_damage"], card["star"]
+            count = card.get("count", 1)
+        else:
+            name, base_damage, star = card.name, card.base_damage, card.star_rating
+        stats = meme_stats(base_damage, star, name)
+        if stats in types:
+            types[stats][1] += count
+        else:
+            types[stats] = [name, count]
+    return types
+
+
+def _pareto_front(stats_list):
+    """去掉伤害和生命都不高于另一种卡牌的类型(战斗结果对两者单调)"""
+    front = []
+    for stats in stats_list:
+        dominated = any(o != stats and o[0] >= stats[0] and o[1] >= stats[1] for o in stats_list)
+        if not dominated:
+            front.append(stats)
+    return front
+
+
+def suggest_placements(cards, level, state=None, time_budget=PLACEMENT_SOLVER_TIME_BUDGET,
+                       top_n=5, limit_to_owned=False, beam_width=PLACEMENT_SOLVER_BEAM_WIDTH):
+    """搜索空格子上的最佳布阵
+
+    从离Trump最近的空格子开始逐格放置，每一步用模拟评估所有候选并只保留最好的
+    beam_width 个部分布阵(束搜索)。相同属性的卡牌视为同一种，相同的棋盘只模拟一次
+    (置换表)。超过时间预算后停止扩展，返回已评估的最好结果。
+
+    Args:
+        cards: 收藏中的卡牌(MemeCard 或 meme_catalog 模板格式的字典)
+        level (int): 关卡，决定Trump的生命值
+        state (BattleState, optional): 当前战斗状态(例如 BattleState.from_game)，默认从关卡开始
+        time_budget (float): 最多使用的秒数
+        top_n (int): 返回的方案数量
+        limit_to_owned (bool): True 时每种卡牌最多放置拥有的数量；游戏中收藏是蓝图，默认不限制
+        beam_width (int): 每一步保留的部分布阵数量
+
+    Returns:
+        list[PlacementOption]: 按预测结果从好到坏排序，placements 为 ((格子, 名称), ...)
+    """
+    deadline = time.perf_counter() + time_budget
+    types = _card_types(cards)
+    if not types:
+        return []
+    candidates = _pareto_front(list(types))
+    if limit_to_owned:
+        # 数量受限时，被支配的卡牌也可能用来填满剩余格子
+        candidates = list(types)
+    candidates.sort(key=lambda s: s[0] * s[1], reverse=True)
+
+    base = state if state is not None else BattleState(level)
+    empty_cells = [i for i in range(PLACEABLE_CELLS) if base.memes[i] is None]
+    empty_cells.sort(key=lambda i: -i)  # Trump从右往左走，先决定离他最近的格子
+    use_memo = state is None
+    table = {}  # 本次求解的置换表
+
+    def evaluate(board):
+        key = tuple(sorted(board.items()))
+        result = table.get(key)
+        if result is None and use_memo:
+            result = _memo.get((level, key))
+        if result is None:
+            trial = base.clone()
+            for cell_index, stats in board.items():
+                trial.place(cell_index, *stats)
+            result = run_battle(trial)
+            if use_memo:
+                if len(_memo) >= _MEMO_LIMIT:
+                    _memo.clear()
+                _memo[(level, key)] = result
+        table[key] = result
+        return result
+
+    def usage_ok(board, stats):
+        if not limit_to_owned:
+            return True
+        used = sum(1 for s in board.values() if s == stats)
+        return used < types[stats][1]
+
+    beam = [{}]
+    complete = []
+    for cell_index in empty_cells:
+        expanded = []
+        for board in beam:
+            for stats in candidates:
+                if time.perf_counter() > deadline and expanded:
+                    break
+                if not usage_ok(board, stats):
+                    continue
+                trial = dict(board)
+                trial[cell_index] = stats
+                expanded.append((score_result(evaluate(trial)), trial))
+            # 格子也可以留空(数量受限或留空反而更好时)
+            expanded.append((score_result(evaluate(board)), board))
+        expanded.sort(key=lambda item: item[0], reverse=True)
+        beam = []
+        seen = set()
+        for _, board in expanded:
+            key = tuple(sorted(board.items()))
+            if key not in seen:
+                seen.add(key)
+                beam.append(board)
+            if len(beam) >= beam_width:
+                break
+        if time.perf_counter() > deadline:
+            break
+
+    for key, result in table.items():
+        complete.append((score_result(result), key, result))
+    complete.sort(key=lambda item: item[0], reverse=True)
+    options = []
+    for score, key, result in complete[:top_n]:
+        placements = tuple((cell_index, types[stats][0]) for cell_index, stats in key)
+        options.append(PlacementOption(placements, result, score))
+    return options
+
+
+def describe_option(option):
+    """把方案转为简短的提示文字，例如 "Stonks: 0,1,2 | Pepe: 3" """
+    by_name = {}
+    for cell_index, name in option.placements:
+        by_name.setdefault(name, []).append(str(cell_index))
+    outcome = "win" if option.result.won else "lose"
+    parts = [f"{name}: {','.join(cells)}" for name, cells in by_name.items()]
+    return f"{' | '.join(parts) or 'no placement'} ({outcome} in {option.result.time:.0f}s)"
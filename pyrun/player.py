@@ -1,30 +1,116 @@
 # player.py
 import random
-import pygame
-from meme_card import MemeCard # Pygame version
+from meme_card import MemeCard, MemePool # Pygame version
+from fonts import get_font, render_text
+from meme_catalog import CATALOG
+from event_bus import BUS, CardDrawn
+from render_backend import draw_rect
 from config import (
-    PREDEFINED_MEMES_POOL, COLLECTION_UI_X, COLLECTION_UI_Y, MEME_CARD_UI_WIDTH,
-    MEME_CARD_UI_HEIGHT, GREY, BLACK, WHITE
+    COLLECTION_UI_X, COLLECTION_UI_Y, MEME_CARD_UI_WIDTH,
+    MEME_CARD_UI_HEIGHT, GREY, BLACK, WHITE, COLLECTION_PAGE_SIZE
 )
 
 class Player:
-    def __init__(self, initial_currency=100):
-        self.meme_collection = [] # All actual MemeCard instances owned by the player for UI display
+    def __init__(self, initial_currency=100, profile_store=None, player_id="guest"):
+        self.meme_collection = [] # MemeCard instances of the currently loaded collection page
         self.currency = initial_currency
         self.score = 0
-        self.font = pygame.font.SysFont(None, 30) # Font for UI text
+        self.profile_store = profile_store # Optional ProfileStore for persistent progress
+        self.player_id = player_id
+        self.collection_total = 0 # Total cards owned, including ones not loaded into the UI
+        self.collection_page = 0 # Index of the collection page shown in the UI
+        self._stored_count = 0 # Cards that were already in the profile store when it was loaded
+        self._stored_types = {} # (name, star) -> count of those stored cards
+        self._session_cards = [] # Card data acquired since then (store writes are asynchronous)
+        self.font = get_font(30) # Shared font for UI text
 
         # For UI interaction with collection
         self.collection_rects = [] # Store rects for clicking owned memes
         self.selected_meme_from_collection_idx = None # Index of meme selected to place
+        self.board_memes = MemePool() # Board-sized memes that left the board, reused for the next placements
 
-    def add_meme_to_collection(self, meme_data):
+    def add_meme_to_collection(self, meme_data, persist=True):
         # Create a "preview" version for the collection UI
+        if persist:
+            self._session_cards.append(meme_data)
+            self.collection_total += 1
+            if self.profile_store:
+                self.profile_store.add_card(self.player_id, meme_data)
+            print(f"Player acquired: {meme_data['name']} ({meme_data['star']} star)") # Console log
+            if (self.collection_total - 1) // COLLECTION_PAGE_SIZE != self.collection_page:
+                return # The new card is on another page; it shows up when that page is opened
         meme = MemeCard(meme_data["name"], meme_data["base_damage"], meme_data["star"], meme_data["image_key"], is_preview=True)
         self.meme_collection.append(meme)
-        print(f"Player acquired: {meme.get_details()}") # Console log
         self._update_collection_rects()
 
+    def load_from_profile(self):
+        """Restore currency, score and the first collection page from the profile store.
+
+        Returns the stored profile dict, or None if there is no saved profile.
+        """
+        if not self.profile_store:
+            return None
+        profile = self.profile_store.load_profile(self.player_id)
+        if profile is None:
+            return None
+        self.currency = profile["currency"]
+        self.score = profile["score"]
+        self.collection_total = self._stored_count = self.profile_store.count_cards(self.player_id)
+        self._stored_types = self.profile_store.count_cards_by_type(self.player_id)
+        self._session_cards = []
+        self.load_collection_page(0)
+        print(f"Loaded profile '{self.player_id}': {self.collection_total} memes, currency {self.currency}")
+        return profile
+
+    @property
+    def collection_page_count(self):
+        return max(1, -(-self.collection_total // COLLECTION_PAGE_SIZE))
+
+    def load_collection_page(self, page):
+        # Only the cards that fit on screen are turned into MemeCard instances
+        self.collection_page = max(0, min(page, self.collection_page_count - 1))
+        self.meme_collection = []
+        self.selected_meme_from_collection_idx = None
+        for meme_data in self._collection_slice(self.collection_page * COLLECTION_PAGE_SIZE, COLLECTION_PAGE_SIZE):
+            self.add_meme_to_collection(meme_data, persist=False)
+        self._update_collection_rects()
+
+    def change_collection_page(self, step):
+        """Show the previous (step < 0) or next (step > 0) collection page. Returns True if the page changed."""
+        page = max(0, min(self.collection_page + step, self.collection_page_count - 1))
+        if page == self.collection_page:
+            return False
+        self.load_collection_page(page)
+        return True
+
+    def _collection_slice(self, offset, limit):
+        # Cards loaded with the profile come from the store, newer ones from memory, so paging
+        # never has to wait for the background writer
+        cards = []
+        if self.profile_store and offset < self._stored_count:
+            cards = self.profile_store.load_collection_page(
+                self.player_id, offset=offset, limit=min(limit, self._stored_count - offset))
+        start = max(0, offset - self._stored_count)
+        cards.extend(self._session_cards[start:start + limit - len(cards)])
+        return cards
+
+    def owned_card_types(self):
+        """One template per owned (name, star) across all collection pages, with a "count" of copies."""
+        counts = dict(self._stored_types)
+        for meme_data in self._session_cards:
+            key = (meme_data["name"], meme_data["star"])
+            counts[key] = counts.get(key, 0) + 1
+        types = []
+        for (name, star), count in counts.items():
+            type_id = CATALOG.find(name, star)
+            if type_id is not None: # Types removed from the catalog can no longer be placed
+                types.append(dict(CATALOG.template(type_id), count=count))
+        return types
+
+    def save_progress(self, trump_score, max_level):
+        if self.profile_store:
+            self.profile_store.save_profile(self.player_id, self.currency, self.score, trump_score, max_level)
+
     def _update_collection_rects(self):
         self.collection_rects = []
         for i, meme_card in enumerate(self.meme_collection):
@@ -35,19 +121,28 @@ class Player:
 
 
     def display_collection_ui(self, surface):
-        if not self.meme_collection:
-            text_surf = self.font.render("Collection is empty.", True, BLACK)
+        Player.draw_collection(surface, self.meme_collection, self.selected_meme_from_collection_idx,
+                               (self.collection_page, self.collection_page_count))
+
+    @staticmethod
+    def draw_collection(surface, cards, selected_idx, page=(0, 1)):
+        # cards may be MemeCard instances or snapshot views with image/rect/health
+        if not cards:
+            text_surf = render_text("Collection is empty.", 30, BLACK)
             surface.blit(text_surf, (COLLECTION_UI_X, COLLECTION_UI_Y))
             return
 
-        title_surf = self.font.render("Your Memes (Click to select, then click cell to place):", True, BLACK)
+        title = "Your Memes (Click to select, then click cell to place):"
+        if page[1] > 1:
+            title += f"  Page {page[0] + 1}/{page[1]} (PgUp/PgDn)"
+        title_surf = render_text(title, 30, BLACK)
         surface.blit(title_surf, (COLLECTION_UI_X, COLLECTION_UI_Y - 30))
 
-        for i, meme_card in enumerate(self.meme_collection):
-            meme_card.draw(surface, meme_card.rect.x, meme_card.rect.y) # Draw the card
+        for i, meme_card in enumerate(cards):
+            MemeCard.draw_view(surface, meme_card) # Draw the card
             # Highlight if selected
-            if i == self.selected_meme_from_collection_idx:
-                pygame.draw.rect(surface, (255,255,0), meme_card.rect, 3) # Yellow border
+            if i == selected_idx:
+                draw_rect(surface, (255,255,0), meme_card.rect, 3) # Yellow border
 
     def handle_collection_click(self, mouse_pos):
         for i, rect in enumerate(self.collection_rects):
@@ -65,13 +160,14 @@ class Player:
         if self.currency < cost:
             print(f"Not enough currency to draw. Need {cost}, have {self.currency}.")
             return None # Potentially show this message on UI
-        if not PREDEFINED_MEMES_POOL:
+        if not len(CATALOG):
             print("No memes available in the pool to draw from.")
             return None
 
         self.currency -= cost
-        meme_template = random.choice(PREDEFINED_MEMES_POOL)
+        meme_template = CATALOG.template(CATALOG.draw_type(random)) # Weighted by catalog drop_rate
         self.add_meme_to_collection(meme_template) # Adds UI version of the card
+        BUS.emit(CardDrawn, self.player_id, meme_template["name"], meme_template["star"], cost, self.currency)
         return meme_template # Returns the template, or could return the instance
 
     def scan_inventory_for_initial_funds(self, num_initial_memes=3, initial_currency_boost=50):
@@ -80,23 +176,22 @@ class Player:
         print(f"Granted {initial_currency_boost} initial currency. Total: {self.currency}")
         print("Granting initial memes...")
         for _ in range(num_initial_memes):
-            if PREDEFINED_MEMES_POOL:
-                meme_template = random.choice(PREDEFINED_MEMES_POOL)
+            if len(CATALOG):
+                meme_template = CATALOG.template(CATALOG.draw_type(random))
                 self.add_meme_to_collection(meme_template)
         self._update_collection_rects() # Ensure rects are set for initial memes
         print("Initial setup complete.")
 
     def get_selected_meme_for_placement(self):
         if self.selected_meme_from_collection_idx is not None:
-            # Return a *new instance* of the selected meme for placement on the board
+            # Return a separate board instance of the selected meme for placement on the board
             # This means the collection represents blueprints, and you place copies.
             original_meme_card = self.meme_collection[self.selected_meme_from_collection_idx]
-            # Create a new MemeCard instance that's sized for the game board, not for UI preview
-            return MemeCard(
+            # Board-sized instance (not the UI preview), reused from the pool when one is free
+            return self.board_memes.acquire(
                 original_meme_card.name,
                 original_meme_card.base_damage,
                 original_meme_card.star_rating,
-                original_meme_card.image_key,
-                is_preview=False # This will load the image at game board size
+                original_meme_card.image_key
             )
         return None
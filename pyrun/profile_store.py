@@ -0,0 +1,193 @@
+# profile_store.py
+import os
+import queue
+import sqlite3
+import threading
+import time
+from config import PROFILE_DB_PATH, PROFILE_FLUSH_INTERVAL, PROFILE_FLUSH_BATCH_SIZE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    player_id   TEXT PRIMARY KEY,
+    currency    INTEGER NOT NULL DEFAULT 0,
+    score       INTEGER NOT NULL DEFAULT 0,
+    trump_score INTEGER NOT NULL DEFAULT 0,
+    max_level   INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS cards (
+    card_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    player_id   TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    base_damage INTEGER NOT NULL,
+    star        INTEGER NOT NULL,
+    image_key   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cards_player_order ON cards (player_id, card_id);
+CREATE INDEX IF NOT EXISTS idx_cards_player_type_star ON cards (player_id, name, star);
+"""
+
+_STOP = object()
+
+
+class ProfileStore:
+    """玩家存档(SQLite, WAL模式)
+
+    读操作在调用线程上直接执行；写操作先进入队列，由后台线程按批次合并后
+    在一个事务中提交，因此游戏循环中保存进度不会产生磁盘等待。
+    """
+
+    def __init__(self, db_path=PROFILE_DB_PATH, flush_interval=PROFILE_FLUSH_INTERVAL,
+                 batch_size=PROFILE_FLUSH_BATCH_SIZE):
+        """打开(或创建)存档数据库
+
+        Args:
+            db_path (str): 数据库文件路径
+            flush_interval (float): 后台线程最长等待多少秒后提交一批写操作
+            batch_size (int): 单个事务最多合并的写操作数量
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self._read_conn = self._connect()
+        self._read_conn.executescript(_SCHEMA)
+        self._read_conn.commit()
+        self._read_lock = threading.Lock()
+
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="ProfileStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- 读操作 ---
+
+    def load_profile(self, player_id):
+        """读取玩家的数值进度
+
+        Returns:
+            dict | None: 包含 currency/score/trump_score/max_level 的字典，不存在时为 None
+        """
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT currency, score, trump_score, max_level FROM profiles WHERE player_id = ?",
+                (player_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"currency": row[0], "score": row[1], "trump_score": row[2], "max_level": row[3]}
+
+    def count_cards(self, player_id):
+        with self._read_lock:
+            return self._read_conn.execute(
+                "SELECT COUNT(*) FROM cards WHERE player_id = ?", (player_id,)
+            ).fetchone()[0]
+
+    def load_collection_page(self, player_id, offset=0, limit=10):
+        """按获得顺序读取收藏中的一页卡牌
+
+        通过 (player_id, card_id) 索引定位，只读取可见的一页，
+        收藏再大也不会整表扫描。
+
+        Returns:
+            list[dict]: 与 meme_catalog 模板相同格式的卡牌数据
+        """
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT name, base_damage, star, image_key FROM cards "
+                "WHERE player_id = ? ORDER BY card_id LIMIT ? OFFSET ?",
+                (player_id, limit, offset)
+            ).fetchall()
+        return [{"name": r[0], "base_damage": r[1], "star": r[2], "image_key": r[3]} for r in rows]
+
+    def count_cards_by_type(self, player_id):
+        """按 (name, star) 统计收藏数量
+
+        只扫描 (player_id, name, star) 索引，不读取表中的行。
+
+        Returns:
+            dict: {(name, star): count}
+        """
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                "SELECT name, star, COUNT(*) FROM cards WHERE player_id = ? GROUP BY name, star",
+                (player_id,)
+            ).fetchall()
+        return {(r[0], r[1]): r[2] for r in rows}
+
+    # --- 写操作(异步) ---
+
+    def save_profile(self, player_id, currency, score, trump_score, max_level):
+        self._enqueue((
+            "INSERT INTO profiles (player_id, currency, score, trump_score, max_level) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(player_id) DO UPDATE SET currency = excluded.currency, score = excluded.score, "
+            "trump_score = excluded.trump_score, max_level = MAX(profiles.max_level, excluded.max_level)",
+            (player_id, currency, score, trump_score, max_level)
+        ))
+
+    def add_card(self, player_id, meme_data):
+        self._enqueue((
+            "INSERT INTO cards (player_id, name, base_damage, star, image_key) VALUES (?, ?, ?, ?, ?)",
+            (player_id, meme_data["name"], meme_data["base_damage"], meme_data["star"], meme_data["image_key"])
+        ))
+
+    def _enqueue(self, statement):
+        self._pending.put(statement)
+
+    def flush(self):
+        """阻塞直到所有已排队的写操作落盘"""
+        self._pending.join()
+
+    def close(self):
+        """提交剩余写操作并关闭数据库"""
+        if self._writer.is_alive():
+            self._pending.put(_STOP)
+            self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            running = True
+            while running:
+                item = self._pending.get()
+
+                # 收到第一条写操作后，再等待最多 flush_interval 秒收集同批次的写操作
+                batch = []
+                taken = 0
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None:
+                    taken += 1
+                    if item is _STOP:
+                        running = False
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        item = None
+
+                if batch:
+                    try:
+                        with conn:
+                            for sql, params in batch:
+                                conn.execute(sql, params)
+                    except sqlite3.Error as e:
+                        print(f"Warning: Failed to write profile data: {e}")
+
+                for _ in range(taken):
+                    self._pending.task_done()
+        finally:
+            conn.close()
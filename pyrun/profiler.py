@@ -0,0 +1,151 @@
+# profiler.py
+# 游戏内的性能采集: F8 或环境变量 MEMEVSTRUMP_PROFILE 开始/停止。
+# 每次采集输出两个文件:
+#   *.pstats     cProfile 统计(python -m pstats 或 snakeviz 查看)
+#   *.collapsed  采样得到的折叠调用栈，每行 "线程;阶段;帧;帧 次数"，可直接交给 flamegraph.pl / speedscope
+#
+# 未采集时游戏循环只多几次属性判断。
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from config import PROFILE_MODE, PROFILE_OUTPUT_DIR, PROFILE_SAMPLE_INTERVAL
+
+
+class _StackSampler(threading.Thread):
+    """定期读取其他线程的调用栈，按 (线程, 阶段, 栈) 计数"""
+
+    def __init__(self, phases, interval):
+        super().__init__(name="ProfileSampler", daemon=True)
+        self.phases = phases
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+        self._labels = {}  # 代码对象 -> 帧名
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(self.phases.get(thread_id, "other"))
+                stack.append(names.get(thread_id, str(thread_id)))
+                stack.reverse()
+                self.counts[";".join(stack)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """按需开始/停止的性能采集
+
+    start/stop 只记录请求，真正的切换在模拟线程每帧调用 frame_end() 时进行，
+    这样 cProfile 总是在运行模拟的线程上启用和停用(流水线模式下是模拟线程)。
+    采样器覆盖所有线程，阶段由 set_phase() 标记("update"、"render" 等)。
+
+    Args:
+        mode (str): "" 不自动采集，"1"/"session" 采集整个会话，"level" 只采集第一个关卡
+        output_dir (str): 输出目录
+        interval (float): 采样间隔(秒)
+    """
+
+    def __init__(self, mode=PROFILE_MODE, output_dir=PROFILE_OUTPUT_DIR, interval=PROFILE_SAMPLE_INTERVAL):
+        self.mode = {"1": "session"}.get(mode, mode)
+        self.output_dir = output_dir
+        self.interval = interval
+        self.active = False
+        self._pending = "start" if self.mode == "session" else None
+        self._label = self.mode or "manual"
+        self._level_captured = False
+        self._profile = None
+        self._sampler = None
+        self._phases = {}  # 线程ID -> 当前阶段
+        self._started_at = 0.0
+
+    def toggle(self):
+        """请求开始或停止采集(F8)"""
+        self._pending = "stop" if self.active else "start"
+        self._label = "manual"
+
+    def level_started(self, level):
+        """关卡开始时调用；"level" 模式下从这里开始采集"""
+        if self.mode == "level" and not self._level_captured and not self.active:
+            self._pending = "start"
+            self._label = f"level{level}"
+
+    def set_phase(self, name):
+        """标记调用线程当前所处的阶段(只在采集时调用)"""
+        self._phases[threading.get_ident()] = name
+
+    def frame_end(self, level_active=True):
+        """每帧结束时在模拟线程调用，执行待处理的开始/停止请求"""
+        if self.active and self.mode == "level" and not level_active and self._label.startswith("level"):
+            self._level_captured = True
+            self._pending = "stop"
+        if self._pending is None:
+            return None
+        pending, self._pending = self._pending, None
+        if pending == "start" and not self.active:
+            self._start()
+        elif pending == "stop" and self.active:
+            return self._stop()
+        return None
+
+    def close(self):
+        """退出时结束未完成的采集"""
+        self._pending = None
+        if self.active:
+            return self._stop()
+        return None
+
+    def _start(self):
+        self._phases.clear()
+        self._sampler = _StackSampler(self._phases, self.interval)
+        self._profile = cProfile.Profile()
+        self.active = True
+        self._started_at = time.perf_counter()
+        self._sampler.start()
+        self._profile.enable()
+        print(f"Profiler capture started ({self._label})")
+
+    def _stop(self):
+        """停止采集并写出文件
+
+        Returns:
+            tuple[str, str]: pstats 和 collapsed 文件路径
+        """
+        self._profile.disable()
+        self._sampler.stop()
+        self.active = False
+        duration = time.perf_counter() - self._started_at
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, time.strftime("profile_%Y%m%d_%H%M%S") + f"_{self._label}")
+        stats_path = base + ".pstats"
+        collapsed_path = base + ".collapsed"
+        self._profile.dump_stats(stats_path)
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self._sampler.counts.items()):
+                f.write(f"{stack} {count}\n")
+        samples = sum(self._sampler.counts.values())
+        self._profile = None
+        self._sampler = None
+        print(f"Profiler capture stopped after {duration:.1f}s ({samples} samples): {stats_path}, {collapsed_path}")
+        return stats_path, collapsed_path
@@ -1,27 +1,56 @@
 # projectile.py
 import pygame
+import memory_stats
+from collision import MASKS
 from battle_config import MEME_PROJECTILE_SPEED, PROJECTILE_SIZE
 
+
+def create_projectile_image():
+    """创建一个简单的圆形投射物图片"""
+    image = pygame.Surface(PROJECTILE_SIZE, pygame.SRCALPHA)
+    pygame.draw.circle(image, (255, 255, 0),
+                      (PROJECTILE_SIZE[0]//2, PROJECTILE_SIZE[1]//2),
+                      PROJECTILE_SIZE[0]//2)
+    return memory_stats.track_surface(image, "projectile")
+
+
+_shared_image = None
+
+
+def shared_projectile_image():
+    """所有 Projectile 共用的图片(只读)"""
+    global _shared_image
+    if _shared_image is None:
+        _shared_image = create_projectile_image()
+    return _shared_image
+
+
+def projectile_velocity(x, y, target_x, target_y):
+    """从 (x, y) 射向目标点的速度分量(像素/秒)"""
+    dx = target_x - x
+    dy = target_y - y
+    distance = max(1, (dx**2 + dy**2)**0.5)  # 避免除以零
+    return dx / distance * MEME_PROJECTILE_SPEED, dy / distance * MEME_PROJECTILE_SPEED
+
 class Projectile(pygame.sprite.Sprite):
     """Meme发射的投射物类"""
     
-    def __init__(self, x, y, target_x, target_y, damage):
+    def __init__(self, x, y, target_x, target_y, damage, source=None):
         pygame.sprite.Sprite.__init__(self)
-        # 创建一个简单的圆形投射物
-        self.image = pygame.Surface(PROJECTILE_SIZE, pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (255, 255, 0), 
-                          (PROJECTILE_SIZE[0]//2, PROJECTILE_SIZE[1]//2), 
-                          PROJECTILE_SIZE[0]//2)
+        # 简单的圆形投射物，图片所有投射物共用
+        self.image = shared_projectile_image()
+        self.mask = MASKS.get("projectile", self.image)
         self.rect = self.image.get_rect()
+        memory_stats.track_entity(self, self.image)
+        self.reset(x, y, target_x, target_y, damage, source)
+
+    def reset(self, x, y, target_x, target_y, damage, source=None):
+        """从 (x, y) 重新向目标点发射(对象重复使用时调用)"""
         self.rect.centerx = x
         self.rect.centery = y
         
         # 计算移动方向
-        dx = target_x - x
-        dy = target_y - y
-        distance = max(1, (dx**2 + dy**2)**0.5)  # 避免除以零
-        self.dx = dx / distance * MEME_PROJECTILE_SPEED
-        self.dy = dy / distance * MEME_PROJECTILE_SPEED
+        self.dx, self.dy = projectile_velocity(x, y, target_x, target_y)
         
         # 存储精确位置（浮点数）
         self.x = float(x)
@@ -29,6 +58,7 @@ class Projectile(pygame.sprite.Sprite):
         
         # 投射物伤害
         self.damage = damage
+        self.source = source  # 发射者名称
         
     def update(self, dt):
         # 更新位置
@@ -37,4 +67,26 @@ class Projectile(pygame.sprite.Sprite):
         
         # 更新rect位置
         self.rect.centerx = int(self.x)
-        self.rect.centery = int(self.y)
\ No newline at end of file
+        self.rect.centery = int(self.y)
+
+
+class ProjectilePool:
+    """Projectile 对象池: 命中或飞出屏幕的投射物放回，下次发射时取出重置"""
+
+    def __init__(self):
+        self._free = []
+
+    def acquire(self, x, y, target_x, target_y, damage, source=None):
+        if self._free:
+            projectile = self._free.pop()
+            projectile.reset(x, y, target_x, target_y, damage, source)
+            return projectile
+        return Projectile(x, y, target_x, target_y, damage, source)
+
+    def release(self, projectile):
+        """从所有精灵组中移除并放回池中"""
+        projectile.kill()
+        self._free.append(projectile)
+
+    def __len__(self):
+        return len(self._free)
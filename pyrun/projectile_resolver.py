@@ -0,0 +1,190 @@
+# projectile_resolver.py
+import heapq
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, MASK_COLLISION_ENABLED
+from battle_config import PROJECTILE_SIZE
+from collision import MASKS, first_overlap
+from projectile import create_projectile_image, projectile_velocity
+
+
+class Shot:
+    """解析模式下的一发投射物：只保存发射参数，位置由时间直接算出"""
+    __slots__ = ("x0", "y0", "vx", "vy", "t0", "damage", "source", "token")
+
+    def __init__(self, x0, y0, vx, vy, t0, damage, source=None):
+        self.x0 = x0
+        self.y0 = y0
+        self.vx = vx
+        self.vy = vy
+        self.t0 = t0
+        self.damage = damage
+        self.source = source  # 发射者名称
+        self.token = 0  # 每次重新预测加1，旧的事件随之失效
+
+    def position(self, t):
+        return self.x0 + self.vx * (t - self.t0), self.y0 + self.vy * (t - self.t0)
+
+
+def _overlap_window(r0, v, half, t_start, t_end):
+    """求 |r0 + v*(t - t_start)| < half 在 [t_start, t_end] 内成立的区间，无解时返回 None"""
+    if v == 0:
+        return (t_start, t_end) if abs(r0) < half else None
+    a = t_start + (-half - r0) / v
+    b = t_start + (half - r0) / v
+    lo, hi = (a, b) if a < b else (b, a)
+    lo, hi = max(lo, t_start), min(hi, t_end)
+    return (lo, hi) if lo < hi else None
+
+
+class ProjectileResolver:
+    """解析式投射物命中判定
+
+    发射时根据Trump当前的运动(匀速走向目标格子，到达后停下)直接解出命中时间或
+    飞出屏幕的时间，把事件放进按时间排序的堆里；每帧只弹出到期的事件，不做逐帧的
+    矩形碰撞和越界扫描。Trump的目标格子或速度变化时(motion_version 改变)才重新预测。
+    MASK_COLLISION_ENABLED 时在矩形重叠的时间段内再比较遮罩，命中形状与逐帧模式相同。
+    """
+
+    def __init__(self):
+        self.time = 0.0  # 模拟时间(秒)，只随 update 的 dt 前进
+        self.shots = set()
+        self._free = []  # 已结算的 Shot，下次发射时重复使用
+        self._hits = []  # 上次 update 返回的命中，调用方用完后才能重复使用
+        self._events = []  # (时间, 序号, 是否命中, shot, token)
+        self._seq = 0
+        self._trump = None
+        self._motion_version = None
+        self.image = create_projectile_image()
+        self.mask = MASKS.get("projectile", self.image)
+        self._half_w = PROJECTILE_SIZE[0] / 2
+        self._half_h = PROJECTILE_SIZE[1] / 2
+
+    def fire(self, x, y, target_x, target_y, damage, trump, source=None):
+        """从 (x, y) 向目标点发射一发投射物，并立即预测其结局"""
+        vx, vy = projectile_velocity(x, y, target_x, target_y)
+        if self._free:
+            # token 不清零: 堆中引用这个对象的旧事件仍然失效
+            shot = self._free.pop()
+            shot.x0, shot.y0, shot.vx, shot.vy = float(x), float(y), vx, vy
+            shot.t0, shot.damage, shot.source = self.time, damage, source
+        else:
+            shot = Shot(float(x), float(y), vx, vy, self.time, damage, source)
+        self.shots.add(shot)
+        self._sync_trump(trump)
+        self._predict(shot, trump)
+        return shot
+
+    def clear(self):
+        self._free.extend(self.shots)
+        self.shots.clear()
+        self._events.clear()
+
+    def update(self, dt, trump):
+        """推进模拟时间并结算到期的事件
+
+        Returns:
+            list[Shot]: 本帧命中Trump的投射物(与 Projectile 一样有 damage 和 source)
+        """
+        self.time += dt
+        self._free.extend(self._hits)
+        if self._sync_trump(trump):
+            # Trump的运动变了，按当前状态重新预测所有在飞的投射物
+            self._events = []
+            for shot in self.shots:
+                self._predict(shot, trump)
+
+        hits = []
+        while self._events and self._events[0][0] <= self.time:
+            _, _, is_hit, shot, token = heapq.heappop(self._events)
+            if token != shot.token or shot not in self.shots:
+                continue
+            self.shots.discard(shot)
+            if is_hit:
+                hits.append(shot)
+            else:
+                self._free.append(shot)
+        self._hits = hits
+        return hits
+
+    def _sync_trump(self, trump):
+        changed = trump is not self._trump or trump.motion_version != self._motion_version
+        self._trump = trump
+        self._motion_version = trump.motion_version
+        return changed
+
+    def _trump_segments(self, trump, t_end):
+        """Trump从现在起的运动轨迹，按分段匀速给出 (起始x, 速度, 开始时间, 结束时间)"""
+        now = self.time
+        x = float(trump.pixel_x)
+        if trump.is_moving:
+            target_x = trump.calculate_x_position(trump.target_position)
+            speed = trump.get_actual_speed()
+            arrive = now + abs(target_x - x) / speed
+            velocity = speed if target_x > x else -speed
+            if arrive >= t_end:
+                return [(x, velocity, now, t_end)]
+            return [(x, velocity, now, arrive), (float(target_x), 0.0, arrive, t_end)]
+        return [(x, 0.0, now, t_end)]
+
+    def _exit_time(self, shot):
+        """投射物完全离开屏幕的时间(与逐帧模式的越界判定一致)"""
+        now = self.time
+        x, y = shot.position(now)
+        limits = []
+        if shot.vx > 0:
+            limits.append((SCREEN_WIDTH + self._half_w - x) / shot.vx)
+        elif shot.vx < 0:
+            limits.append((-self._half_w - x) / shot.vx)
+        if shot.vy > 0:
+            limits.append((SCREEN_HEIGHT + self._half_h - y) / shot.vy)
+        elif shot.vy < 0:
+            limits.append((-self._half_h - y) / shot.vy)
+        return now + max(0.0, min(limits)) if limits else float("inf")
+
+    def _predict(self, shot, trump):
+        shot.token += 1
+        now = self.time
+        exit_time = self._exit_time(shot)
+        x, y = shot.position(now)
+        half_x = self._half_w + trump.rect.width / 2
+        half_y = self._half_h + trump.rect.height / 2
+        y_window = _overlap_window(y - trump.rect.centery, shot.vy, half_y, now, exit_time)
+
+        hit_time = None
+        if y_window:
+            for seg_x, seg_v, seg_start, seg_end in self._trump_segments(trump, exit_time):
+                shot_x = x + shot.vx * (seg_start - now)
+                x_window = _overlap_window(shot_x - seg_x, shot.vx - seg_v, half_x, seg_start, seg_end)
+                start = max(x_window[0], y_window[0]) if x_window else None
+                if start is None or start >= min(x_window[1], y_window[1]):
+                    continue
+                if MASK_COLLISION_ENABLED:
+                    # 投射物左上角相对Trump左上角的偏移，在矩形重叠的时间段内找第一次遮罩重叠
+                    offset = (x + shot.vx * (start - now) - self._half_w
+                              - (seg_x + seg_v * (start - seg_start) - trump.rect.width / 2),
+                              y + shot.vy * (start - now) - self._half_h - trump.rect.top)
+                    start = first_overlap(trump.mask, self.mask, offset, (shot.vx - seg_v, shot.vy),
+                                          start, min(x_window[1], y_window[1]))
+                    if start is None:
+                        continue
+                hit_time = start
+                break
+
+        self._seq += 1
+        if hit_time is not None:
+            heapq.heappush(self._events, (hit_time, self._seq, True, shot, shot.token))
+        else:
+            heapq.heappush(self._events, (exit_time, self._seq, False, shot, shot.token))
+
+    def positions(self):
+        """所有在飞投射物当前的左上角坐标"""
+        w, h = PROJECTILE_SIZE
+        result = []
+        for shot in self.shots:
+            x, y = shot.position(self.time)
+            result.append((int(x) - w // 2, int(y) - h // 2))
+        return result
+
+    def draw(self, surface):
+        """按当前模拟时间绘制所有在飞的投射物(共享同一张图片)"""
+        for pos in self.positions():
+            surface.blit(self.image, pos)
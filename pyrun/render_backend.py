@@ -0,0 +1,283 @@
+# render_backend.py
+# 两种绘制后端，启动时选择(环境变量 MEMEVSTRUMP_RENDERER):
+#   surface   软件 Surface.blit 到显示表面，再 display.flip()(默认)
+#   renderer  pygame._sdl2.video 的 Renderer/Texture。每个图片表面只上传一次为纹理，
+#             之后由 SDL 的渲染器绘制(有GPU时硬件加速，否则使用SDL的软件渲染器)
+#
+# 游戏的绘制代码只使用 blit/blits/fill 和本模块的 draw_rect，两种后端共用同一套代码。
+# 加载页和开始页仍然画在一个普通的 Surface 上，renderer 后端下由 flip() 整体上传显示。
+#
+# 窗口可以缩放(MEMEVSTRUMP_SCALE_MODE，见 display_scaling.py)，游戏始终按逻辑分辨率绘制。
+# 事件循环取出事件后先交给 translate_event()，鼠标坐标换算为逻辑坐标。
+#
+# 比较两种后端的输出和每帧耗时: python render_backend.py
+import time
+import weakref
+import pygame
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_BACKEND, RENDERER_ACCELERATED, RENDERER_VSYNC, DISPLAY_SCALE_MODE
+)
+from display_scaling import ScaledCanvas
+
+_display = None  # open_display() 创建的显示
+
+
+class TextureCanvas:
+    """在 Renderer 上绘制的画布，接口与游戏用到的 Surface 方法一致
+
+    纹理按源表面缓存(弱引用)，表面被回收时纹理随之释放。
+    游戏中的图片和文字表面创建后不再修改，所以纹理不需要重新上传。
+    """
+
+    def __init__(self, renderer, size):
+        self.renderer = renderer
+        self.size = size
+        self.textures = weakref.WeakKeyDictionary()
+        self.uploads = 0
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            from pygame._sdl2.video import Texture
+            texture = Texture.from_surface(self.renderer, surface)
+            self.textures[surface] = texture
+            self.uploads += 1
+        return texture
+
+    def get_size(self):
+        return self.size
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """与 Surface.blit 相同: dest 为坐标或矩形(只使用左上角)"""
+        x, y = dest[0], dest[1]
+        if area is None:
+            width, height = source.get_size()
+            self.texture(source).draw(dstrect=(x, y, width, height))
+        else:
+            area = pygame.Rect(area)
+            width, height = area.size
+            self.texture(source).draw(srcrect=area, dstrect=(x, y, width, height))
+        return pygame.Rect(x, y, width, height)
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = [self.blit(item[0], item[1], *item[2:]) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None):
+        renderer = self.renderer
+        renderer.draw_color = _rgba(color)
+        if rect is None:
+            renderer.clear()
+        else:
+            renderer.fill_rect(pygame.Rect(rect))
+
+    def draw_rect(self, color, rect, width=0):
+        """与 pygame.draw.rect 相同: width 为 0 时填充，否则向内画 width 像素宽的边框"""
+        renderer = self.renderer
+        renderer.draw_color = _rgba(color)
+        rect = pygame.Rect(rect)
+        if width <= 0:
+            renderer.fill_rect(rect)
+            return rect
+        for i in range(width):
+            inner = rect.inflate(-2 * i, -2 * i)
+            if inner.width <= 0 or inner.height <= 0:
+                break
+            renderer.draw_rect(inner)
+        return rect
+
+
+def _rgba(color):
+    color = pygame.Color(color)
+    return (color.r, color.g, color.b, color.a)
+
+
+def draw_rect(target, color, rect, width=0):
+    """在 Surface 或 TextureCanvas 上画矩形"""
+    if isinstance(target, pygame.Surface):
+        return pygame.draw.rect(target, color, rect, width)
+    return target.draw_rect(color, rect, width)
+
+
+class SurfaceDisplay:
+    """默认后端
+
+    固定窗口时显示表面本身就是画布；窗口可缩放时画布是 ScaledCanvas，
+    screen 是它的逻辑分辨率表面。
+    """
+    backend = "surface"
+
+    def __init__(self, size, caption, scale_mode=DISPLAY_SCALE_MODE):
+        pygame.display.set_caption(caption)
+        if scale_mode == "off":
+            self.screen = pygame.display.set_mode(size)
+            self.canvas = self.screen
+        else:
+            window = pygame.display.set_mode(size, pygame.RESIZABLE)
+            self.canvas = ScaledCanvas(window, size, scale_mode)
+            self.screen = self.canvas.logical
+
+    def translate_event(self, event):
+        canvas = self.canvas
+        if canvas is self.screen:
+            return event
+        if event.type == pygame.VIDEORESIZE:
+            canvas.resize((event.w, event.h))
+        elif hasattr(event, "pos") and (canvas.scale != 1.0 or canvas.offset != (0, 0)):
+            return pygame.event.Event(event.type, dict(event.dict, pos=canvas.to_logical(event.pos)))
+        return event
+
+    def present(self):
+        if self.canvas is self.screen:
+            pygame.display.flip()
+        else:
+            self.canvas.present()
+
+    def present_surface(self):
+        if self.canvas is self.screen:
+            pygame.display.flip()
+        else:
+            self.canvas.present_logical()
+
+
+class RendererDisplay:
+    """Renderer 后端
+
+    SDL 不允许同一个窗口同时拥有显示表面和渲染器，所以 pygame.display 只保留一个隐藏的
+    1x1 模式(convert/convert_alpha 需要)，游戏窗口是单独的 Window。
+    窗口可缩放时由渲染器的逻辑尺寸完成缩放(GPU 缩放纹理，不需要预缩放版本)，
+    SDL 也会把鼠标事件换算为逻辑坐标。
+    """
+    backend = "renderer"
+
+    def __init__(self, size, caption, accelerated=RENDERER_ACCELERATED, vsync=RENDERER_VSYNC,
+                 scale_mode=DISPLAY_SCALE_MODE):
+        from pygame._sdl2.video import Window, Renderer
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.window = Window(caption, size=size, resizable=scale_mode != "off")
+        self.renderer = Renderer(self.window, accelerated=accelerated, vsync=vsync)
+        self.renderer.logical_size = size
+        self.screen = pygame.Surface(size)  # 加载页、开始页等仍按 Surface 绘制的画面
+        self.canvas = TextureCanvas(self.renderer, size)
+        self._screen_texture = None
+
+    def translate_event(self, event):
+        return event
+
+    def present(self):
+        self.renderer.present()
+
+    def present_surface(self):
+        """把 screen 整体上传并显示"""
+        from pygame._sdl2.video import Texture
+        if self._screen_texture is None:
+            self._screen_texture = Texture(self.renderer, self.screen.get_size(), streaming=True)
+        self._screen_texture.update(self.screen)
+        self._screen_texture.draw()
+        self.renderer.present()
+
+
+def open_display(size=(SCREEN_WIDTH, SCREEN_HEIGHT), caption="", backend=RENDER_BACKEND):
+    """创建显示，renderer 后端不可用时退回 surface 后端
+
+    Returns:
+        SurfaceDisplay | RendererDisplay
+    """
+    global _display
+    if backend == "renderer":
+        try:
+            _display = RendererDisplay(size, caption)
+            print("Using SDL Renderer backend")
+            return _display
+        except (ImportError, pygame.error) as e:
+            print(f"Warning: SDL Renderer unavailable ({e}), using Surface backend")
+    elif backend != "surface":
+        print(f"Warning: Unknown render backend '{backend}', using Surface backend")
+    _display = SurfaceDisplay(size, caption)
+    return _display
+
+
+def get_display():
+    """open_display() 创建的显示；直接使用 pygame.display.set_mode 时为 None"""
+    return _display
+
+
+def translate_event(event):
+    """窗口缩放时更新画布，鼠标事件的坐标换算为逻辑坐标
+
+    Returns:
+        pygame.event.Event: 换算后的事件(不需要换算时就是原事件)
+    """
+    if _display is None:
+        return event
+    return _display.translate_event(event)
+
+
+def flip():
+    """显示画在 screen 表面上的内容(加载页、开始页使用)"""
+    if _display is None:
+        pygame.display.flip()
+    else:
+        _display.present_surface()
+
+
+def benchmark(frames=200):
+    """用同一局游戏比较两种后端的输出和每帧耗时(无窗口运行)"""
+    import os
+    import io
+    import contextlib
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    display = RendererDisplay((SCREEN_WIDTH, SCREEN_HEIGHT), "benchmark", accelerated=-1)
+    from game import Game
+    from meme_card import MemeCard
+    from meme_catalog import CATALOG
+
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game(screen=surface)
+        game.setup_level(2)
+        for cell_index, template in enumerate(CATALOG.templates[:5]):
+            game.game_board.get_cell_by_index(cell_index).plant_meme(
+                MemeCard(template["name"], template["base_damage"], template["star"], template["image_key"]))
+        for _ in range(60):
+            game.update_game_state(1.0 / 30)
+
+    game.draw_frame(display.canvas)  # 预先上传纹理
+    results = {}
+    for name, canvas, finish in (("surface", surface, lambda: None),
+                                 ("renderer", display.canvas, display.renderer.present)):
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.draw_frame(canvas)
+            finish()
+        results[name] = (time.perf_counter() - start) / frames * 1000.0
+
+    game.draw_frame(display.canvas)
+    rendered = display.renderer.to_surface()
+    game.draw_frame(surface)
+    max_diff = 0
+    different = 0
+    for x in range(0, SCREEN_WIDTH):
+        for y in range(0, SCREEN_HEIGHT, 2):
+            a = surface.get_at((x, y))
+            b = rendered.get_at((x, y))
+            diff = max(abs(a.r - b.r), abs(a.g - b.g), abs(a.b - b.b))
+            if diff:
+                different += 1
+                max_diff = max(max_diff, diff)
+    game.close()
+    print(f"Surface:  {results['surface']:.2f} ms/frame")
+    print(f"Renderer: {results['renderer']:.2f} ms/frame ({display.canvas.uploads} textures uploaded once)")
+    print(f"Output: {different} sampled pixels differ, max channel difference {max_diff}")
+    return results, max_diff
+
+
+if __name__ == "__main__":
+    benchmark()
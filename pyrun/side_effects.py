@@ -0,0 +1,235 @@
+# side_effects.py
+# UI 事件处理中触发的阻塞操作(打开浏览器、启动外部进程，以后的网络同步等)在后台线程执行，
+# 一次慢调用不会卡住游戏循环。
+#   submit()    放入有界队列后立即返回；队列满时拒绝(返回 None)，调用方提示稍后再试
+#   完成后向 pygame 事件队列投递 SIDE_EFFECT_DONE 事件，主循环把它交给 dispatch()，
+#   在处理事件的线程中调用完成回调，回调可以直接修改游戏状态
+#   stats()     队列深度，排队和执行耗时的分布(毫秒)
+import queue
+import threading
+import time
+from collections import deque
+import pygame
+from config import SIDE_EFFECT_WORKERS, SIDE_EFFECT_QUEUE_SIZE, SIDE_EFFECT_MAX_SAMPLES, SIDE_EFFECT_CLOSE_TIMEOUT
+
+SIDE_EFFECT_DONE = pygame.event.custom_type()
+_STOP = object()
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class SideEffect:
+    """一次提交的操作，完成后 result 或 error 之一有值"""
+
+    __slots__ = ("name", "func", "args", "on_done", "submitted", "started", "finished", "result", "error")
+
+    def __init__(self, name, func, args, on_done):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.on_done = on_done
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class SideEffectExecutor:
+    """执行阻塞操作的后台线程池
+
+    工作线程在第一次提交时启动。完成回调只在调用 dispatch() 的线程中执行，不在工作线程中。
+
+    Args:
+        workers (int): 工作线程数
+        max_pending (int): 排队等待执行的最大数量，超过时 submit() 拒绝
+        max_samples (int): 保留的耗时样本数
+    """
+
+    def __init__(self, workers=SIDE_EFFECT_WORKERS, max_pending=SIDE_EFFECT_QUEUE_SIZE,
+                 max_samples=SIDE_EFFECT_MAX_SAMPLES):
+        self.workers = workers
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wait_ms = deque(maxlen=max_samples)  # 提交到开始执行
+        self._run_ms = deque(maxlen=max_samples)  # 执行
+        self._warned_post = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+
+    def submit(self, name, func, *args, on_done=None, timeout=0):
+        """提交一个操作
+
+        Args:
+            name (str): 统计和日志中使用的名称
+            func (callable): 在工作线程中调用 func(*args)
+            on_done (callable, optional): 完成后以 SideEffect 为参数调用(在 dispatch() 的线程中)
+            timeout (float): 队列满时最多等待的秒数，0 表示不等待
+
+        Returns:
+            SideEffect | None: 队列已满时为 None
+        """
+        job = SideEffect(name, func, args, on_done)
+        if not self._threads:
+            self._start()
+        try:
+            if timeout > 0:
+                self._pending.put(job, timeout=timeout)
+            else:
+                self._pending.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            print(f"Warning: Side-effect queue full, rejected {name}")
+            return None
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._pending.qsize())
+        return job
+
+    def dispatch(self, event):
+        """处理 SIDE_EFFECT_DONE 事件，调用完成回调
+
+        Returns:
+            bool: 是否是本模块的事件
+        """
+        if event.type != SIDE_EFFECT_DONE:
+            return False
+        job = event.job
+        if job.on_done is not None:
+            job.on_done(job)
+        return True
+
+    @property
+    def depth(self):
+        """排队等待执行的数量"""
+        return self._pending.qsize()
+
+    def stats(self):
+        """计数、队列深度和耗时分布
+
+        Returns:
+            dict: {submitted, completed, failed, rejected, depth, max_depth, wait, run}，
+                  wait/run 为 {count, mean, p50, p90, max}，单位毫秒
+        """
+        with self._lock:
+            result = {"submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                      "rejected": self.rejected, "depth": self._pending.qsize(), "max_depth": self.max_depth}
+            samples = {"wait": sorted(self._wait_ms), "run": sorted(self._run_ms)}
+        for stage, values in samples.items():
+            if values:
+                result[stage] = {
+                    "count": len(values),
+                    "mean": round(sum(values) / len(values), 2),
+                    "p50": round(_percentile(values, 0.5), 2),
+                    "p90": round(_percentile(values, 0.9), 2),
+                    "max": round(values[-1], 2),
+                }
+        return result
+
+    def print_report(self):
+        s = self.stats()
+        parts = [f"{stage} p50 {s[stage]['p50']:.1f} / p90 {s[stage]['p90']:.1f} / max {s[stage]['max']:.1f} ms"
+                 for stage in ("wait", "run") if stage in s]
+        print(f"Side effects: {s['completed']} done, {s['failed']} failed, {s['rejected']} rejected, "
+              f"max queue {s['max_depth']}" + ("; " + "; ".join(parts) if parts else ""))
+
+    def close(self, timeout=SIDE_EFFECT_CLOSE_TIMEOUT):
+        """执行完已提交的操作后结束工作线程
+
+        工作线程是守护线程，超过 timeout 秒仍未结束的操作(例如卡住的外部进程)不再等待。
+        """
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._pending.put(_STOP)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                print(f"Warning: Side-effect worker still busy after {timeout:.0f}s, not waiting")
+                break
+
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"SideEffect-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker_loop(self):
+        while True:
+            job = self._pending.get()
+            if job is _STOP:
+                self._pending.task_done()
+                break
+            job.started = time.perf_counter()
+            try:
+                job.result = job.func(*job.args)
+            except Exception as e:
+                job.error = e
+                print(f"Warning: Side effect {job.name} failed: {e}")
+            job.finished = time.perf_counter()
+            with self._lock:
+                if job.error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._wait_ms.append((job.started - job.submitted) * 1000.0)
+                self._run_ms.append((job.finished - job.started) * 1000.0)
+            self._deliver(job)
+            self._pending.task_done()
+
+    def _deliver(self, job):
+        if job.on_done is None:
+            return
+        try:
+            pygame.event.post(pygame.event.Event(SIDE_EFFECT_DONE, job=job))
+        except pygame.error as e:
+            # 显示已经关闭(退出时)，回调不再需要
+            if not self._warned_post:
+                print(f"Warning: Could not deliver side-effect result: {e}")
+                self._warned_post = True
+
+
+_executor = None
+
+
+def get_executor():
+    """游戏共用的执行器(开始页面和游戏循环)"""
+    global _executor
+    if _executor is None:
+        _executor = SideEffectExecutor()
+    return _executor
+
+
+def submit(name, func, *args, on_done=None, timeout=0):
+    """在共用执行器上提交操作，参数见 SideEffectExecutor.submit"""
+    return get_executor().submit(name, func, *args, on_done=on_done, timeout=timeout)
+
+
+def dispatch(event):
+    """处理 SIDE_EFFECT_DONE 事件，其他事件返回 False"""
+    if event.type != SIDE_EFFECT_DONE:
+        return False
+    return get_executor().dispatch(event)
+
+
+def shutdown():
+    """结束共用执行器，提交过操作时打印统计"""
+    global _executor
+    if _executor is None:
+        return
+    executor, _executor = _executor, None
+    executor.close()
+    if executor.submitted:
+        executor.print_report()
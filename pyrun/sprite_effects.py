@@ -0,0 +1,167 @@
+# sprite_effects.py
+# 精灵的动画和特效帧: 受击闪白、撤退时镜像、Meme受伤变红、行走时左右摇摆。
+# 每种 (图片, 尺寸, 效果) 的帧只用 pygame.transform 生成一次，放进有大小上限的缓存(LRU)；
+# 播放哪一帧只由模拟时间和实体状态决定，每帧绘制只是一次字典查找和一次 blit。
+#   EffectCache  生成并缓存变体帧
+#   Animator     每个实体一个，根据模拟时间选出当前帧
+# 选帧在模拟线程中进行(Game._step)，实体的 image 属性总是当前帧，快照和绘制不需要改变。
+from collections import OrderedDict, namedtuple
+import pygame
+import memory_stats
+from config import (
+    SPRITE_EFFECTS_ENABLED, EFFECT_CACHE_MAX_BYTES, HIT_FLASH_TIME, HIT_FLASH_LEVELS,
+    DAMAGE_TINT_LEVELS, WALK_FRAME_TIME, WALK_ANGLES
+)
+
+# 一个变体帧: 是否水平镜像、旋转角度、闪白等级(0 为不闪)、变红等级(0 为原色)
+Effect = namedtuple("Effect", ["flip", "angle", "flash", "tint"])
+NO_EFFECT = Effect(False, 0, 0, 0)
+
+
+def bake(image, effect):
+    """按效果生成一帧(尺寸与原图相同)"""
+    frame = image
+    if effect.flip:
+        frame = pygame.transform.flip(frame, True, False)
+    if effect.angle and image.get_flags() & pygame.SRCALPHA:
+        # 旋转后裁回原尺寸，rect 和碰撞范围不变；没有透明通道的图片不旋转，避免出现色块
+        rotated = pygame.transform.rotate(frame, effect.angle)
+        frame = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        frame.blit(rotated, rotated.get_rect(center=frame.get_rect().center))
+    if frame is image:
+        frame = image.copy()
+    if effect.tint:
+        # 变红: 绿色和蓝色按等级衰减
+        keep = 255 - effect.tint * 120 // DAMAGE_TINT_LEVELS
+        frame.fill((255, keep, keep), special_flags=pygame.BLEND_RGB_MULT)
+    if effect.flash:
+        # 闪白: 颜色加亮，透明部分不变
+        add = effect.flash * 200 // HIT_FLASH_LEVELS
+        frame.fill((add, add, add), special_flags=pygame.BLEND_RGB_ADD)
+    return frame
+
+
+class EffectCache:
+    """变体帧缓存，总字节数超过上限时丢弃最久没有用到的帧
+
+    Args:
+        max_bytes (int): 缓存的帧占用的像素内存上限
+    """
+
+    def __init__(self, max_bytes=EFFECT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()  # (资源名, 尺寸, Effect) -> Surface
+
+    def get(self, asset, image, effect):
+        """image 的 effect 变体；asset 是图片的资源名(同名同尺寸的图片内容相同)"""
+        if effect == NO_EFFECT:
+            return image
+        key = (asset, image.get_size(), effect)
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+        self.misses += 1
+        frame = memory_stats.track_surface(bake(image, effect), "effect")
+        self._frames[key] = frame
+        self.bytes += frame.get_pitch() * frame.get_height()
+        while self.bytes > self.max_bytes and len(self._frames) > 1:
+            _, old = self._frames.popitem(last=False)
+            self.bytes -= old.get_pitch() * old.get_height()
+            self.evictions += 1
+        return frame
+
+    def clear(self):
+        self._frames.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+
+CACHE = EffectCache()
+
+
+class Animator:
+    """一个实体的动画状态
+
+    生命值下降时开始闪白，镜像和行走摇摆由调用方给出的状态决定，
+    各效果的当前等级都由模拟时间算出，因此任何倍速和录像中的画面都一致。
+
+    Args:
+        asset (str): 图片的资源名
+        image (pygame.Surface): 原图
+        tint (bool): 是否随受伤程度变红(Meme)
+        cache (EffectCache): 使用的缓存
+    """
+
+    def __init__(self, asset, image, tint=False, cache=CACHE):
+        self.asset = asset
+        self.image = image
+        self.tint = tint
+        self.cache = cache
+        self.reset()
+
+    def reset(self, health=None):
+        """实体重新出场(对象复用)时调用"""
+        self._health = health
+        self._hit_time = None
+        self._effect = NO_EFFECT
+        self._frame = self.image
+
+    def frame(self, now, health, max_health, flip=False, walking=False):
+        """模拟时间 now 时应显示的帧"""
+        if not SPRITE_EFFECTS_ENABLED:
+            return self.image
+        if self._health is not None and health < self._health:
+            self._hit_time = now
+        self._health = health
+
+        flash = 0
+        if self._hit_time is not None:
+            elapsed = now - self._hit_time
+            if elapsed < HIT_FLASH_TIME:
+                flash = HIT_FLASH_LEVELS - int(elapsed * HIT_FLASH_LEVELS / HIT_FLASH_TIME)
+            else:
+                self._hit_time = None
+        angle = WALK_ANGLES[int(now / WALK_FRAME_TIME) % len(WALK_ANGLES)] if walking else 0
+        tint = 0
+        if self.tint and max_health > 0 and health < max_health:
+            tint = 1 + int((1 - health / max_health) * (DAMAGE_TINT_LEVELS - 1))
+
+        effect = Effect(flip, angle, flash, tint)
+        if effect != self._effect:
+            self._effect = effect
+            self._frame = self.cache.get(self.asset, self.image, effect)
+        return self._frame
+
+
+def benchmark(frames=2000, size=(80, 80)):
+    """比较每帧临时变换与缓存帧的耗时(每帧毫秒)"""
+    import time
+    image = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.circle(image, (200, 120, 40, 255), (size[0] // 2, size[1] // 2), size[0] // 2)
+    target = pygame.Surface((1024, 768))
+    effects = [Effect(i % 2 == 0, WALK_ANGLES[i % len(WALK_ANGLES)], i % (HIT_FLASH_LEVELS + 1),
+                      i % (DAMAGE_TINT_LEVELS + 1)) for i in range(frames)]
+    start = time.perf_counter()
+    for effect in effects:
+        target.blit(bake(image, effect), (100, 100))
+    naive = (time.perf_counter() - start) * 1000 / frames
+    cache = EffectCache()
+    start = time.perf_counter()
+    for effect in effects:
+        target.blit(cache.get("benchmark", image, effect), (100, 100))
+    cached = (time.perf_counter() - start) * 1000 / frames
+    return naive, cached, len(cache)
+
+
+if __name__ == "__main__":
+    naive, cached, variants = benchmark()
+    print(f"transform every frame: {naive:.3f} ms/frame")
+    print(f"cached frames: {cached:.3f} ms/frame ({variants} variants baked once)")
@@ -1,9 +1,9 @@
 import pygame
-import os
-import webbrowser
-import platform
-import subprocess
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, load_image
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK, WHITE, IMAGE_PATHS, BEGIN_IMAGE_SIZE, load_image
+from fonts import get_font, render_text
+from frame_pacer import FramePacer
+import render_backend
+import side_effects
 
 class StartScreen:
     def __init__(self, screen):
@@ -13,22 +13,16 @@ class StartScreen:
             screen: pygame Surface对象，游戏的主屏幕
         """
         self.screen = screen
-        self.font = pygame.font.SysFont(None, 48)
-        self.button_font = pygame.font.SysFont(None, 36)
+        self.font = get_font(48)
+        self.button_font = get_font(36)
         
-        # 加载背景图像
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        begin_path = os.path.join(script_dir, "assets", "begin", "begin.png")
+        # 加载背景图像(已按屏幕中央区域的大小预缩放)
         try:
-            self.begin_image = load_image(begin_path)
-            # 调整图像大小以适应屏幕中央区域
-            image_width = int(SCREEN_WIDTH * 0.8)
-            image_height = int(SCREEN_HEIGHT * 0.5)
-            self.begin_image = pygame.transform.scale(self.begin_image, (image_width, image_height))
+            self.begin_image = load_image(IMAGE_PATHS["begin"], size=BEGIN_IMAGE_SIZE)
         except Exception as e:
             print(f"无法加载开始页面图像: {e}")
             # 创建一个占位符
-            self.begin_image = pygame.Surface((int(SCREEN_WIDTH * 0.8), int(SCREEN_HEIGHT * 0.5)))
+            self.begin_image = pygame.Surface(BEGIN_IMAGE_SIZE)
             self.begin_image.fill((200, 200, 200))  # 灰色背景
         
         # 标题
@@ -67,13 +61,24 @@ class StartScreen:
         # 关闭按钮
         self.close_button_rect = pygame.Rect(SCREEN_WIDTH - 40, 10, 30, 30)
         self.close_button_text = "X"
+        
+        self.frame_pacer = FramePacer()
     
     def open_chrome(self, url):
-        """使用Chrome浏览器打开指定URL
+        """在后台使用Chrome浏览器打开指定URL，不阻塞事件处理
         
         Args:
             url: 要打开的URL
         """
+        side_effects.submit("open_chrome", self._launch_chrome, url)
+    
+    @staticmethod
+    def _launch_chrome(url):
+        """启动Chrome(在后台线程中调用，可能阻塞)"""
+        # 只有点击Connect Wallet时才需要，延迟导入以缩短启动时间
+        import webbrowser
+        import platform
+        import subprocess
         try:
             system = platform.system()
             
@@ -114,13 +119,17 @@ class StartScreen:
         Returns:
             str: 'guest' 表示选择Guest Mode，'wallet' 表示选择Connect Wallet，None 表示无选择
         """
-        for event in pygame.event.get():
+        for event in self.frame_pacer.events():
+            event = render_backend.translate_event(event)
+            self.frame_pacer.handle_event(event)
+            if side_effects.dispatch(event):
+                continue
             if event.type == pygame.QUIT:
                 return 'quit'
             
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # 左键点击
-                    mouse_pos = pygame.mouse.get_pos()
+                    mouse_pos = event.pos
                     
                     # 检查是否点击了关闭按钮
                     if self.close_button_rect.collidepoint(mouse_pos):
@@ -144,21 +153,21 @@ class StartScreen:
         self.screen.fill((255, 255, 204))  # 浅黄色背景，与图片中背景色相匹配
         
         # 绘制标题
-        title_surf = self.font.render(self.title_text, True, self.title_color)
+        title_surf = render_text(self.title_text, 48, self.title_color)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH // 2, 50))
         self.screen.blit(title_surf, title_rect)
         
         # 绘制Guest Mode按钮
         pygame.draw.rect(self.screen, self.guest_button_color, self.guest_button_rect)
         pygame.draw.rect(self.screen, WHITE, self.guest_button_rect, 2)  # 白色边框
-        guest_text = self.button_font.render(self.guest_button_text, True, WHITE)
+        guest_text = render_text(self.guest_button_text, 36, WHITE)
         guest_text_rect = guest_text.get_rect(center=self.guest_button_rect.center)
         self.screen.blit(guest_text, guest_text_rect)
         
         # 绘制Connect Wallet按钮
         pygame.draw.rect(self.screen, self.wallet_button_color, self.wallet_button_rect)
         pygame.draw.rect(self.screen, WHITE, self.wallet_button_rect, 2)  # 白色边框
-        wallet_text = self.button_font.render(self.wallet_button_text, True, WHITE)
+        wallet_text = render_text(self.wallet_button_text, 36, WHITE)
         wallet_text_rect = wallet_text.get_rect(center=self.wallet_button_rect.center)
         self.screen.blit(wallet_text, wallet_text_rect)
         
@@ -167,12 +176,12 @@ class StartScreen:
         
         # 绘制关闭按钮
         pygame.draw.rect(self.screen, (0, 0, 0), self.close_button_rect)
-        close_text = self.button_font.render(self.close_button_text, True, WHITE)
+        close_text = render_text(self.close_button_text, 36, WHITE)
         close_text_rect = close_text.get_rect(center=self.close_button_rect.center)
         self.screen.blit(close_text, close_text_rect)
         
         # 更新屏幕
-        pygame.display.flip()
+        render_backend.flip()
     
     def run(self):
         """运行开始页面
@@ -180,7 +189,6 @@ class StartScreen:
         Returns:
             str: 'guest' 表示选择Guest Mode，'wallet' 表示选择Connect Wallet，'quit' 表示退出游戏
         """
-        clock = pygame.time.Clock()
         running = True
         
         while running:
@@ -189,7 +197,8 @@ class StartScreen:
                 return result
             
             self.draw()
-            clock.tick(30)
+            # 开始页面是静态的，只在有事件(输入、窗口重绘)时才重画
+            self.frame_pacer.tick(animating=False)
         
         return 'quit'
 
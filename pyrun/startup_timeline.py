@@ -0,0 +1,64 @@
+# startup_timeline.py
+# 记录启动各阶段的耗时。main.py 应最先导入本模块，使计时起点尽量靠前。
+import json
+import os
+import time
+
+_start = time.perf_counter()
+_marks = []  # [(阶段名, 距启动的秒数)]
+
+
+def mark(name):
+    """记录一个启动阶段完成的时间点"""
+    _marks.append((name, time.perf_counter() - _start))
+
+
+def mark_once(name):
+    """同 mark，但同名阶段只记录第一次(用于每帧都会经过的位置，如 first_frame)"""
+    for mark_name, _ in _marks:
+        if mark_name == name:
+            return
+    mark(name)
+
+
+def elapsed(name):
+    """返回某阶段距启动的秒数，未记录时为 None"""
+    for mark_name, seconds in _marks:
+        if mark_name == name:
+            return seconds
+    return None
+
+
+def report(metrics_path=None):
+    """打印启动时间线，并把本次结果追加到指标文件中以便长期跟踪
+
+    Args:
+        metrics_path (str, optional): JSON Lines 指标文件，默认使用 config.STARTUP_METRICS_PATH
+
+    Returns:
+        dict: 本次启动的各阶段耗时(毫秒)
+    """
+    if metrics_path is None:
+        from config import STARTUP_METRICS_PATH
+        metrics_path = STARTUP_METRICS_PATH
+
+    print("--- Startup timeline ---")
+    previous = 0.0
+    for name, seconds in _marks:
+        print(f"{name:>16}: {seconds * 1000:8.1f} ms  (+{(seconds - previous) * 1000:.1f} ms)")
+        previous = seconds
+
+    record = {"timestamp": time.time()}
+    record.update({name: round(seconds * 1000, 2) for name, seconds in _marks})
+    ttff = elapsed("first_frame")
+    if ttff is not None:
+        print(f"Time to first frame: {ttff * 1000:.1f} ms")
+        record["time_to_first_frame"] = round(ttff * 1000, 2)
+
+    try:
+        os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+        with open(metrics_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not record startup metrics: {e}")
+    return record
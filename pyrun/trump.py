@@ -1,8 +1,7 @@
 # trump.py
-import pygame
-import time
+import memory_stats
 from config import (
-    NUM_CELLS, IMAGE_PATHS, load_image, CELL_WIDTH, CELL_HEIGHT, 
+    NUM_CELLS, IMAGE_PATHS, load_image, CELL_WIDTH, CELL_HEIGHT, BOARD_SPRITE_SIZE,
     TRUMP_SPAWN_CELL_INDEX, GAME_BOARD_START_X, GAME_BOARD_Y, FPS
 )
 from battle_config import (
@@ -10,11 +9,35 @@ from battle_config import (
     TRUMP_SLOW_DOWN_RATE, TRUMP_MIN_MOVE_SPEED, MAX_SLOW_DOWN_EFFECT,
     WHITE_HOUSE_CELL_INDEX, TRUMP_ATTACK_DAMAGE, TRUMP_ATTACK_INTERVAL
 )
+from render_backend import draw_rect
+from sprite_effects import Animator
+from collision import MASKS
 
 class Trump:
-    def __init__(self, level, spawn_cell_index):
+    def __init__(self, level, spawn_cell_index, max_health=None, move_speed=TRUMP_BASE_MOVE_SPEED):
+        # 加载图片(只在创建时加载一次，之后的关卡和波次用 reset 重复使用这个对象)
+        self.base_image = load_image(IMAGE_PATHS["trump"], size=BOARD_SPRITE_SIZE)
+        self.image = self.base_image  # 当前显示的帧(见 animate)
+        self.animator = Animator("trump", self.base_image)
+        # 命中遮罩只用原图: 镜像和摇摆只是画面效果，不随显示帧变化，任何倍速下命中都相同
+        self.mask = MASKS.get("trump", self.base_image)
+        self.rect = self.image.get_rect()
+        memory_stats.track_entity(self, self.base_image)
+        self.motion_version = 0  # 移动目标或速度每次变化时加1，用于使基于运动的预测失效
+        self.reset(level, spawn_cell_index, max_health, move_speed)
+
+    def reset(self, level, spawn_cell_index, max_health=None, move_speed=TRUMP_BASE_MOVE_SPEED):
+        """回到出生格子的初始状态
+        
+        Args:
+            level (int): 关卡
+            spawn_cell_index (int): 出生格子
+            max_health (int, optional): 最大生命值，默认按关卡线性增长
+            move_speed (float): 基础移动速度(像素/秒)
+        """
         self.level = level
-        self.max_health = TRUMP_BASE_HEALTH + (level - 1) * TRUMP_HEALTH_PER_LEVEL_INCREASE
+        self.max_health = max_health if max_health is not None else \
+            TRUMP_BASE_HEALTH + (level - 1) * TRUMP_HEALTH_PER_LEVEL_INCREASE
         self.current_health = self.max_health
         self.logical_position = spawn_cell_index
         self.is_retreating = False
@@ -22,21 +45,20 @@ class Trump:
         # 平滑移动相关属性
         self.target_position = spawn_cell_index
         self.pixel_x = self.calculate_x_position(spawn_cell_index)
-        self.base_move_speed = TRUMP_BASE_MOVE_SPEED
+        self.base_move_speed = move_speed
         self.current_move_speed = self.base_move_speed
         self.is_moving = False
         self.slow_down_factor = 1.0  # 减速因子，1.0表示无减速
+        self.motion_version += 1  # 同一个对象重新出场也要使旧的预测失效
         
         # 攻击相关属性
         self.attack_damage = TRUMP_ATTACK_DAMAGE
         self.attack_interval = TRUMP_ATTACK_INTERVAL
-        self.last_attack_time = 0
+        self.last_attack_time = float("-inf")
         self.is_attacking = False
         self.target_meme = None
-        
-        # 加载图片
-        self.image = load_image(IMAGE_PATHS["trump"], size=(CELL_WIDTH - 10, CELL_HEIGHT - 10))
-        self.rect = self.image.get_rect()
+        self.image = self.base_image
+        self.animator.reset(self.max_health)
         self.update_screen_position()
     
     def calculate_x_position(self, position):
@@ -46,20 +68,26 @@ class Trump:
         self.rect.centery = GAME_BOARD_Y + CELL_HEIGHT // 2
         self.rect.centerx = self.pixel_x
     
-    def move_logical(self):
+    def move_logical(self, next_cell=None):
+        """开始走向下一格
+        
+        Args:
+            next_cell (int, optional): 寻路给出的下一格(GameBoard.next_cell)；None 时沿这一行走一格
+        """
         # 如果正在攻击，不能移动
         if self.is_attacking:
             return
             
         if not self.is_moving:
-            if self.is_retreating:
-                if self.logical_position < TRUMP_SPAWN_CELL_INDEX:
-                    self.target_position = self.logical_position + 1
-                    self.is_moving = True
-            else:
-                if self.logical_position > WHITE_HOUSE_CELL_INDEX:
-                    self.target_position = self.logical_position - 1
-                    self.is_moving = True
+            if next_cell is None:
+                if self.is_retreating:
+                    next_cell = min(self.logical_position + 1, TRUMP_SPAWN_CELL_INDEX)
+                else:
+                    next_cell = max(self.logical_position - 1, WHITE_HOUSE_CELL_INDEX)
+            if next_cell != self.logical_position:
+                self.target_position = next_cell
+                self.is_moving = True
+                self.motion_version += 1
     
     def set_target_meme(self, meme):
         """设置Trump当前攻击的目标"""
@@ -93,10 +121,19 @@ class Trump:
             
         return False
     
+    def get_actual_speed(self):
+        """当前实际移动速度(像素/秒)，已计入减速效果"""
+        return max(TRUMP_MIN_MOVE_SPEED, self.current_move_speed * self.slow_down_factor)
+
+    def animate(self, now):
+        """按模拟时间选出当前帧: 受击闪白，撤退时镜像，移动时摇摆"""
+        self.image = self.animator.frame(now, self.current_health, self.max_health,
+                                         flip=self.is_retreating, walking=self.is_moving)
+
     def update(self, dt):
         if self.is_moving:
             # 计算当前实际移动速度
-            actual_speed = max(TRUMP_MIN_MOVE_SPEED, self.current_move_speed * self.slow_down_factor)
+            actual_speed = self.get_actual_speed()
             
             target_x = self.calculate_x_position(self.target_position)
             current_x = self.pixel_x
@@ -116,6 +153,7 @@ class Trump:
                 self.pixel_x = target_x
                 self.logical_position = self.target_position
                 self.is_moving = False
+                self.motion_version += 1
             
             self.update_screen_position()
     
@@ -126,11 +164,15 @@ class Trump:
         self.current_health -= damage
         
         # 降低移动速度
+        previous_speed = self.get_actual_speed()
         self.slow_down_factor *= (1 - TRUMP_SLOW_DOWN_RATE)
         
         # 确保减速不超过最大限制
         if self.slow_down_factor < 1 - MAX_SLOW_DOWN_EFFECT:
             self.slow_down_factor = 1 - MAX_SLOW_DOWN_EFFECT
+        if self.get_actual_speed() != previous_speed:
+            # 速度变了，在飞的投射物要重新预测；减速到达上限后命中不再使预测失效
+            self.motion_version += 1
         
         print(f"Trump took {damage} damage! Health: {self.current_health}/{self.max_health}, Speed: {self.slow_down_factor:.2f}x")
         
@@ -140,18 +182,23 @@ class Trump:
             self.is_retreating = True
     
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
-        if self.current_health > 0 and not self.is_retreating:
-            health_bar_width = self.rect.width
+        Trump.draw_view(surface, self)
+
+    @staticmethod
+    def draw_view(surface, view):
+        """绘制Trump图片和血条(view 可以是 Trump 本身或其快照)"""
+        surface.blit(view.image, view.rect)
+        if view.current_health > 0 and not view.is_retreating:
+            health_bar_width = view.rect.width
             health_bar_height = 10
-            health_ratio = self.current_health / self.max_health
+            health_ratio = view.current_health / view.max_health
             current_health_width = int(health_bar_width * health_ratio)
             
-            pygame.draw.rect(surface, (255, 0, 0), (
-                self.rect.left, self.rect.top - health_bar_height - 2, 
+            draw_rect(surface, (255, 0, 0), (
+                view.rect.left, view.rect.top - health_bar_height - 2, 
                 health_bar_width, health_bar_height))
-            pygame.draw.rect(surface, (0, 255, 0), (
-                self.rect.left, self.rect.top - health_bar_height - 2, 
+            draw_rect(surface, (0, 255, 0), (
+                view.rect.left, view.rect.top - health_bar_height - 2, 
                 current_health_width, health_bar_height))
     
     def __str__(self):
@@ -0,0 +1,133 @@
+# waves.py
+# 读取 data/waves.json 中的无尽模式波次定义，校验一次后编译成一张扁平的出场表:
+# 每个出场是 (出场时间, 敌人类型, 路线, 生命倍数)，按波次顺序连续存放在数组中。
+# 游戏开始一波时只取出这一波在表中的下标范围，之后按下标读取，不再解析定义。
+# 定义的波次用完后从头循环，每循环一次生命倍数乘以 cycle_health_growth，第500波和第1波一样快。
+import json
+from array import array
+from collections import namedtuple
+from config import WAVE_DEFINITIONS_PATH, NUM_LANES
+from battle_config import ENEMY_TYPES
+
+# 一个敌人的出场；time 是相对本波开始的最早出场时间(秒)，health 已乘敌人类型和循环的倍数
+Spawn = namedtuple("Spawn", ["time", "enemy", "lane", "health"])
+
+# 每组的可选字段及默认值
+_GROUP_DEFAULTS = {"count": 1, "start": 0.0, "interval": 0.0, "health": 1.0, "lane": 0}
+
+
+class WaveError(ValueError):
+    """波次定义文件格式错误"""
+
+
+class WaveSchedule:
+    """编译后的出场表
+
+    time[i]、enemy[i]、lane[i]、health[i] 是第 i 个出场的属性(enemy 是 enemy_names 中的下标)，
+    定义中的第 k 波占用下标 [offsets[k], offsets[k + 1])，波内按出场时间排序。
+    """
+
+    def __init__(self, waves, cycle_health_growth=1.0):
+        self.enemy_names = list(ENEMY_TYPES)
+        enemy_ids = {name: i for i, name in enumerate(self.enemy_names)}
+        self.cycle_health_growth = cycle_health_growth
+        self.time = array("d")
+        self.enemy = array("B")
+        self.lane = array("B")
+        self.health = array("d")
+        self.offsets = array("I", [0])
+        for wave in waves:
+            spawns = []
+            for group in wave["groups"]:
+                fields = dict(_GROUP_DEFAULTS, **group)
+                enemy_health = ENEMY_TYPES[fields["enemy"]]["health"]
+                for k in range(fields["count"]):
+                    spawns.append((fields["start"] + k * fields["interval"], enemy_ids[fields["enemy"]],
+                                   fields["lane"], fields["health"] * enemy_health))
+            spawns.sort(key=lambda spawn: spawn[0])  # 稳定排序，同时出场的按定义顺序
+            for time, enemy, lane, health in spawns:
+                self.time.append(time)
+                self.enemy.append(enemy)
+                self.lane.append(lane)
+                self.health.append(health)
+            self.offsets.append(len(self.time))
+
+    def __len__(self):
+        """定义的波次数(一个循环)"""
+        return len(self.offsets) - 1
+
+    def spawn_range(self, wave):
+        """第 wave 波(从1开始，可以超过定义的数量)的出场
+
+        Returns:
+            tuple: (起始下标, 结束下标, 生命倍数)
+        """
+        cycle, index = divmod(wave - 1, len(self))
+        return self.offsets[index], self.offsets[index + 1], self.cycle_health_growth ** cycle
+
+    def spawn(self, index, scale=1.0):
+        """表中第 index 个出场，生命倍数再乘以 scale"""
+        return Spawn(self.time[index], self.enemy_names[self.enemy[index]], self.lane[index],
+                     self.health[index] * scale)
+
+    def wave_health(self, wave, base_health):
+        """第 wave 波全部敌人的生命值之和"""
+        start, end, scale = self.spawn_range(wave)
+        return sum(enemy_health(base_health, self.health[i] * scale) for i in range(start, end))
+
+
+def enemy_health(base_health, multiplier):
+    """按倍数计算一个敌人的最大生命值(至少为1)"""
+    return max(1, round(base_health * multiplier))
+
+
+def validate_waves(waves):
+    """检查每一波和每一组的字段和取值，有错误时抛出 WaveError"""
+    if not isinstance(waves, list) or not waves:
+        raise WaveError("'waves' must be a non-empty list")
+    for index, wave in enumerate(waves):
+        where = f"waves[{index}]"
+        if not isinstance(wave, dict) or not isinstance(wave.get("groups"), list) or not wave["groups"]:
+            raise WaveError(f"{where} must be an object with a non-empty 'groups' list")
+        for group_index, group in enumerate(wave["groups"]):
+            at = f"{where}.groups[{group_index}]"
+            if not isinstance(group, dict):
+                raise WaveError(f"{at} must be an object")
+            if group.get("enemy") not in ENEMY_TYPES:
+                raise WaveError(f"{at}: unknown enemy {group.get('enemy')!r}")
+            for field in group:
+                if field != "enemy" and field not in _GROUP_DEFAULTS:
+                    raise WaveError(f"{at}: unknown field '{field}'")
+            fields = dict(_GROUP_DEFAULTS, **group)
+            for field in ("count", "lane"):
+                if not isinstance(fields[field], int) or isinstance(fields[field], bool):
+                    raise WaveError(f"{at}.{field} must be an integer")
+            for field in ("start", "interval", "health"):
+                if not isinstance(fields[field], (int, float)) or isinstance(fields[field], bool):
+                    raise WaveError(f"{at}.{field} must be a number")
+            if fields["count"] < 1:
+                raise WaveError(f"{at}: count must be at least 1")
+            if fields["start"] < 0 or fields["interval"] < 0:
+                raise WaveError(f"{at}: start and interval must not be negative")
+            if fields["health"] <= 0:
+                raise WaveError(f"{at}: health must be positive")
+            if not 0 <= fields["lane"] < NUM_LANES:
+                raise WaveError(f"{at}: lane must be from 0 to {NUM_LANES - 1}")
+
+
+def load_waves(path=WAVE_DEFINITIONS_PATH):
+    """读取、校验并编译波次定义文件
+
+    Returns:
+        WaveSchedule
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise WaveError(f"{path}: top level must be an object")
+    growth = data.get("cycle_health_growth", 1.0)
+    if not isinstance(growth, (int, float)) or isinstance(growth, bool) or growth <= 0:
+        raise WaveError(f"{path}: cycle_health_growth must be a positive number")
+    waves = data.get("waves", [])
+    validate_waves(waves)
+    return WaveSchedule(waves, growth)